@@ -2,10 +2,23 @@ from django.contrib import admin
 from .models import Todo
 
 
+class OverdueFilter(admin.SimpleListFilter):
+    title = 'overdue'
+    parameter_name = 'overdue'
+    
+    def lookups(self, request, model_admin):
+        return [('yes', 'Overdue')]
+    
+    def queryset(self, request, queryset):
+        if self.value() == 'yes':
+            return queryset.overdue()
+        return queryset
+
+
 @admin.register(Todo)
 class TodoAdmin(admin.ModelAdmin):
     list_display = ('title', 'status', 'due_date', 'created_at', 'is_overdue')
-    list_filter = ('status', 'created_at', 'due_date')
+    list_filter = ('status', OverdueFilter, 'created_at', 'due_date')
     search_fields = ('title', 'description')
     readonly_fields = ('created_at', 'updated_at', 'resolved_at')
     
@@ -23,18 +36,18 @@ class TodoAdmin(admin.ModelAdmin):
     
     actions = ['mark_resolved', 'mark_pending']
     
+    def get_search_results(self, request, queryset, search_term):
+        # The full-text index instead of icontains over search_fields
+        if not search_term.strip():
+            return queryset, False
+        return queryset.search(search_term), False
+    
     def mark_resolved(self, request, queryset):
-        count = 0
-        for todo in queryset:
-            if todo.mark_resolved():
-                count += 1
+        count = queryset.mark_resolved()
         self.message_user(request, f"{count} TODO(s) marked as resolved.")
     mark_resolved.short_description = "Mark selected TODOs as resolved"
     
     def mark_pending(self, request, queryset):
-        count = 0
-        for todo in queryset:
-            if todo.mark_pending():
-                count += 1
+        count = queryset.mark_pending()
         self.message_user(request, f"{count} TODO(s) marked as pending.")
     mark_pending.short_description = "Mark selected TODOs as pending"
@@ -0,0 +1,51 @@
+from django.core.checks import Error, Tags, register
+from django.db import connections
+from django.db.migrations.recorder import MigrationRecorder
+
+# Objects migration 0004_todo_search creates outside Django's model state
+SQLITE_SEARCH_OBJECTS = {
+    ('table', 'todos_todo_fts'),
+    ('trigger', 'todos_todo_fts_insert'),
+    ('trigger', 'todos_todo_fts_delete'),
+    ('trigger', 'todos_todo_fts_update'),
+}
+
+
+def _missing_search_objects(connection):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute('SELECT type, name FROM sqlite_master WHERE name LIKE %s', ['todos_todo_fts%'])
+            return sorted(f'{kind} {name}' for kind, name in SQLITE_SEARCH_OBJECTS - set(cursor.fetchall()))
+        if connection.vendor == 'postgresql':
+            columns = {column.name for column in connection.introspection.get_table_description(cursor, 'todos_todo')}
+            indexes = connection.introspection.get_constraints(cursor, 'todos_todo')
+            missing = []
+            if 'search_vector' not in columns:
+                missing.append('column search_vector')
+            if 'todo_search_vector_idx' not in indexes:
+                missing.append('index todo_search_vector_idx')
+            return missing
+    return []
+
+
+@register(Tags.database)
+def check_search_index(app_configs, databases=None, **kwargs):
+    """
+    The full-text index is raw SQL, so a later migration that makes SQLite
+    rebuild todos_todo drops its triggers without a trace. Runs with
+    ``manage.py check --database default`` and before ``migrate``.
+    """
+    errors = []
+    for alias in databases or []:
+        connection = connections[alias]
+        applied = MigrationRecorder(connection).applied_migrations()
+        if ('todos', '0004_todo_search') not in applied:
+            continue
+        missing = _missing_search_objects(connection)
+        if missing:
+            errors.append(Error(
+                f"The todo search index is incomplete in database '{alias}': missing {', '.join(missing)}.",
+                hint="Re-run the SQL in todos/migrations/0004_todo_search.py for this database.",
+                id='todos.E001',
+            ))
+    return errors
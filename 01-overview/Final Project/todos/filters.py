@@ -0,0 +1,15 @@
+from rest_framework.filters import BaseFilterBackend
+
+
+class TodoSearchFilter(BaseFilterBackend):
+    """``?q=``: full-text search over title and description, best matches first"""
+    search_param = 'q'
+    
+    def get_search_text(self, request):
+        return request.query_params.get(self.search_param, '').strip()
+    
+    def filter_queryset(self, request, queryset, view):
+        text = self.get_search_text(request)
+        if not text:
+            return queryset
+        return queryset.search(text)
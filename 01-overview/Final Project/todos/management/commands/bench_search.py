@@ -0,0 +1,105 @@
+"""
+Time text search over a synthetic corpus two ways:
+
+    icontains    title or description LIKE '%word%' for each word, what the
+                 admin search and a search_fields filter would run
+    full-text    Todo.objects.search(), the index behind ?q=
+
+Each query is timed as the API runs it: the match count plus the first page.
+Titles and descriptions are drawn from a Zipf-distributed vocabulary, so
+the queries cover common, middling and rare words. Rows are created inside
+a transaction that is rolled back at the end.
+
+    python manage.py bench_search --rows 100000 1000000
+"""
+import random
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from todos.models import Todo, search_terms
+
+from .bench_serialization import Rollback, _time
+
+SYLLABLES = ['ka', 'lo', 'mi', 'ne', 'ru', 'sa', 'ti', 'vo', 'ze', 'pa', 'de', 'gu', 'ho', 'ri', 'fe', 'bo']
+
+# Vocabulary ranks the queries use
+QUERIES = [('common', [3]), ('middling', [300]), ('rare', [8000]), ('two words', [3, 300])]
+
+
+def _vocabulary(size, rng):
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words, key=lambda word: rng.random())
+
+
+def _create(rows, vocabulary, seed):
+    rng = random.Random(seed)
+    weights = [1 / rank for rank in range(1, len(vocabulary) + 1)]
+    now = timezone.now()
+
+    def words(low, high):
+        return ' '.join(rng.choices(vocabulary, weights, k=rng.randint(low, high)))
+
+    for start in range(0, rows, 10_000):
+        Todo.objects.bulk_create(
+            (
+                Todo(
+                    title=words(2, 6),
+                    description=words(8, 30) if rng.random() < 0.7 else None,
+                    due_date=now + timedelta(days=rng.randint(-30, 30)) if rng.random() < 0.8 else None,
+                )
+                for _ in range(min(10_000, rows - start))
+            ),
+            batch_size=2000,
+        )
+
+
+def _icontains(text):
+    queryset = Todo.objects.all()
+    for term in search_terms(text):
+        queryset = queryset.filter(Q(title__icontains=term) | Q(description__icontains=term))
+    return queryset
+
+
+def _page(queryset, page_size):
+    return queryset.count(), list(queryset.values('id', 'title')[:page_size])
+
+
+class Command(BaseCommand):
+    help = __doc__.strip().split('\n\n')[0]
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[100_000])
+        parser.add_argument('--vocabulary', type=int, default=10_000)
+        parser.add_argument('--page-size', type=int, default=10)
+        parser.add_argument('--repeat', type=int, default=3)
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        vocabulary = _vocabulary(options['vocabulary'], random.Random(options['seed']))
+        page_size, repeat = options['page_size'], options['repeat']
+        self.stdout.write(
+            f"{'rows':>8} {'query':>10} {'icontains':>10} {'ms':>7} {'full-text':>10} {'ms':>7} {'speed-up':>9}"
+        )
+        for rows in options['rows']:
+            try:
+                with transaction.atomic():
+                    _create(rows, vocabulary, options['seed'])
+                    for label, ranks in QUERIES:
+                        text = ' '.join(vocabulary[rank] for rank in ranks if rank < len(vocabulary))
+                        like_count = _page(_icontains(text), page_size)[0]
+                        like = _time(lambda: _page(_icontains(text), page_size), repeat)
+                        match_count = _page(Todo.objects.search(text), page_size)[0]
+                        match = _time(lambda: _page(Todo.objects.search(text), page_size), repeat)
+                        self.stdout.write(
+                            f"{rows:>8} {label:>10} {like_count:>10} {like:>7.1f} {match_count:>10} {match:>7.1f} "
+                            f"{like / match:>8.1f}x"
+                        )
+                    raise Rollback
+            except Rollback:
+                pass
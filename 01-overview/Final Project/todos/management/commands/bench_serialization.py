@@ -0,0 +1,84 @@
+"""
+Time serializing large TODO lists three ways:
+
+    per-object   TodoSerializer over model instances, is_overdue() per row
+                 (what the list endpoints did before)
+    annotated    TodoSerializer over instances annotated in SQL
+    values       todo_rows() + serialize_todo_rows(), what they do now
+
+Rows are created inside a transaction that is rolled back at the end, so
+the database is left as it was.
+
+    python manage.py bench_serialization --rows 10000 100000
+"""
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from todos.models import Todo
+from todos.serializers import TodoSerializer, serialize_todo_rows, todo_rows
+
+
+class Rollback(Exception):
+    pass
+
+
+def _create(rows, seed):
+    rng = random.Random(seed)
+    now = timezone.now()
+    Todo.objects.bulk_create(
+        (
+            Todo(
+                title=f'Task {n}',
+                description=f'Synthetic task {n}' if rng.random() < 0.7 else None,
+                due_date=now + timedelta(days=rng.randint(-30, 30)) if rng.random() < 0.8 else None,
+                status='resolved' if rng.random() < 0.3 else 'pending',
+            )
+            for n in range(rows)
+        ),
+        batch_size=2000,
+    )
+
+
+def _time(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+class Command(BaseCommand):
+    help = __doc__.strip().split('\n\n')[0]
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000])
+        parser.add_argument('--repeat', type=int, default=3)
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'rows':>8} {'per-object ms':>14} {'annotated ms':>13} {'values ms':>10} {'speed-up':>9}")
+        for rows in options['rows']:
+            try:
+                with transaction.atomic():
+                    _create(rows, options['seed'])
+                    now = timezone.now()
+                    queryset = Todo.objects.all()
+                    per_object = _time(lambda: TodoSerializer(queryset.all(), many=True).data, options['repeat'])
+                    annotated = _time(
+                        lambda: TodoSerializer(queryset.with_overdue(now), many=True).data, options['repeat']
+                    )
+                    values = _time(lambda: serialize_todo_rows(todo_rows(queryset, now)), options['repeat'])
+                    self.stdout.write(
+                        f"{rows:>8} {per_object:>14.0f} {annotated:>13.0f} {values:>10.0f} "
+                        f"{per_object / values:>8.1f}x"
+                    )
+                    raise Rollback
+            except Rollback:
+                pass
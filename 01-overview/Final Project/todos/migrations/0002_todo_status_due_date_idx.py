@@ -0,0 +1,17 @@
+# Generated by Django 5.2.9 on 2026-10-18 03:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todos', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='todo',
+            index=models.Index(fields=['status', 'due_date'], name='todo_status_due_date_idx'),
+        ),
+    ]
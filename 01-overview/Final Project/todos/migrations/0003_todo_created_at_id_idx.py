@@ -0,0 +1,17 @@
+# Generated by Django 5.2.9 on 2026-10-18 03:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todos', '0002_todo_status_due_date_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='todo',
+            index=models.Index(fields=['-created_at', 'id'], name='todo_created_at_id_idx'),
+        ),
+    ]
@@ -0,0 +1,82 @@
+# Full-text index over title and description, used by TodoQuerySet.search()
+#
+# SQLite: an FTS5 table (todos_todo_fts) reading its content from todos_todo,
+# kept in sync by triggers. Migrations that make SQLite rebuild todos_todo
+# drop the triggers; the todos.E001 system check (todos/checks.py) reports
+# that, and this migration's SQLITE_FORWARD recreates them.
+#
+# PostgreSQL: a generated tsvector column with a GIN index.
+
+from django.db import migrations
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE todos_todo_fts USING fts5(
+        title, description, content='todos_todo', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER todos_todo_fts_insert AFTER INSERT ON todos_todo BEGIN
+        INSERT INTO todos_todo_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER todos_todo_fts_delete AFTER DELETE ON todos_todo BEGIN
+        INSERT INTO todos_todo_fts(todos_todo_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    # Only text changes touch the index, not status updates
+    """
+    CREATE TRIGGER todos_todo_fts_update AFTER UPDATE OF title, description ON todos_todo BEGIN
+        INSERT INTO todos_todo_fts(todos_todo_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO todos_todo_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END
+    """,
+    "INSERT INTO todos_todo_fts(todos_todo_fts) VALUES ('rebuild')",
+]
+
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS todos_todo_fts_insert",
+    "DROP TRIGGER IF EXISTS todos_todo_fts_delete",
+    "DROP TRIGGER IF EXISTS todos_todo_fts_update",
+    "DROP TABLE IF EXISTS todos_todo_fts",
+]
+
+POSTGRESQL_FORWARD = [
+    """
+    ALTER TABLE todos_todo ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A')
+        || setweight(to_tsvector('english', coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX todo_search_vector_idx ON todos_todo USING GIN (search_vector)",
+]
+
+POSTGRESQL_REVERSE = [
+    "DROP INDEX IF EXISTS todo_search_vector_idx",
+    "ALTER TABLE todos_todo DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def _run(statements):
+    def run(apps, schema_editor):
+        for sql in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todos', '0003_todo_created_at_id_idx'),
+    ]
+
+    operations = [
+        # Other databases get no index; search() falls back to icontains there
+        migrations.RunPython(
+            _run({'sqlite': SQLITE_FORWARD, 'postgresql': POSTGRESQL_FORWARD}),
+            _run({'sqlite': SQLITE_REVERSE, 'postgresql': POSTGRESQL_REVERSE}),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.9 on 2026-10-18 03:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todos', '0004_todo_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TodoSearchIndex',
+            fields=[
+                ('todo', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_index', serialize=False, to='todos.todo')),
+                ('title', models.CharField(max_length=200)),
+                ('description', models.TextField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'todos_todo_fts',
+                'managed': False,
+            },
+        ),
+    ]
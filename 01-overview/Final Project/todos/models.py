@@ -1,6 +1,87 @@
-from django.db import models
+import re
+
+from django.db import connections, models
+from django.db.models.expressions import RawSQL
 from django.utils import timezone
 
+
+def overdue_expression(now):
+    """SQL boolean: pending and due before ``now`` (False without a due date)"""
+    return models.Case(
+        models.When(status='pending', due_date__lt=now, then=models.Value(True)),
+        default=models.Value(False),
+        output_field=models.BooleanField(),
+    )
+
+
+def search_terms(text):
+    """The words of a search query, without any query syntax"""
+    return re.findall(r'\w+', text or '')
+
+
+class TodoQuerySet(models.QuerySet):
+    def overdue(self, now=None):
+        """Pending TODOs whose due date has passed, filtered in the database"""
+        return self.filter(status='pending', due_date__lt=now or timezone.now())
+    
+    def with_overdue(self, now=None):
+        """Annotate each TODO with ``overdue``, computed in SQL against one ``now``"""
+        return self.annotate(overdue=overdue_expression(now or timezone.now()))
+    
+    def search(self, text):
+        """
+        TODOs whose title or description contain every word of ``text``, best
+        matches first, with their relevance as ``search_rank``. Uses the
+        full-text index from migration 0004 (words are stemmed, so "task"
+        also finds "tasks"); other databases fall back to icontains.
+        """
+        terms = search_terms(text)
+        if not terms:
+            return self.none()
+        vendor = connections[self.db].vendor
+        if vendor == 'sqlite':
+            # Quoted, so FTS5 reads each word literally; title hits weigh more
+            query = ' '.join(f'"{term}"' for term in terms)
+            # The join on search_index reads the index once; bm25() scores
+            # the row it is on
+            matches = RawSQL('todos_todo_fts MATCH %s', [query], output_field=models.BooleanField())
+            rank = RawSQL('-bm25(todos_todo_fts, 4.0, 1.0)', [], output_field=models.FloatField())
+            return (
+                self.filter(search_index__isnull=False).filter(matches)
+                .annotate(search_rank=rank).order_by('-search_rank', 'id')
+            )
+        if vendor == 'postgresql':
+            query = ' '.join(terms)
+            matches = RawSQL(
+                "todos_todo.search_vector @@ plainto_tsquery('english', %s)", [query],
+                output_field=models.BooleanField(),
+            )
+            rank = RawSQL(
+                "ts_rank(todos_todo.search_vector, plainto_tsquery('english', %s))", [query],
+                output_field=models.FloatField(),
+            )
+            return (
+                self.alias(search_match=matches).filter(search_match=True)
+                .annotate(search_rank=rank).order_by('-search_rank', 'id')
+            )
+        queryset = self
+        for term in terms:
+            queryset = queryset.filter(models.Q(title__icontains=term) | models.Q(description__icontains=term))
+        return queryset
+    
+    def mark_resolved(self, now=None):
+        """Resolve the pending TODOs in one UPDATE; returns how many changed"""
+        now = now or timezone.now()
+        # update() skips auto_now, so updated_at is set here
+        return self.filter(status='pending').update(status='resolved', resolved_at=now, updated_at=now)
+    
+    def mark_pending(self, now=None):
+        """Reopen the resolved TODOs in one UPDATE; returns how many changed"""
+        return self.filter(status='resolved').update(
+            status='pending', resolved_at=None, updated_at=now or timezone.now()
+        )
+
+
 class Todo(models.Model):
     """
     Model for TODO items with the ability to:
@@ -48,34 +129,61 @@ class Todo(models.Model):
         help_text="Timestamp when the TODO was marked as resolved"
     )
     
+    objects = TodoQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-created_at']
         verbose_name = "Todo"
         verbose_name_plural = "Todos"
+        indexes = [
+            # Serves TodoQuerySet.overdue() and the status filters
+            models.Index(fields=['status', 'due_date'], name='todo_status_due_date_idx'),
+            # Serves the cursor pagination order (-created_at, id)
+            models.Index(fields=['-created_at', 'id'], name='todo_created_at_id_idx'),
+        ]
     
     def __str__(self):
         return self.title
     
     def mark_resolved(self):
         """Mark the TODO as resolved"""
-        if self.status == 'pending':
+        now = timezone.now()
+        # Conditional UPDATE, so two concurrent calls cannot both succeed
+        if Todo.objects.filter(pk=self.pk).mark_resolved(now):
             self.status = 'resolved'
-            self.resolved_at = timezone.now()
-            self.save()
+            self.resolved_at = self.updated_at = now
             return True
         return False
     
     def mark_pending(self):
         """Mark the TODO as pending"""
-        if self.status == 'resolved':
+        now = timezone.now()
+        if Todo.objects.filter(pk=self.pk).mark_pending(now):
             self.status = 'pending'
             self.resolved_at = None
-            self.save()
+            self.updated_at = now
             return True
         return False
     
-    def is_overdue(self):
-        """Check if the TODO is overdue"""
+    def is_overdue(self, now=None):
+        """Check if the TODO is overdue (same rule as TodoQuerySet.overdue)"""
         if self.due_date and self.status == 'pending':
-            return timezone.now() > self.due_date
+            return (now or timezone.now()) > self.due_date
         return False
+
+
+class TodoSearchIndex(models.Model):
+    """
+    The SQLite FTS5 table from migration 0004, one row per TODO. Only read
+    through Todo.search(), which joins it so the MATCH runs once per query.
+    """
+    todo = models.OneToOneField(
+        Todo, on_delete=models.DO_NOTHING, primary_key=True, db_column='rowid',
+        db_constraint=False, related_name='search_index',
+    )
+    title = models.CharField(max_length=200)
+    description = models.TextField(blank=True, null=True)
+    
+    class Meta:
+        managed = False
+        db_table = 'todos_todo_fts'
@@ -0,0 +1,21 @@
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class TodoCursorPagination(CursorPagination):
+    """
+    Cursor pagination, newest first. Each page is an indexed range scan from
+    the cursor position, so deep pages cost the same as the first one, and
+    rows created while paging do not shift later pages.
+    """
+    ordering = ('-created_at', 'id')
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+
+class TodoSearchPagination(PageNumberPagination):
+    """
+    Numbered pages for ``?q=`` searches, which are ordered by relevance
+    rather than by a column a cursor could follow.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
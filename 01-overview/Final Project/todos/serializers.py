@@ -1,5 +1,7 @@
+from django.conf import settings
+from django.utils import timezone
 from rest_framework import serializers
-from .models import Todo
+from .models import Todo, overdue_expression
 
 
 class TodoSerializer(serializers.ModelSerializer):
@@ -21,7 +23,42 @@ class TodoSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at', 'resolved_at']
     
     def get_is_overdue(self, obj):
-        return obj.is_overdue()
+        # Annotated by TodoQuerySet.with_overdue() on the view's read actions
+        if hasattr(obj, 'overdue'):
+            return obj.overdue
+        return obj.is_overdue(self.context.get('now'))
+
+
+# Read-only fast path: same output as TodoSerializer(many=True), built from
+# values() dicts instead of model instances and per-field serializer calls
+_datetime_fields = ('due_date', 'created_at', 'updated_at', 'resolved_at')
+
+
+def todo_rows(queryset, now):
+    """The values() queryset behind serialize_todo_rows()"""
+    columns = [name for name in TodoSerializer.Meta.fields if name != 'is_overdue']
+    return queryset.values(*columns, is_overdue=overdue_expression(now))
+
+
+def serialize_todo_rows(rows):
+    """Render todo_rows() dicts as TodoSerializer would"""
+    fields = TodoSerializer.Meta.fields
+    # Resolve the active time zone once, not for every value
+    if settings.USE_TZ:
+        datetime_field = serializers.DateTimeField(default_timezone=timezone.get_current_timezone())
+    else:
+        datetime_field = serializers.DateTimeField()
+    to_representation = datetime_field.to_representation
+    data = []
+    for row in rows:
+        # A new dict: cursor pagination reads the raw values after this
+        todo = {name: row[name] for name in fields}
+        for name in _datetime_fields:
+            value = todo[name]
+            if value is not None:
+                todo[name] = to_representation(value)
+        data.append(todo)
+    return data
 
 
 class TodoCreateUpdateSerializer(serializers.ModelSerializer):
@@ -1,3 +1,209 @@
-from django.test import TestCase
+import json
+from datetime import timedelta
 
-# Create your tests here.
+from django.contrib.admin.sites import site
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from .admin import OverdueFilter
+from .checks import check_search_index
+from .models import Todo
+from .serializers import TodoSerializer, serialize_todo_rows, todo_rows
+
+
+class TodoQuerySetTests(TestCase):
+    def setUp(self):
+        now = timezone.now()
+        self.late = Todo.objects.create(title='Late', due_date=now - timedelta(days=1))
+        Todo.objects.create(title='Late but done', due_date=now - timedelta(days=1), status='resolved')
+        Todo.objects.create(title='Upcoming', due_date=now + timedelta(days=1))
+        Todo.objects.create(title='No due date')
+    
+    def test_overdue_matches_is_overdue(self):
+        self.assertEqual(list(Todo.objects.overdue()), [self.late])
+        self.assertEqual(
+            [todo for todo in Todo.objects.all() if todo.is_overdue()],
+            [self.late]
+        )
+    
+    def test_overdue_uses_status_due_date_index(self):
+        self.assertIn('todo_status_due_date_idx', Todo.objects.overdue().explain())
+    
+    def test_with_overdue_annotation(self):
+        flags = {todo.title: todo.overdue for todo in Todo.objects.with_overdue()}
+        self.assertEqual(flags, {
+            'Late': True, 'Late but done': False, 'Upcoming': False, 'No due date': False
+        })
+    
+    def test_fast_path_matches_serializer(self):
+        now = timezone.now()
+        Todo.objects.filter(title='Upcoming').update(description='Soon', resolved_at=now)
+        expected = TodoSerializer(Todo.objects.all(), many=True, context={'now': now}).data
+        self.assertEqual(serialize_todo_rows(todo_rows(Todo.objects.all(), now)), expected)
+    
+    def test_search_ranks_and_follows_changes(self):
+        docs = Todo.objects.create(title='Write the docs', description='Cover the search tasks')
+        tasks = Todo.objects.create(title='Plan tasks', description='Several tasks to write down')
+        
+        self.assertEqual(list(Todo.objects.search('task')), [tasks, docs])
+        self.assertEqual(list(Todo.objects.search('writing tasks')), [tasks, docs])
+        self.assertEqual(list(Todo.objects.search('docs "')), [docs])
+        self.assertEqual(list(Todo.objects.search('?!')), [])
+        
+        Todo.objects.filter(pk=docs.pk).update(title='Read the guide', description=None)
+        self.assertEqual(list(Todo.objects.search('docs')), [])
+        self.assertEqual(list(Todo.objects.search('guide')), [docs])
+        tasks.delete()
+        self.assertEqual(list(Todo.objects.search('tasks')), [])
+    
+    def test_search_index_check(self):
+        self.assertEqual(check_search_index(None, databases=['default']), [])
+        # What a migration that rebuilds todos_todo on SQLite leaves behind
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TRIGGER todos_todo_fts_update')
+        errors = check_search_index(None, databases=['default'])
+        self.assertEqual([error.id for error in errors], ['todos.E001'])
+        self.assertIn('trigger todos_todo_fts_update', errors[0].msg)
+    
+    def test_admin_overdue_filter(self):
+        request = RequestFactory().get('/admin/todos/todo/', {'overdue': 'yes'})
+        model_admin = site._registry[Todo]
+        overdue_filter = OverdueFilter(request, {'overdue': ['yes']}, Todo, model_admin)
+        self.assertEqual(list(overdue_filter.queryset(request, Todo.objects.all())), [self.late])
+
+
+class TodoApiTests(APITestCase):
+    def test_overdue_endpoint(self):
+        now = timezone.now()
+        Todo.objects.create(title='Late', due_date=now - timedelta(hours=1))
+        Todo.objects.create(title='Upcoming', due_date=now + timedelta(hours=1))
+        
+        response = self.client.get('/api/todos/overdue/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([todo['title'] for todo in response.data['results']], ['Late'])
+        self.assertTrue(response.data['results'][0]['is_overdue'])
+    
+    def test_list_and_detail_report_is_overdue(self):
+        late = Todo.objects.create(title='Late', due_date=timezone.now() - timedelta(hours=1))
+        Todo.objects.create(title='Upcoming', due_date=timezone.now() + timedelta(hours=1))
+        
+        response = self.client.get('/api/todos/')
+        self.assertIsNone(response.data['next'])
+        self.assertEqual(
+            {todo['title']: todo['is_overdue'] for todo in response.data['results']},
+            {'Late': True, 'Upcoming': False}
+        )
+        self.assertEqual(
+            [todo['title'] for todo in self.client.get('/api/todos/pending/').data['results']],
+            ['Upcoming', 'Late']
+        )
+        self.assertTrue(self.client.get(f'/api/todos/{late.id}/').data['is_overdue'])
+        
+        response = self.client.post(f'/api/todos/{late.id}/mark_resolved/')
+        self.assertFalse(response.data['todo']['is_overdue'])
+        self.assertEqual(self.client.get('/api/todos/resolved/').data['results'][0]['title'], 'Late')
+    
+    def test_cursor_pagination_visits_every_todo_once(self):
+        todos = Todo.objects.bulk_create(Todo(title=f'Todo {n}') for n in range(25))
+        # Shared timestamps exercise the id tie-break
+        for n, todo in enumerate(todos):
+            Todo.objects.filter(pk=todo.pk).update(created_at=timezone.now() - timedelta(minutes=n // 3))
+        
+        titles, url = [], '/api/todos/?page_size=4'
+        while url:
+            response = self.client.get(url)
+            self.assertLessEqual(len(response.data['results']), 4)
+            titles += [todo['title'] for todo in response.data['results']]
+            url = response.data['next']
+        self.assertEqual(sorted(titles), sorted(todo.title for todo in todos))
+        self.assertEqual(len(titles), 25)
+    
+    def test_stream_returns_ndjson(self):
+        for n in range(3):
+            Todo.objects.create(title=f'Todo {n}', status='resolved' if n else 'pending')
+        
+        response = self.client.get('/api/todos/resolved/?stream=1')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        todos = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual([todo['title'] for todo in todos], ['Todo 2', 'Todo 1'])
+        self.assertFalse(todos[0]['is_overdue'])
+    
+    def test_bulk_create_reports_each_item(self):
+        response = self.client.post('/api/todos/bulk/', [
+            {'title': 'First'},
+            {'description': 'No title'},
+            {'title': 'Second', 'status': 'resolved'},
+        ], format='json')
+        self.assertEqual(response.status_code, 201)
+        results = response.data['results']
+        self.assertEqual([result['status'] for result in results], ['success', 'error', 'success'])
+        self.assertIn('title', results[1]['errors'])
+        self.assertEqual(results[0]['todo']['title'], 'First')
+        self.assertEqual(
+            set(Todo.objects.values_list('pk', flat=True)),
+            {results[0]['id'], results[2]['id']}
+        )
+    
+    def test_bulk_update_changes_only_given_fields(self):
+        first = Todo.objects.create(title='First', description='Keep')
+        second = Todo.objects.create(title='Second')
+        response = self.client.patch('/api/todos/bulk/', [
+            {'id': first.id, 'title': 'First, renamed'},
+            {'id': second.id, 'status': 'unknown'},
+            {'id': 0, 'title': 'Missing'},
+        ], format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([result['status'] for result in response.data['results']], ['success', 'error', 'error'])
+        self.assertEqual(response.data['results'][2]['message'], 'TODO not found')
+        first.refresh_from_db()
+        self.assertEqual((first.title, first.description), ('First, renamed', 'Keep'))
+        self.assertGreater(first.updated_at, first.created_at)
+        self.assertEqual(Todo.objects.get(pk=second.pk).status, 'pending')
+    
+    def test_bulk_status_transitions(self):
+        todos = [Todo.objects.create(title=f'Todo {n}') for n in range(3)]
+        todos[2].mark_resolved()
+        ids = [todo.id for todo in todos]
+        
+        with self.assertNumQueries(4):
+            # SAVEPOINT, SELECT, UPDATE, RELEASE
+            response = self.client.post('/api/todos/bulk/mark_resolved/', {'ids': ids + [0]}, format='json')
+        self.assertEqual(response.data['updated'], 2)
+        self.assertEqual(
+            [result['status'] for result in response.data['results']],
+            ['success', 'success', 'error', 'error']
+        )
+        self.assertEqual(response.data['results'][2]['message'], 'TODO is already resolved')
+        resolved = Todo.objects.filter(pk__in=ids[:2])
+        self.assertTrue(all(todo.status == 'resolved' and todo.resolved_at for todo in resolved))
+        
+        response = self.client.post('/api/todos/bulk/mark_pending/', {'ids': ids}, format='json')
+        self.assertEqual(response.data['updated'], 3)
+        self.assertFalse(Todo.objects.filter(resolved_at__isnull=False).exists())
+        
+        response = self.client.post('/api/todos/bulk/mark_pending/', ids, format='json')
+        self.assertEqual(response.status_code, 400)
+    
+    def test_bulk_rejects_boolean_ids(self):
+        todo = Todo.objects.create(title='Todo 1')
+        response = self.client.patch('/api/todos/bulk/', [{'id': True, 'title': 'Renamed'}], format='json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post('/api/todos/bulk/mark_resolved/', {'ids': [True]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        todo.refresh_from_db()
+        self.assertEqual((todo.title, todo.status), ('Todo 1', 'pending'))
+    
+    def test_search_endpoint(self):
+        Todo.objects.create(title='Buy milk', description='Semi-skimmed')
+        Todo.objects.create(title='Call about the milk order', status='resolved')
+        Todo.objects.create(title='Walk the dog')
+        
+        response = self.client.get('/api/todos/', {'q': 'milk'})
+        self.assertEqual(response.data['count'], 2)
+        self.assertEqual([todo['title'] for todo in response.data['results']], ['Buy milk', 'Call about the milk order'])
+        self.assertNotIn('search_rank', response.data['results'][0])
+        
+        response = self.client.get('/api/todos/pending/', {'q': 'milk'})
+        self.assertEqual([todo['title'] for todo in response.data['results']], ['Buy milk'])
@@ -1,8 +1,34 @@
+import json
+
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from .filters import TodoSearchFilter
 from .models import Todo
-from .serializers import TodoSerializer, TodoCreateUpdateSerializer
+from .pagination import TodoSearchPagination
+from .serializers import TodoSerializer, TodoCreateUpdateSerializer, serialize_todo_rows, todo_rows
+
+# Rows fetched from the database per round trip in ?stream=1 responses
+STREAM_CHUNK_SIZE = 2000
+
+# Most items accepted by one bulk request
+MAX_BULK_ITEMS = 1000
+
+
+def _ndjson_lines(rows):
+    """Encode an iterator of todo_rows() dicts as NDJSON, a chunk at a time"""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == STREAM_CHUNK_SIZE:
+            yield ''.join(json.dumps(todo) + '\n' for todo in serialize_todo_rows(chunk))
+            chunk = []
+    if chunk:
+        yield ''.join(json.dumps(todo) + '\n' for todo in serialize_todo_rows(chunk))
 
 
 class TodoViewSet(viewsets.ModelViewSet):
@@ -13,15 +39,62 @@ class TodoViewSet(viewsets.ModelViewSet):
     - mark_resolved: Mark a TODO as resolved
     - mark_pending: Mark a TODO as pending
     - overdue: Get all overdue TODOs
+    - bulk: Create (POST) or partially update (PATCH) many TODOs at once
+    - bulk/mark_resolved, bulk/mark_pending: Change the status of many TODOs
+    
+    Lists are cursor-paginated; ``?stream=1`` returns every matching TODO as
+    NDJSON instead, in constant memory. ``?q=`` searches title and
+    description and ranks the results, in numbered pages.
     """
     queryset = Todo.objects.all()
     serializer_class = TodoSerializer
+    filter_backends = [TodoSearchFilter, *api_settings.DEFAULT_FILTER_BACKENDS]
+    
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        # One clock reading per request, so every row is judged against it
+        self.now = timezone.now()
+    
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'retrieve':
+            # Read only, so is_overdue can come from SQL; the list actions
+            # compute it in todo_rows() instead
+            queryset = queryset.with_overdue(getattr(self, 'now', None))
+        return queryset
+    
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator') and TodoSearchFilter().get_search_text(self.request):
+            self._paginator = TodoSearchPagination()
+        return super().paginator
     
     def get_serializer_class(self):
-        if self.action in ['create', 'update', 'partial_update']:
+        if self.action in ['create', 'update', 'partial_update', 'bulk']:
             return TodoCreateUpdateSerializer
         return TodoSerializer
     
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['now'] = getattr(self, 'now', None)
+        return context
+    
+    def _rows_response(self, queryset):
+        """Serialize a read-only list through the values() fast path"""
+        rows = todo_rows(queryset, self.now)
+        if self.request.query_params.get('stream') in ('1', 'true'):
+            return StreamingHttpResponse(
+                _ndjson_lines(rows.iterator(chunk_size=STREAM_CHUNK_SIZE)),
+                content_type='application/x-ndjson',
+            )
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(serialize_todo_rows(page))
+        return Response(serialize_todo_rows(rows))
+    
+    def list(self, request, *args, **kwargs):
+        return self._rows_response(self.filter_queryset(self.get_queryset()))
+    
     @action(detail=True, methods=['post'])
     def mark_resolved(self, request, pk=None):
         """Mark a TODO as resolved"""
@@ -65,20 +138,147 @@ class TodoViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def overdue(self, request):
         """Get all overdue TODOs"""
-        overdue_todos = [todo for todo in self.queryset if todo.is_overdue()]
-        serializer = self.get_serializer(overdue_todos, many=True)
-        return Response(serializer.data)
+        return self._rows_response(self.filter_queryset(self.get_queryset().overdue(self.now)))
     
     @action(detail=False, methods=['get'])
     def resolved(self, request):
         """Get all resolved TODOs"""
-        resolved_todos = self.queryset.filter(status='resolved')
-        serializer = self.get_serializer(resolved_todos, many=True)
-        return Response(serializer.data)
+        resolved_todos = self.get_queryset().filter(status='resolved')
+        return self._rows_response(self.filter_queryset(resolved_todos))
     
     @action(detail=False, methods=['get'])
     def pending(self, request):
         """Get all pending TODOs"""
-        pending_todos = self.queryset.filter(status='pending')
-        serializer = self.get_serializer(pending_todos, many=True)
-        return Response(serializer.data)
+        pending_todos = self.get_queryset().filter(status='pending')
+        return self._rows_response(self.filter_queryset(pending_todos))
+    
+    def _bulk_items(self, key=None):
+        """The request's list of items (or ``data[key]``), or an error Response"""
+        items = self.request.data
+        if key is not None:
+            items = items.get(key) if isinstance(items, dict) else None
+        if not isinstance(items, list):
+            expected = f'an object with a "{key}" list' if key else 'a list'
+            return None, Response(
+                {'status': 'error', 'message': f'Expected {expected}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(items) > MAX_BULK_ITEMS:
+            return None, Response(
+                {'status': 'error', 'message': f'At most {MAX_BULK_ITEMS} items per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return items, None
+    
+    def _bool_id_error(self, ids):
+        """A 400 Response if any id is a boolean (``True`` would match id 1), else None"""
+        if any(isinstance(pk, bool) for pk in ids):
+            return Response(
+                {'status': 'error', 'message': 'Expected integer ids, not booleans'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return None
+    
+    @action(detail=False, methods=['post', 'patch'])
+    def bulk(self, request):
+        """
+        POST: create a list of TODOs with one bulk_create.
+        PATCH: partially update a list of TODOs, each with its ``id``, with
+        one bulk_update.
+        
+        Valid items are saved even if others fail; ``results`` has one entry
+        per item, in request order.
+        """
+        items, error = self._bulk_items()
+        if error is not None:
+            return error
+        if request.method == 'POST':
+            return self._bulk_create(items)
+        return self._bulk_update(items)
+    
+    def _bulk_create(self, items):
+        results, todos = [], []
+        for item in items:
+            serializer = self.get_serializer(data=item)
+            if serializer.is_valid():
+                todo = Todo(**serializer.validated_data)
+                todos.append(todo)
+                results.append(todo)
+            else:
+                results.append({'status': 'error', 'errors': serializer.errors})
+        Todo.objects.bulk_create(todos)
+        return Response(
+            {'results': [self._bulk_result(result) for result in results]},
+            status=status.HTTP_201_CREATED if todos or not items else status.HTTP_400_BAD_REQUEST
+        )
+    
+    def _bulk_update(self, items):
+        ids = [item.get('id') for item in items if isinstance(item, dict)]
+        error = self._bool_id_error(ids)
+        if error is not None:
+            return error
+        with transaction.atomic():
+            existing = Todo.objects.select_for_update().in_bulk([pk for pk in ids if isinstance(pk, int)])
+            results, todos, fields = [], {}, {'updated_at'}
+            for item in items:
+                pk = item.get('id') if isinstance(item, dict) else None
+                todo = existing.get(pk) if isinstance(pk, int) else None
+                if todo is None:
+                    results.append({'id': pk, 'status': 'error', 'message': 'TODO not found'})
+                    continue
+                serializer = self.get_serializer(todo, data=item, partial=True)
+                if not serializer.is_valid():
+                    results.append({'id': todo.pk, 'status': 'error', 'errors': serializer.errors})
+                    continue
+                for name, value in serializer.validated_data.items():
+                    setattr(todo, name, value)
+                    fields.add(name)
+                # bulk_update skips auto_now, so updated_at is set here
+                todo.updated_at = self.now
+                todos[todo.pk] = todo
+                results.append(todo)
+            Todo.objects.bulk_update(todos.values(), sorted(fields))
+        return Response(
+            {'results': [self._bulk_result(result) for result in results]},
+            status=status.HTTP_200_OK if todos or not items else status.HTTP_400_BAD_REQUEST
+        )
+    
+    def _bulk_result(self, result):
+        if isinstance(result, Todo):
+            return {'id': result.pk, 'status': 'success', 'todo': TodoSerializer(result, context={'now': self.now}).data}
+        return result
+    
+    def _bulk_transition(self, method, target):
+        """Run TodoQuerySet.<method> over the listed ids, reporting each one"""
+        ids, error = self._bulk_items('ids')
+        if error is None:
+            error = self._bool_id_error(ids)
+        if error is not None:
+            return error
+        with transaction.atomic():
+            statuses = dict(
+                Todo.objects.select_for_update().filter(pk__in=[pk for pk in ids if isinstance(pk, int)])
+                .values_list('pk', 'status')
+            )
+            # One UPDATE ... WHERE id IN (...) for every TODO that changes
+            changing = [pk for pk, current in statuses.items() if current != target]
+            getattr(Todo.objects.filter(pk__in=changing), method)(self.now)
+        results = []
+        for pk in ids:
+            if not isinstance(pk, int) or pk not in statuses:
+                results.append({'id': pk, 'status': 'error', 'message': 'TODO not found'})
+            elif statuses[pk] == target:
+                results.append({'id': pk, 'status': 'error', 'message': f'TODO is already {target}'})
+            else:
+                results.append({'id': pk, 'status': 'success'})
+        return Response({'updated': len(changing), 'results': results})
+    
+    @action(detail=False, methods=['post'], url_path='bulk/mark_resolved')
+    def bulk_mark_resolved(self, request):
+        """Resolve the TODOs listed in ``ids``"""
+        return self._bulk_transition('mark_resolved', 'resolved')
+    
+    @action(detail=False, methods=['post'], url_path='bulk/mark_pending')
+    def bulk_mark_pending(self, request):
+        """Reopen the TODOs listed in ``ids``"""
+        return self._bulk_transition('mark_pending', 'pending')
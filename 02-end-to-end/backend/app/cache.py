@@ -0,0 +1,146 @@
+"""
+Response cache for ``GET /leaderboard``.
+
+Responses are cached as pre-serialized JSON bytes keyed by ``(mode, limit,
+window, period start)`` with an ETag, under an LRU bound and a TTL:
+
+    LEADERBOARD_CACHE_SIZE   maximum cached responses (default 64)
+    LEADERBOARD_CACHE_TTL    seconds before an entry is refetched (default 30)
+
+Entries are invalidated when a new score would land in their top-N: each
+entry remembers the lowest score it contains (its floor), so scores below
+every cached floor leave the cache untouched. The TTL bounds staleness for
+scores written by other processes.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+from .models import GameMode
+
+
+class CachedResponse:
+    __slots__ = ("body", "etag", "mode", "floor", "expires_at", "next_cursor")
+
+    def __init__(
+        self,
+        body: bytes,
+        mode: Optional[GameMode],
+        floor: Optional[int],
+        expires_at: float,
+        next_cursor: Optional[str] = None,
+    ):
+        self.body = body
+        self.etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+        self.mode = mode
+        self.floor = floor
+        self.expires_at = expires_at
+        self.next_cursor = next_cursor
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """True if an ``If-None-Match`` header already names this body."""
+        if not if_none_match:
+            return False
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or any(tag.removeprefix("W/") == self.etag for tag in tags)
+
+
+class ResponseCache:
+    """LRU + TTL cache of serialized leaderboard responses."""
+
+    def __init__(self, max_entries: int = 64, ttl: float = 30.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, CachedResponse]" = OrderedDict()
+        self._generation = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    @classmethod
+    def from_env(cls) -> "ResponseCache":
+        return cls(
+            max_entries=int(os.getenv("LEADERBOARD_CACHE_SIZE", 64)),
+            ttl=float(os.getenv("LEADERBOARD_CACHE_TTL", 30)),
+        )
+
+    @property
+    def generation(self) -> int:
+        """Bumped by every invalidation; pass it back to ``put``."""
+        return self._generation
+
+    def get(self, key: Hashable) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry
+
+    def put(
+        self,
+        key: Hashable,
+        body: bytes,
+        mode: Optional[GameMode],
+        floor: Optional[int],
+        generation: int,
+        next_cursor: Optional[str] = None,
+    ) -> CachedResponse:
+        """
+        Cache a response built from data read at ``generation``.
+        ``floor`` is the lowest score in a full top-N, or None if the list is
+        shorter than its limit (then any new score lands in it).
+        """
+        entry = CachedResponse(body, mode, floor, time.monotonic() + self.ttl, next_cursor)
+        with self._lock:
+            # A score arrived while the response was built; don't cache it
+            if generation != self._generation:
+                return entry
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+        return entry
+
+    def invalidate_score(self, mode: GameMode, score: int) -> None:
+        """Drop cached responses whose top-N a new ``score`` would enter."""
+        with self._lock:
+            self._generation += 1
+            stale = [
+                key for key, entry in self._entries.items()
+                if entry.mode in (None, mode) and (entry.floor is None or score >= entry.floor)
+            ]
+            for key in stale:
+                del self._entries[key]
+            self._invalidations += len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": self._hits / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+            }
+
+
+leaderboard_cache = ResponseCache.from_env()
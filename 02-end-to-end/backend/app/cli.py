@@ -0,0 +1,164 @@
+"""
+Command line entry point for backend maintenance tasks.
+
+Usage:
+    uv run python -m app.cli migrate
+    uv run python -m app.cli migrate --status
+    uv run python -m app.cli backfill-best-scores
+    uv run python -m app.cli export leaderboard_entries scores.ndjson
+    uv run python -m app.cli import leaderboard_entries scores.ndjson --resume
+    uv run python -m app.cli generate --users 1000000 --seed 7
+"""
+import argparse
+import sys
+from pathlib import Path
+
+from .database import engine
+
+
+def _migrate(args: argparse.Namespace) -> int:
+    from .migrations import MIGRATIONS, applied_versions, run_migrations
+
+    if args.status:
+        with engine.connect() as connection:
+            applied = set(applied_versions(connection))
+            connection.commit()
+        for m in MIGRATIONS:
+            state = "applied" if m.version in applied else "pending"
+            print(f"{m.version:>4}  {state:<8} {m.description}")
+        return 0
+
+    if args.create:
+        from .models import Base
+        Base.metadata.create_all(bind=engine)
+
+    applied = run_migrations(engine)
+    for m in applied:
+        print(f"Applied migration {m.version}: {m.description}")
+    if not applied:
+        print("Database schema is up to date")
+    return 0
+
+
+def _backfill_best_scores(args: argparse.Namespace) -> int:
+    from .migrations import backfill_best_scores
+
+    with engine.begin() as connection:
+        players = backfill_best_scores(connection)
+    print(f"Rebuilt player_best_scores: {players} rows")
+    return 0
+
+
+def _export(args: argparse.Namespace) -> int:
+    from .transfer import Progress, TABLES, detect_format, export_table
+
+    path = Path(args.path)
+    progress = Progress(f"export {args.table}")
+    with engine.connect() as connection:
+        export_table(
+            connection, TABLES[args.table], path, detect_format(path, args.format),
+            batch_size=args.batch_size, resume=args.resume, progress=progress,
+        )
+    progress.finish()
+    return 0
+
+
+def _import(args: argparse.Namespace) -> int:
+    from .database import init_db
+    from .migrations import backfill_best_scores
+    from .transfer import Progress, TABLES, detect_format, import_table
+
+    path = Path(args.path)
+    init_db()
+    progress = Progress(f"import {args.table}")
+    import_table(
+        engine, TABLES[args.table], path, detect_format(path, args.format),
+        batch_size=args.batch_size, resume=args.resume, skip_existing=args.skip_existing, progress=progress,
+    )
+    progress.finish()
+    if args.table == "leaderboard_entries":
+        with engine.begin() as connection:
+            players = backfill_best_scores(connection)
+        print(f"Rebuilt player_best_scores: {players} rows", file=sys.stderr)
+    return 0
+
+
+def _generate(args: argparse.Namespace) -> int:
+    from datetime import datetime
+    from .database import init_db
+    from .synthetic import SyntheticData
+    from .transfer import Progress
+
+    data = SyntheticData(
+        users=args.users,
+        games_per_user=args.games_per_user,
+        live_sessions=args.live_sessions,
+        seed=args.seed,
+        now=datetime.fromisoformat(args.now) if args.now else None,
+        prefix=args.prefix,
+    )
+    init_db()
+    progress = Progress("generate")
+    counts = data.load(engine, batch_size=args.batch_size, progress=progress)
+    progress.finish()
+    for table, rows in counts.items():
+        print(f"{table}: {rows} rows")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description=__doc__.split("\n\n")[0].strip())
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    migrate = commands.add_parser("migrate", help="apply pending schema migrations")
+    migrate.add_argument("--status", action="store_true", help="list migrations without applying them")
+    migrate.add_argument("--create", action="store_true", help="also create missing tables first")
+    migrate.set_defaults(func=_migrate)
+
+    backfill = commands.add_parser(
+        "backfill-best-scores", help="rebuild player_best_scores from leaderboard_entries"
+    )
+    backfill.set_defaults(func=_backfill_best_scores)
+
+    from .transfer import DEFAULT_BATCH_SIZE, FORMATS, TABLES
+
+    for name, func, help in (
+        ("export", _export, "stream a table to an NDJSON or CSV file"),
+        ("import", _import, "bulk load an NDJSON or CSV file into a table"),
+    ):
+        command = commands.add_parser(name, help=help)
+        command.add_argument("table", choices=sorted(TABLES))
+        command.add_argument("path", help="data file; .ndjson/.jsonl or .csv picks the format")
+        command.add_argument("--format", choices=FORMATS, help="override the format the extension implies")
+        command.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="rows per batch and checkpoint")
+        command.add_argument("--resume", action="store_true", help="continue from the last checkpoint")
+        command.set_defaults(func=func)
+        if name == "import":
+            command.add_argument(
+                "--skip-existing", action="store_true", help="ignore rows whose id is already present"
+            )
+
+    generate = commands.add_parser("generate", help="load seeded synthetic users, scores and sessions")
+    generate.add_argument("--users", type=int, default=10_000)
+    generate.add_argument("--games-per-user", type=float, default=8.0, help="mean leaderboard entries per user")
+    generate.add_argument("--live-sessions", type=int, help="default: 1%% of users")
+    generate.add_argument("--seed", type=int, default=1)
+    generate.add_argument("--now", help="ISO timestamp the data ends at (default: now); fix it for identical rows")
+    generate.add_argument("--prefix", default="player", help="username prefix")
+    generate.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    generate.set_defaults(func=_generate)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except (OSError, ValueError) as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,478 @@
+"""
+Keeps the in-process state of several worker processes in step.
+
+Every worker has its own rank indexes, leaderboard response cache, session
+hub and live session store. When the app runs with several workers
+(``python -m app.serve`` with WEB_CONCURRENCY > 1), each change a worker makes
+to that state is broadcast, and the other workers apply it to their copies:
+
+    score-added     a new leaderboard entry: rank indexes and response cache
+    score-removed   an entry dropped after a failed write-behind flush
+    session         a live session created, updated or closed: session hub
+                    and live session store
+    token-revoked   a token logged out of: revocation list
+
+COORDINATION_URL picks the transport:
+
+    (unset)                      single process; nothing is broadcast
+    postgresql://user:pw@host/db PostgreSQL LISTEN/NOTIFY
+    unix:///path/to/broker.sock  the socket broker ``app.serve`` starts when
+                                 it forks several workers without a URL
+
+Messages are queued and sent by a background thread, so publishing never
+waits on the network. While the transport is not connected yet (or is
+reconnecting) they stay queued, up to MAX_QUEUED. Delivery is best effort
+beyond that: messages past that limit, or in a batch whose send fails, are
+dropped (and counted), and the indexes of the affected worker catch up on
+its next restart.
+"""
+import json
+import logging
+import os
+import queue
+import select
+import socket
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from datetime import date
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import make_url
+
+from .cache import leaderboard_cache
+from .database import SessionLocal
+from .hub import CLOSED, session_hub
+from .live_sessions import live_sessions
+from .models import GameMode
+from .ranking import RankedEntry, leaderboard_index, player_index
+from .tokens import token_signer
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "snake_arena"
+
+SCORE_ADDED = "score-added"
+SCORE_REMOVED = "score-removed"
+SESSION = "session"
+TOKEN_REVOKED = "token-revoked"
+
+# Messages sent per round trip, and seconds between reconnect attempts
+MAX_BATCH = 100
+RECONNECT_DELAY = 1.0
+# Messages held while the transport is not connected
+MAX_QUEUED = 10_000
+
+
+class Transport(ABC):
+    """Moves JSON messages between workers. Subclasses implement the wire side."""
+
+    name = "transport"
+
+    def __init__(self):
+        self._outbox: "queue.SimpleQueue[Optional[str]]" = queue.SimpleQueue()
+        self._stop = threading.Event()
+        self._connected = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self.sent = 0
+        self.dropped = 0
+
+    @property
+    def connected(self) -> bool:
+        return self._connected.is_set()
+
+    @connected.setter
+    def connected(self, value: bool) -> None:
+        if value:
+            self._connected.set()
+        else:
+            self._connected.clear()
+
+    def start(self, deliver: Callable[[str], None]) -> None:
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._receive_loop, args=(deliver,), name=f"{self.name}-receive", daemon=True),
+            threading.Thread(target=self._send_loop, name=f"{self.name}-send", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def send(self, message: str) -> None:
+        if self._outbox.qsize() >= MAX_QUEUED:
+            self.dropped += 1
+            return
+        self._outbox.put(message)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Send what is queued, then disconnect."""
+        self._stop.set()
+        self._outbox.put(None)
+        if self._threads:
+            receiver, sender = self._threads
+            sender.join(timeout)
+            self._interrupt()
+            receiver.join(timeout)
+        self._threads = []
+        self._close()
+
+    def _send_loop(self) -> None:
+        stopping = False
+        while not stopping:
+            message = self._outbox.get()
+            if message is None:
+                return
+            batch = [message]
+            while len(batch) < MAX_BATCH:
+                try:
+                    message = self._outbox.get_nowait()
+                except queue.Empty:
+                    break
+                if message is None:
+                    stopping = True
+                    break
+                batch.append(message)
+            # Hold the batch until the connection is up, unless stopping
+            while not self._connected.wait(0.5) and not self._stop.is_set():
+                pass
+            try:
+                self._send_batch(batch)
+                self.sent += len(batch)
+            except Exception as exc:
+                self.dropped += len(batch)
+                logger.warning("Dropped %d coordination messages: %s", len(batch), exc)
+                self._reset_sender()
+
+    def _receive_loop(self, deliver: Callable[[str], None]) -> None:
+        while not self._stop.is_set():
+            try:
+                self._receive(deliver)
+            except Exception as exc:
+                if not self._stop.is_set():
+                    logger.warning("Coordination connection lost (%s); reconnecting", exc)
+            self.connected = False
+            self._stop.wait(RECONNECT_DELAY)
+
+    @abstractmethod
+    def _receive(self, deliver: Callable[[str], None]) -> None:
+        """Connect and deliver incoming messages until stopped or disconnected."""
+
+    @abstractmethod
+    def _send_batch(self, batch: List[str]) -> None:
+        """Write one batch to the connection; raises if it cannot."""
+
+    def _reset_sender(self) -> None:
+        pass
+
+    def _interrupt(self) -> None:
+        """Wake the receiver if it is blocked on the connection."""
+
+    def _close(self) -> None:
+        pass
+
+
+class PostgresTransport(Transport):
+    """LISTEN/NOTIFY on one channel, over two dedicated psycopg2 connections."""
+
+    name = "coordination-postgres"
+
+    def __init__(self, dsn: str):
+        super().__init__()
+        self.dsn = dsn
+        self._publisher = None
+
+    def _connect(self):
+        import psycopg2
+
+        connection = psycopg2.connect(self.dsn)
+        connection.autocommit = True
+        return connection
+
+    def _receive(self, deliver: Callable[[str], None]) -> None:
+        connection = self._connect()
+        try:
+            connection.cursor().execute(f"LISTEN {CHANNEL}")
+            self.connected = True
+            while not self._stop.is_set():
+                if select.select([connection], [], [], 1.0) == ([], [], []):
+                    continue
+                connection.poll()
+                while connection.notifies:
+                    deliver(connection.notifies.pop(0).payload)
+        finally:
+            connection.close()
+
+    def _send_batch(self, batch: List[str]) -> None:
+        if self._publisher is None:
+            self._publisher = self._connect()
+        # One round trip; notifications keep their order
+        calls = ", ".join(["pg_notify(%s, %s)"] * len(batch))
+        params = [value for message in batch for value in (CHANNEL, message)]
+        self._publisher.cursor().execute(f"SELECT {calls}", params)
+
+    def _reset_sender(self) -> None:
+        if self._publisher is not None:
+            try:
+                self._publisher.close()
+            except Exception:
+                pass
+            self._publisher = None
+
+    def _close(self) -> None:
+        self._reset_sender()
+
+
+class SocketTransport(Transport):
+    """Newline-delimited messages through a ``SocketBroker`` on a Unix socket."""
+
+    name = "coordination-socket"
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self._sock: Optional[socket.socket] = None
+
+    def _receive(self, deliver: Callable[[str], None]) -> None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(self.path)
+            sock.settimeout(1.0)
+            self._sock = sock
+            self.connected = True
+            buffer = b""
+            while not self._stop.is_set():
+                try:
+                    chunk = sock.recv(65536)
+                except socket.timeout:
+                    continue
+                if not chunk:
+                    raise ConnectionError("broker closed the connection")
+                *lines, buffer = (buffer + chunk).split(b"\n")
+                for line in lines:
+                    deliver(line.decode())
+        finally:
+            self._sock = None
+            sock.close()
+
+    def _send_batch(self, batch: List[str]) -> None:
+        sock = self._sock
+        if sock is None:
+            raise ConnectionError("not connected to the broker")
+        sock.sendall("".join(f"{message}\n" for message in batch).encode())
+
+    def _interrupt(self) -> None:
+        sock = self._sock
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+class SocketBroker:
+    """Relays messages from each connected worker to all the others."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._clients: List[socket.socket] = []
+        self._server: Optional[socket.socket] = None
+
+    def start(self) -> None:
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._server.bind(self.path)
+        self._server.listen()
+        threading.Thread(target=self._accept, name="coordination-broker", daemon=True).start()
+
+    def _accept(self) -> None:
+        while True:
+            try:
+                client, _ = self._server.accept()
+            except OSError:
+                return
+            with self._lock:
+                self._clients.append(client)
+            threading.Thread(target=self._relay, args=(client,), daemon=True).start()
+
+    def _relay(self, client: socket.socket) -> None:
+        buffer = b""
+        try:
+            while True:
+                chunk = client.recv(65536)
+                if not chunk:
+                    break
+                buffer += chunk
+                # Forward complete lines only, so messages never interleave
+                end = buffer.rfind(b"\n") + 1
+                if end:
+                    self._broadcast(client, buffer[:end])
+                    buffer = buffer[end:]
+        except OSError:
+            pass
+        finally:
+            with self._lock:
+                if client in self._clients:
+                    self._clients.remove(client)
+            client.close()
+
+    def _broadcast(self, sender: socket.socket, data: bytes) -> None:
+        with self._lock:
+            for client in self._clients:
+                if client is not sender:
+                    try:
+                        client.sendall(data)
+                    except OSError:
+                        pass
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+        with self._lock:
+            for client in self._clients:
+                client.close()
+            self._clients.clear()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+def _score_payload(entry: RankedEntry) -> dict:
+    return {
+        "id": entry.id,
+        "username": entry.username,
+        "score": entry.score,
+        "mode": entry.mode.value,
+        "date": entry.date.isoformat(),
+    }
+
+
+def _score_entry(data: dict) -> RankedEntry:
+    return RankedEntry(
+        -data["score"], data["id"], data["username"], GameMode(data["mode"]), date.fromisoformat(data["date"])
+    )
+
+
+class Coordinator:
+    """Publishes this worker's state changes and applies everyone else's."""
+
+    def __init__(self, transport: Optional[Transport] = None):
+        self.transport = transport
+        self.worker_id: Optional[str] = None
+        self._handlers: Dict[str, Callable[[dict], None]] = {
+            SCORE_ADDED: self._apply_score_added,
+            SCORE_REMOVED: self._apply_score_removed,
+            SESSION: self._apply_session,
+            TOKEN_REVOKED: self._apply_token_revoked,
+        }
+        self._received = 0
+        self._failed = 0
+
+    @classmethod
+    def from_env(cls) -> "Coordinator":
+        url = os.getenv("COORDINATION_URL", "")
+        if not url:
+            return cls()
+        if url.startswith("unix://"):
+            return cls(SocketTransport(url[len("unix://"):]))
+        if url.startswith("postgres"):
+            # psycopg2 takes the plain libpq URL, without a SQLAlchemy driver suffix
+            dsn = make_url(url).set(drivername="postgresql").render_as_string(hide_password=False)
+            return cls(PostgresTransport(dsn))
+        raise ValueError(f"Unsupported COORDINATION_URL scheme: {url.split(':', 1)[0]}")
+
+    @property
+    def enabled(self) -> bool:
+        return self.transport is not None
+
+    def start(self) -> None:
+        """Connect; called in each worker after it has been forked."""
+        if not self.enabled or self.worker_id is not None:
+            return
+        self.worker_id = uuid.uuid4().hex
+        session_hub.relay = self._relay_session
+        self.transport.start(self.deliver)
+
+    def stop(self) -> None:
+        if not self.enabled or self.worker_id is None:
+            return
+        session_hub.relay = None
+        self.transport.stop()
+        self.worker_id = None
+
+    def score_added(self, entry: RankedEntry) -> None:
+        self._publish(SCORE_ADDED, _score_payload(entry))
+
+    def score_removed(self, entry: RankedEntry) -> None:
+        self._publish(SCORE_REMOVED, _score_payload(entry))
+
+    def token_revoked(self, token_id: str, expires_at: int) -> None:
+        self._publish(TOKEN_REVOKED, {"id": token_id, "expires": expires_at})
+
+    def _relay_session(self, type: str, payload: dict) -> None:
+        self._publish(SESSION, {"type": type, "session": payload})
+
+    def _publish(self, kind: str, data: dict) -> None:
+        if self.worker_id is None:
+            return
+        self.transport.send(json.dumps({"worker": self.worker_id, "kind": kind, "data": data}))
+
+    def deliver(self, message: str) -> None:
+        """Apply a message received from the transport."""
+        try:
+            decoded = json.loads(message)
+            if decoded["worker"] == self.worker_id:
+                return
+            handler = self._handlers[decoded["kind"]]
+            handler(decoded["data"])
+        except Exception:
+            self._failed += 1
+            logger.exception("Applying a coordination message failed")
+            return
+        self._received += 1
+
+    def _apply_score_added(self, data: dict) -> None:
+        entry = _score_entry(data)
+        # A cold index loads the entry from the database when it warms
+        if leaderboard_index.is_warm:
+            leaderboard_index.add(entry)
+        if player_index.is_warm:
+            player_index.offer(entry)
+        leaderboard_cache.invalidate_score(entry.mode, entry.score)
+
+    def _apply_score_removed(self, data: dict) -> None:
+        entry = _score_entry(data)
+        leaderboard_index.remove(entry)
+        if player_index.is_warm:
+            # Previous bests are not kept in memory; reload this player's from the database
+            db = SessionLocal()
+            try:
+                player_index.evict([entry], player_index.stored_bests(db, [entry.username]))
+            except Exception:
+                player_index.clear()
+                raise
+            finally:
+                db.close()
+        leaderboard_cache.invalidate_score(entry.mode, entry.score)
+
+    def _apply_session(self, data: dict) -> None:
+        type, payload = data["type"], data["session"]
+        session_hub.apply(type, payload)
+        live_sessions.observe(payload["id"], payload["score"], type != CLOSED and payload["isLive"])
+
+    def _apply_token_revoked(self, data: dict) -> None:
+        token_signer.revoke(data["id"], data["expires"])
+
+    def stats(self) -> dict:
+        transport = self.transport
+        return {
+            "enabled": int(self.enabled),
+            "connected": int(bool(transport and transport.connected)),
+            "sent": transport.sent if transport else 0,
+            "dropped": transport.dropped if transport else 0,
+            "received": self._received,
+            "failed": self._failed,
+        }
+
+
+coordinator = Coordinator.from_env()
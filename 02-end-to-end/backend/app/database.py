@@ -1,36 +1,170 @@
 import os
-from typing import Optional
-from sqlalchemy import create_engine, event
+import threading
+import time
+from typing import TYPE_CHECKING, AsyncIterator
+from sqlalchemy import create_engine, event, exc, make_url
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool, StaticPool
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
 
 # Database configuration
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./snake_arena.db")
 
+# An async driver in the URL (postgresql+asyncpg://, sqlite+aiosqlite://)
+# switches request handling to AsyncSession. The sync engine is still used
+# for startup, migrations and CLI tools.
+ASYNC_DRIVERS = ("+asyncpg", "+aiosqlite")
+is_async = any(driver in DATABASE_URL for driver in ASYNC_DRIVERS)
+
+SYNC_DATABASE_URL = DATABASE_URL
+for driver in ASYNC_DRIVERS:
+    SYNC_DATABASE_URL = SYNC_DATABASE_URL.replace(driver, "")
+
 # Check if using SQLite
 is_sqlite = DATABASE_URL.startswith("sqlite")
+is_sqlite_memory = is_sqlite and make_url(SYNC_DATABASE_URL).database in (None, "", ":memory:")
+
+
+# Pool sizing, shared by the sync and async engines of a server database:
+#   DB_POOL_SIZE       connections kept open (default 10)
+#   DB_MAX_OVERFLOW    extra connections opened under load (default 20)
+#   DB_POOL_TIMEOUT    seconds to wait for a free connection (default 30)
+#   DB_POOL_RECYCLE    seconds before a connection is replaced (default -1, never)
+def _pool_options() -> dict:
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", 10)),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", 20)),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", 30)),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", -1)),
+    }
+
+
+class _TimedCheckout:
+    """Pool mixin recording how long checkouts wait for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # As configured; QueuePool keeps it private (10 is its default)
+        self.max_overflow = kwargs.get("max_overflow", 10)
+        self._checkout_lock = threading.Lock()
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.checkout_wait_seconds = 0.0
+        self.checkout_max_wait_seconds = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with self._checkout_lock:
+                self.checkout_timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            with self._checkout_lock:
+                self.checkouts += 1
+                self.checkout_wait_seconds += waited
+                self.checkout_max_wait_seconds = max(self.checkout_max_wait_seconds, waited)
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+# pool_stats keys that only increase, exported as counters
+POOL_COUNTERS = ("checkouts", "checkout_timeouts", "checkout_wait_seconds_total")
+
+
+def pool_stats(engine) -> dict:
+    """Stats for ``GET /metrics``: connections in use, idle and in overflow, and checkout waits."""
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return {}
+    stats = {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        # Negative while fewer than pool_size connections have been opened
+        "overflow": max(pool.overflow(), 0),
+    }
+    if isinstance(pool, _TimedCheckout):
+        with pool._checkout_lock:
+            stats.update({
+                "max_overflow": pool.max_overflow,
+                "checkouts": pool.checkouts,
+                "checkout_timeouts": pool.checkout_timeouts,
+                "checkout_wait_seconds_total": pool.checkout_wait_seconds,
+                "checkout_max_wait_seconds": pool.checkout_max_wait_seconds,
+            })
+    return stats
+
+
+# Values accepted for the PRAGMAs configure_sqlite sets from the environment
+SQLITE_JOURNAL_MODES = ("DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF")
+SQLITE_SYNCHRONOUS_LEVELS = ("OFF", "NORMAL", "FULL", "EXTRA", "0", "1", "2", "3")
+
+
+def _pragma_setting(variable: str, default: str, allowed: tuple) -> str:
+    # PRAGMA values cannot be bound parameters, so only known words reach the SQL
+    value = os.getenv(variable, default).strip().upper()
+    if value not in allowed:
+        raise ValueError(f"{variable} must be one of {', '.join(allowed)}, not {value!r}")
+    return value
+
+
+def configure_sqlite(engine, file_backed: bool = True) -> None:
+    """
+    Per-connection SQLite settings: foreign keys, and for a database file WAL
+    journaling so readers are not blocked by a writer, with synchronous=NORMAL
+    (durable at each checkpoint rather than each commit). Override with
+    SQLITE_JOURNAL_MODE / SQLITE_SYNCHRONOUS.
+    """
+    journal_mode = _pragma_setting("SQLITE_JOURNAL_MODE", "WAL", SQLITE_JOURNAL_MODES)
+    synchronous = _pragma_setting("SQLITE_SYNCHRONOUS", "NORMAL", SQLITE_SYNCHRONOUS_LEVELS)
 
-# Create engine with appropriate configuration
-if is_sqlite:
-    engine = create_engine(
-        DATABASE_URL,
-        connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
-    )
-    
-    # Enable foreign keys for SQLite
     @event.listens_for(engine, "connect")
     def set_sqlite_pragma(dbapi_connection, connection_record):
         cursor = dbapi_connection.cursor()
         cursor.execute("PRAGMA foreign_keys=ON")
+        if file_backed:
+            cursor.execute(f"PRAGMA journal_mode={journal_mode}")
+            cursor.execute(f"PRAGMA synchronous={synchronous}")
         cursor.close()
+
+
+# Create engine with appropriate configuration
+if is_sqlite:
+    # Requests run on threadpool threads, so a file database gets a pool and
+    # each request thread its own connection (readers run alongside the
+    # writer under WAL); only an in-memory database must share one connection.
+    if is_sqlite_memory:
+        engine = create_engine(
+            SYNC_DATABASE_URL,
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+    else:
+        engine = create_engine(
+            SYNC_DATABASE_URL,
+            connect_args={"check_same_thread": False},
+            poolclass=TimedQueuePool,
+            **_pool_options(),
+        )
+    configure_sqlite(engine, file_backed=not is_sqlite_memory)
 else:
     # PostgreSQL configuration
     engine = create_engine(
-        DATABASE_URL,
-        pool_size=10,
-        max_overflow=20,
+        SYNC_DATABASE_URL,
+        poolclass=TimedQueuePool,
         pool_pre_ping=True,
+        **_pool_options(),
     )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -45,7 +179,54 @@ def get_db() -> Session:
         db.close()
 
 
+def _check_async_url(database_url: str) -> None:
+    """Reject URLs the separate sync and async engines cannot both reach."""
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        # Each engine would open its own, separate in-memory database, and
+        # the async one would never get the tables init_db creates
+        raise ValueError(
+            "sqlite+aiosqlite needs a database file; use sqlite+aiosqlite:///path.db "
+            "or the sync sqlite:// driver for an in-memory database"
+        )
+
+
+# Async engine, only created when DATABASE_URL names an async driver
+async_engine = None
+AsyncSessionLocal = None
+
+if is_async:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    
+    _check_async_url(DATABASE_URL)
+    
+    if is_sqlite:
+        async_engine = create_async_engine(DATABASE_URL)
+        configure_sqlite(async_engine.sync_engine, file_backed=True)
+    else:
+        async_engine = create_async_engine(
+            DATABASE_URL,
+            poolclass=TimedAsyncAdaptedQueuePool,
+            pool_pre_ping=True,
+            **_pool_options(),
+        )
+    
+    # Objects stay usable after commit; lazy loads are not possible outside
+    # the greenlet that AsyncSession.run_sync provides.
+    AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+
+
+async def get_async_db() -> AsyncIterator["AsyncSession"]:
+    """Dependency for getting an async database session in FastAPI routes."""
+    if AsyncSessionLocal is None:
+        raise RuntimeError("DATABASE_URL does not use an async driver")
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 def init_db():
-    """Initialize database tables."""
+    """Initialize database tables and apply pending schema migrations."""
     from .models import Base
+    from .migrations import run_migrations
     Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
@@ -1,11 +1,18 @@
 from typing import Optional, List
-from datetime import date
+from datetime import date, datetime, timezone
 from sqlalchemy.orm import Session
-from sqlalchemy.sql import func
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql, sqlite
 import uuid
 from .models import (
-    UserModel, LeaderboardEntryModel, GameSessionModel, GameMode
+    UserModel, LeaderboardEntryModel, GameSessionModel, GameMode, LeaderboardWindow,
+    PlayerBestScoreModel, RevokedTokenModel
 )
+from .ranking import PlayerBest, RankedEntry, leaderboard_index, player_index
+from .hub import CLOSED, CREATED, UPDATED, session_hub
+from .cache import leaderboard_cache
+from .live_sessions import LiveSession, live_sessions
+from .coordination import coordinator
 
 
 class DatabaseService:
@@ -41,14 +48,34 @@ class DatabaseService:
         """Retrieve user by ID."""
         return self.db.query(UserModel).filter(UserModel.id == user_id).first()
     
+    def update_password_hash(self, user_id: str, password_hash: str) -> bool:
+        """Replace a user's stored password hash."""
+        updated = self.db.query(UserModel).filter(UserModel.id == user_id).update(
+            {UserModel.password_hash: password_hash}
+        )
+        self.db.commit()
+        return updated > 0
+    
+    def revoke_token(self, token_id: str, expires_at: int, now: Optional[float] = None) -> None:
+        """Record a logged-out token until it expires, pruning expired records."""
+        now = now if now is not None else datetime.now(timezone.utc).timestamp()
+        self.db.query(RevokedTokenModel).filter(RevokedTokenModel.expires_at <= now).delete()
+        self.db.merge(RevokedTokenModel(token_id=token_id, expires_at=expires_at))
+        self.db.commit()
+    
     # Leaderboard operations
     def add_score(
         self, username: str, score: int, mode: GameMode
     ) -> tuple[LeaderboardEntryModel, int]:
         """
         Add a score to the leaderboard and return the entry with its rank.
+        The rank comes from the in-memory rank index rather than a COUNT query;
+        the player's best score is upserted in the same transaction.
         Returns: (LeaderboardEntryModel, rank)
         """
+        leaderboard_index.ensure_warm(self.db)
+        player_index.ensure_warm(self.db)
+        
         entry_id = str(uuid.uuid4())
         entry = LeaderboardEntryModel(
             id=entry_id,
@@ -57,48 +84,165 @@ class DatabaseService:
             mode=mode,
             date=date.today()
         )
+        ranked = RankedEntry.from_model(entry)
         self.db.add(entry)
+        self._upsert_best_scores([ranked])
         self.db.commit()
-        self.db.refresh(entry)
         
-        # Calculate rank
-        rank = self.db.query(func.count(LeaderboardEntryModel.id)).filter(
-            LeaderboardEntryModel.score > score,
-            LeaderboardEntryModel.mode == mode
-        ).scalar() + 1
+        # No refresh needed: the index is fed from the values just written
+        rank = leaderboard_index.add(ranked)
+        player_index.offer(ranked)
+        leaderboard_cache.invalidate_score(mode, score)
+        coordinator.score_added(ranked)
         
         return entry, rank
     
+    def insert_scores(self, entries: List[RankedEntry]) -> None:
+        """
+        Bulk insert already-ranked entries and their players' best scores in a
+        single transaction. The in-memory indexes are left to the caller.
+        """
+        self.db.execute(insert(LeaderboardEntryModel), [
+            {
+                "id": entry.id,
+                "username": entry.username,
+                "score": entry.score,
+                "mode": entry.mode,
+                "date": entry.date,
+            }
+            for entry in entries
+        ])
+        self._upsert_best_scores(entries)
+        self.db.commit()
+    
+    def _upsert_best_scores(self, entries: List[RankedEntry]) -> None:
+        """Raise each player's stored best where one of ``entries`` beats it."""
+        best = {}
+        for entry in entries:
+            key = (entry.username, entry.mode)
+            # One row per key: a single upsert may not touch a row twice
+            if key not in best or entry.sort_score < best[key].sort_score:
+                best[key] = entry
+        
+        dialect = postgresql if self.db.get_bind().dialect.name == "postgresql" else sqlite
+        statement = dialect.insert(PlayerBestScoreModel).values([
+            {
+                "username": entry.username,
+                "mode": entry.mode,
+                "best_score": entry.score,
+                "entry_id": entry.id,
+                "achieved_at": entry.date,
+            }
+            for entry in best.values()
+        ])
+        excluded = statement.excluded
+        self.db.execute(statement.on_conflict_do_update(
+            index_elements=[PlayerBestScoreModel.username, PlayerBestScoreModel.mode],
+            set_={
+                "best_score": excluded.best_score,
+                "entry_id": excluded.entry_id,
+                "achieved_at": excluded.achieved_at,
+            },
+            # Equal scores keep the earlier best
+            where=PlayerBestScoreModel.best_score < excluded.best_score,
+        ))
+    
     def get_leaderboard(
-        self, mode: Optional[GameMode] = None, limit: int = 100
-    ) -> List[LeaderboardEntryModel]:
-        """Get leaderboard entries, optionally filtered by game mode."""
-        query = self.db.query(LeaderboardEntryModel).order_by(
-            LeaderboardEntryModel.score.desc()
+        self,
+        mode: Optional[GameMode] = None,
+        limit: int = 100,
+        window: LeaderboardWindow = LeaderboardWindow.ALL,
+    ) -> List[RankedEntry]:
+        """
+        Get the top leaderboard entries from the rank index, optionally filtered
+        by game mode. ``window`` limits them to today's or this week's scores.
+        """
+        leaderboard_index.ensure_warm(self.db)
+        return leaderboard_index.top(mode, limit, window)
+    
+    def get_leaderboard_page(
+        self,
+        mode: Optional[GameMode],
+        after: Optional[tuple[int, str]],
+        limit: int = 100,
+        window: LeaderboardWindow = LeaderboardWindow.ALL,
+    ) -> List[RankedEntry]:
+        """
+        Entries ranked below the ``(score, id)`` cursor ``after``, best first.
+        Served by a range scan of the rank index, so deep pages cost the same
+        as the first one.
+        """
+        leaderboard_index.ensure_warm(self.db)
+        key = (-after[0], after[1]) if after else None
+        return leaderboard_index.page(mode, key, limit, window)
+    
+    def get_user_best_entry(
+        self, username: str, mode: Optional[GameMode] = None
+    ) -> Optional[LeaderboardEntryModel]:
+        """
+        Get a user's highest scoring entry: a primary key lookup in
+        player_best_scores, however many games the user has played.
+        """
+        query = self.db.query(PlayerBestScoreModel).filter(
+            PlayerBestScoreModel.username == username
         )
         if mode:
-            query = query.filter(LeaderboardEntryModel.mode == mode)
-        return query.limit(limit).all()
+            query = query.filter(PlayerBestScoreModel.mode == mode)
+        best = query.order_by(
+            PlayerBestScoreModel.best_score.desc(), PlayerBestScoreModel.achieved_at
+        ).first()
+        if not best:
+            return None
+        return self.db.get(LeaderboardEntryModel, best.entry_id)
+    
+    def get_player_leaderboard(
+        self, mode: Optional[GameMode], after: Optional[tuple[int, str]], limit: int = 100
+    ) -> List[tuple[int, PlayerBest]]:
+        """
+        One row per player, best first, after the ``(score, username)`` cursor.
+        Without a mode each player appears once with their best in any mode.
+        Returns: [(rank, PlayerBest), ...]
+        """
+        player_index.ensure_warm(self.db)
+        key = (-after[0], after[1]) if after else None
+        return [
+            (player_index.rank(mode, best.score), best)
+            for best in player_index.page(mode, key, limit)
+        ]
+    
+    def get_player_rank(
+        self, username: str, mode: Optional[GameMode] = None
+    ) -> Optional[tuple[int, PlayerBest]]:
+        """A player's best and its rank among players, or None without scores."""
+        player_index.ensure_warm(self.db)
+        best = player_index.get(mode, username)
+        if best is None:
+            return None
+        return player_index.rank(mode, best.score), best
     
     def get_user_leaderboard_position(
         self, username: str, mode: Optional[GameMode] = None
     ) -> Optional[int]:
-        """Get user's rank in leaderboard."""
-        query = self.db.query(LeaderboardEntryModel).filter(
-            LeaderboardEntryModel.username == username
-        )
-        if mode:
-            query = query.filter(LeaderboardEntryModel.mode == mode)
-        
-        entry = query.order_by(LeaderboardEntryModel.score.desc()).first()
+        """Get the rank of a user's best score, within ``mode`` if given."""
+        entry = self.get_user_best_entry(username, mode)
         if not entry:
             return None
-        
-        rank = self.db.query(func.count(LeaderboardEntryModel.id)).filter(
-            LeaderboardEntryModel.score > entry.score
-        ).scalar() + 1
-        
-        return rank
+        leaderboard_index.ensure_warm(self.db)
+        return leaderboard_index.rank(mode, entry.score)
+    
+    def get_leaderboard_around(
+        self, username: str, mode: Optional[GameMode] = None, radius: int = 10
+    ) -> Optional[List[tuple[int, RankedEntry]]]:
+        """
+        A user's best entry with up to ``radius`` entries above and below it.
+        Returns: [(rank, entry), ...] best first, or None if the user has no scores
+        """
+        best = self.get_user_best_entry(username, mode)
+        if not best:
+            return None
+        leaderboard_index.ensure_warm(self.db)
+        window = leaderboard_index.around(mode, RankedEntry.from_model(best), radius, radius)
+        return [(leaderboard_index.rank(mode, entry.score), entry) for entry in window]
     
     # Game session operations
     def create_session(
@@ -116,13 +260,29 @@ class DatabaseService:
         self.db.add(session)
         self.db.commit()
         self.db.refresh(session)
+        session_hub.publish(CREATED, session)
         return session
     
-    def get_live_sessions(self) -> List[GameSessionModel]:
-        """Get all live game sessions."""
-        return self.db.query(GameSessionModel).filter(
-            GameSessionModel.is_live == True
-        ).all()
+    def get_live_sessions(
+        self, limit: Optional[int] = None, after: Optional[str] = None
+    ) -> List[GameSessionModel]:
+        """
+        Get live game sessions ordered by id, optionally only those after the
+        session id ``after`` and at most ``limit`` of them.
+        """
+        query = self.db.query(GameSessionModel).filter(GameSessionModel.is_live == True)
+        if after is not None:
+            query = query.filter(GameSessionModel.id > after)
+        if limit is None:
+            return query.all()
+        return query.order_by(GameSessionModel.id).limit(limit).all()
+    
+    def warm_session_hub(self) -> None:
+        """Seed the live-session hub from the database if it is still cold."""
+        if not session_hub.is_warm:
+            session_hub.warm(self.get_live_sessions())
+            # Streams hold their session open; don't keep a connection with it
+            self.db.rollback()
     
     def get_session_by_id(self, session_id: str) -> Optional[GameSessionModel]:
         """Retrieve a game session by ID."""
@@ -130,25 +290,53 @@ class DatabaseService:
             GameSessionModel.id == session_id
         ).first()
     
+    def heartbeat_session(self, session_id: str, score: int) -> Optional[LiveSession]:
+        """
+        Record a live score tick in memory; the database only sees periodic
+        checkpoints. Loads the session on its first tick in this process.
+        Returns None if the session does not exist or is closed.
+        """
+        record = live_sessions.heartbeat(session_id, score)
+        if record is None:
+            session = self.get_session_by_id(session_id)
+            if session is None or not session.is_live:
+                return None
+            live_sessions.track(session)
+            self.db.rollback()
+            record = live_sessions.heartbeat(session_id, score)
+        return record
+    
     def update_session(
         self, session_id: str, score: int, is_live: bool
     ) -> Optional[GameSessionModel]:
         """Update a game session."""
+        # A direct write supersedes any unsaved in-memory ticks
+        live_sessions.pop(session_id)
         session = self.get_session_by_id(session_id)
         if session:
             session.score = score
             session.is_live = is_live
+            session.last_seen = datetime.now(timezone.utc)
             self.db.commit()
             self.db.refresh(session)
+            session_hub.publish(UPDATED if is_live else CLOSED, session)
         return session
     
-    def close_session(self, session_id: str) -> Optional[GameSessionModel]:
-        """Close a game session."""
+    def close_session(
+        self, session_id: str, score: Optional[int] = None
+    ) -> Optional[GameSessionModel]:
+        """Close a game session, persisting its final (or latest in-memory) score."""
+        record = live_sessions.pop(session_id)
+        if score is None and record is not None:
+            score = record.score
         session = self.get_session_by_id(session_id)
         if session:
+            if score is not None:
+                session.score = score
             session.is_live = False
             self.db.commit()
             self.db.refresh(session)
+            session_hub.publish(CLOSED, session)
         return session
     
     def get_sessions_by_username(self, username: str) -> List[GameSessionModel]:
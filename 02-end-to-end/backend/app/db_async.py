@@ -0,0 +1,78 @@
+"""
+Non-blocking access to DatabaseService from async route handlers.
+
+``AsyncDatabaseService`` is the async twin of ``DatabaseService``: every
+method of the sync service is available as a coroutine and runs through
+``AsyncSession.run_sync``, so the ORM code lives in one place while the
+event loop only waits on the async driver (asyncpg/aiosqlite).
+
+With a sync ``DATABASE_URL`` the same interface is provided by
+``ThreadedDatabaseService``, which runs each call in the threadpool instead.
+Routes depend on ``get_db_service`` and always ``await`` the service.
+"""
+from abc import ABC, abstractmethod
+from functools import partial
+from typing import Union
+
+from fastapi import Depends
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from .database import get_async_db, get_db, is_async
+from .db import DatabaseService
+
+
+class _ServiceProxy(ABC):
+    """Expose DatabaseService methods as coroutines."""
+
+    def __getattr__(self, name: str):
+        method = getattr(DatabaseService, name, None)
+        if name.startswith("_") or not callable(method):
+            raise AttributeError(name)
+
+        async def call(*args, **kwargs):
+            return await self._run(name, *args, **kwargs)
+
+        call.__name__ = name
+        call.__doc__ = method.__doc__
+        return call
+
+    @abstractmethod
+    async def _run(self, name: str, *args, **kwargs):
+        """Call DatabaseService method ``name`` and return its result."""
+
+
+class AsyncDatabaseService(_ServiceProxy):
+    """DatabaseService over an ``AsyncSession``."""
+
+    def __init__(self, db):
+        self.db = db
+
+    async def _run(self, name: str, *args, **kwargs):
+        def call(session: Session):
+            return getattr(DatabaseService(session), name)(*args, **kwargs)
+        return await self.db.run_sync(call)
+
+
+class ThreadedDatabaseService(_ServiceProxy):
+    """DatabaseService over a sync ``Session``, one threadpool hop per call."""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self._service = DatabaseService(db)
+
+    async def _run(self, name: str, *args, **kwargs):
+        return await run_in_threadpool(partial(getattr(self._service, name), *args, **kwargs))
+
+
+AnyDatabaseService = Union[AsyncDatabaseService, ThreadedDatabaseService]
+
+
+if is_async:
+    async def get_db_service(db=Depends(get_async_db)) -> AnyDatabaseService:
+        """Dependency providing the database service for the configured driver."""
+        return AsyncDatabaseService(db)
+else:
+    async def get_db_service(db: Session = Depends(get_db)) -> AnyDatabaseService:
+        """Dependency providing the database service for the configured driver."""
+        return ThreadedDatabaseService(db)
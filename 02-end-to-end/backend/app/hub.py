@@ -0,0 +1,198 @@
+"""
+In-process pub/sub hub for live game session updates.
+
+``DatabaseService`` publishes an event whenever a session is created,
+updated or closed. The hub serializes each event once, keeps a mirror of the
+live sessions for snapshots, and fans the event out to every subscriber of
+``/sessions/stream``.
+
+Each subscriber has its own pending buffer keyed by session id, so rapid
+score updates to one session coalesce into the latest state instead of
+queueing up. A subscriber that falls more than ``max_pending`` sessions
+behind is dropped back to a fresh snapshot rather than buffering without
+bound.
+"""
+import asyncio
+import json
+import threading
+from collections import OrderedDict
+from typing import Callable, Iterable, List, Optional
+
+from .models import GameSession, GameSessionModel
+
+CREATED = "created"
+UPDATED = "updated"
+CLOSED = "closed"
+SNAPSHOT = "snapshot"
+
+
+def session_payload(session: GameSessionModel) -> dict:
+    return GameSession(
+        id=session.id,
+        username=session.username,
+        score=session.score,
+        mode=session.mode,
+        isLive=session.is_live,
+    ).model_dump(mode="json")
+
+
+class HubEvent:
+    """A published event, serialized once and shared by all subscribers."""
+
+    __slots__ = ("type", "session_id", "payload", "data")
+
+    def __init__(self, type: str, session_id: Optional[str], payload, data: str):
+        self.type = type
+        self.session_id = session_id
+        self.payload = payload
+        self.data = data
+
+    @classmethod
+    def build(cls, type: str, session_id: Optional[str], payload) -> "HubEvent":
+        key = "sessions" if type == SNAPSHOT else "session"
+        return cls(type, session_id, payload, json.dumps({"type": type, key: payload}))
+
+
+class Subscriber:
+    """One stream client's view of the hub."""
+
+    def __init__(self, hub: "SessionHub", loop: asyncio.AbstractEventLoop, max_pending: int):
+        self._hub = hub
+        self._loop = loop
+        self._max_pending = max_pending
+        self._pending: "OrderedDict[str, HubEvent]" = OrderedDict()
+        self._needs_snapshot = True
+        self._wakeup = asyncio.Event()
+        self._wakeup.set()
+
+    def _push(self, event: HubEvent) -> bool:
+        """Queue an event (hub lock held). Returns True if it coalesced."""
+        if self._needs_snapshot:
+            # The snapshot taken at delivery time will include this change
+            return True
+        previous = self._pending.pop(event.session_id, None)
+        if previous is not None and previous.type == CREATED and event.type == UPDATED:
+            # The client has not seen the session yet; deliver it as created
+            event = HubEvent.build(CREATED, event.session_id, event.payload)
+        self._pending[event.session_id] = event
+        if len(self._pending) > self._max_pending:
+            self._pending.clear()
+            self._needs_snapshot = True
+            self._hub._overflows += 1
+        self._wake()
+        return previous is not None
+
+    def _wake(self) -> None:
+        try:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        except RuntimeError:
+            # Event loop already closed; the subscriber is going away
+            pass
+
+    async def next_events(self, timeout: Optional[float] = None) -> List[HubEvent]:
+        """Wait for pending events; returns [] if ``timeout`` passes first."""
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        with self._hub._lock:
+            self._wakeup.clear()
+            if self._needs_snapshot:
+                self._needs_snapshot = False
+                self._pending.clear()
+                return [self._hub._snapshot_event()]
+            events = list(self._pending.values())
+            self._pending.clear()
+            return events
+
+
+class SessionHub:
+    """Fans out session events to stream subscribers."""
+
+    def __init__(self, max_pending: int = 1000):
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._subscribers: List[Subscriber] = []
+        self._live: "OrderedDict[str, dict]" = OrderedDict()
+        self._snapshot: Optional[HubEvent] = None
+        self._warm = False
+        self._published = 0
+        self._coalesced = 0
+        self._overflows = 0
+        # Called with (type, payload) for each local publish, to reach the
+        # hubs of other worker processes (see app.coordination)
+        self.relay: Optional[Callable[[str, dict], None]] = None
+
+    @property
+    def is_warm(self) -> bool:
+        return self._warm
+
+    def warm(self, sessions: Iterable[GameSessionModel]) -> None:
+        """Seed the live-session mirror; events already seen take precedence."""
+        with self._lock:
+            for session in sessions:
+                self._live.setdefault(session.id, session_payload(session))
+            self._snapshot = None
+            self._warm = True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._live.clear()
+            self._snapshot = None
+            self._warm = False
+
+    def subscribe(self) -> Subscriber:
+        """Register a subscriber; must be called from its event loop."""
+        subscriber = Subscriber(self, asyncio.get_running_loop(), self.max_pending)
+        with self._lock:
+            self._subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        with self._lock:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+
+    def publish(self, type: str, session: GameSessionModel) -> None:
+        """Record a session change and fan it out. Safe from any thread."""
+        payload = session_payload(session)
+        self.apply(type, payload)
+        if self.relay is not None:
+            self.relay(type, payload)
+
+    def apply(self, type: str, payload: dict) -> None:
+        """Fan out an already serialized change, e.g. one relayed from another worker."""
+        event = HubEvent.build(type, payload["id"], payload)
+        with self._lock:
+            if type != CLOSED and payload["isLive"]:
+                self._live[payload["id"]] = payload
+            else:
+                self._live.pop(payload["id"], None)
+            self._snapshot = None
+            self._published += 1
+            for subscriber in self._subscribers:
+                if subscriber._push(event):
+                    self._coalesced += 1
+
+    def _snapshot_event(self) -> HubEvent:
+        # Built lazily and shared until the next publish (hub lock held)
+        if self._snapshot is None:
+            self._snapshot = HubEvent.build(SNAPSHOT, None, list(self._live.values()))
+        return self._snapshot
+
+    def snapshot(self) -> List[dict]:
+        with self._lock:
+            return list(self._live.values())
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "subscribers": len(self._subscribers),
+                "live_sessions": len(self._live),
+                "published": self._published,
+                "coalesced": self._coalesced,
+                "overflows": self._overflows,
+            }
+
+
+session_hub = SessionHub()
@@ -0,0 +1,249 @@
+"""
+SQL statement instrumentation and request metrics.
+
+Listeners on every SQLAlchemy ``Engine`` count the statements each request
+runs and how long they take. The count lives in a request-scoped context
+variable set by ``InstrumentationMiddleware``, so statements executed in the
+threadpool or through ``AsyncSession`` are attributed to the request that
+caused them. Statements outside a request (startup, the write-behind flusher)
+are counted under the ``background`` route.
+
+Each response gets a ``Server-Timing`` header, e.g.
+``db;dur=1.42;desc="3 queries", app;dur=4.87``, and the totals per route are
+exported with the rest of the process stats by ``GET /metrics``.
+
+    SLOW_QUERY_MS    log statements slower than this many milliseconds at
+                     WARNING, with bound parameters redacted (default 200;
+                     0 disables the log)
+    SERVER_TIMING    set to "false" to leave out the Server-Timing header
+"""
+import contextvars
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+BACKGROUND = "background"
+UNMATCHED = "unmatched"
+
+SLOW_QUERY_SECONDS = float(os.getenv("SLOW_QUERY_MS", 200)) / 1000
+SERVER_TIMING = os.getenv("SERVER_TIMING", "true").lower() != "false"
+
+
+class RequestStats:
+    """Statements run while handling one request."""
+
+    __slots__ = ("statements", "db_seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+
+
+_current: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar(
+    "request_stats", default=None
+)
+
+
+def current_stats() -> Optional[RequestStats]:
+    """Stats of the request being handled, or None outside a request."""
+    return _current.get()
+
+
+class RouteMetrics:
+    """Request, statement and timing totals per route."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # route -> [requests, request_seconds, statements, db_seconds]
+        self._routes: Dict[str, list] = {}
+        self._slow_queries = 0
+
+    def record_request(self, route: str, seconds: float, stats: RequestStats) -> None:
+        with self._lock:
+            totals = self._routes.setdefault(route, [0, 0.0, 0, 0.0])
+            totals[0] += 1
+            totals[1] += seconds
+            totals[2] += stats.statements
+            totals[3] += stats.db_seconds
+
+    def record_background(self, seconds: float) -> None:
+        with self._lock:
+            totals = self._routes.setdefault(BACKGROUND, [0, 0.0, 0, 0.0])
+            totals[2] += 1
+            totals[3] += seconds
+
+    def record_slow_query(self) -> None:
+        with self._lock:
+            self._slow_queries += 1
+
+    def routes(self) -> Dict[str, dict]:
+        with self._lock:
+            return {
+                route: {
+                    "requests": requests,
+                    "request_seconds": request_seconds,
+                    "statements": statements,
+                    "db_seconds": db_seconds,
+                }
+                for route, (requests, request_seconds, statements, db_seconds) in self._routes.items()
+            }
+
+    def slow_queries(self) -> int:
+        with self._lock:
+            return self._slow_queries
+
+    def clear(self) -> None:
+        with self._lock:
+            self._routes.clear()
+            self._slow_queries = 0
+
+
+route_metrics = RouteMetrics()
+
+
+def redact_parameters(parameters) -> str:
+    """Describe bound parameters by type only, never by value."""
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{key}: {type(value).__name__}" for key, value in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            return f"<{len(parameters)} rows>"
+        return "(" + ", ".join(type(value).__name__ for value in parameters) + ")"
+    return type(parameters).__name__
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_seconds += elapsed
+    else:
+        route_metrics.record_background(elapsed)
+
+    if SLOW_QUERY_SECONDS and elapsed >= SLOW_QUERY_SECONDS:
+        route_metrics.record_slow_query()
+        logger.warning(
+            "Slow query (%.1f ms): %s params=%s",
+            elapsed * 1000, " ".join(statement.split()), redact_parameters(parameters),
+        )
+
+
+def _route_label(scope) -> str:
+    # FastAPI records the matched route in the scope while routing
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    return f"{scope['method']} {path}" if path else UNMATCHED
+
+
+def server_timing(stats: RequestStats, seconds: float) -> str:
+    return (
+        f'db;dur={stats.db_seconds * 1000:.2f};desc="{stats.statements} queries", '
+        f"app;dur={seconds * 1000:.2f}"
+    )
+
+
+class InstrumentationMiddleware:
+    """ASGI middleware that scopes statement counting to each HTTP request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+
+        async def send_with_timing(message):
+            # Streaming responses report what ran before their first chunk
+            if message["type"] == "http.response.start" and SERVER_TIMING:
+                headers = list(message.get("headers", []))
+                headers.append((
+                    b"server-timing",
+                    server_timing(stats, time.perf_counter() - start).encode(),
+                ))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            route_metrics.record_request(_route_label(scope), time.perf_counter() - start, stats)
+
+
+class MetricsRegistry:
+    """
+    Named callables returning a flat dict of numbers, rendered for Prometheus.
+    Keys listed in ``counters`` only ever increase (until a restart) and are
+    exported as counters with a ``_total`` suffix, so ``rate()`` handles
+    resets; the rest are gauges.
+    """
+
+    def __init__(self, namespace: str = "snake"):
+        self.namespace = namespace
+        self._collectors: Dict[str, Tuple[Callable[[], dict], FrozenSet[str]]] = {}
+
+    def register(self, name: str, collect: Callable[[], dict], counters: Iterable[str] = ()) -> None:
+        self._collectors[name] = (collect, frozenset(counters))
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        self._render_routes(lines)
+        for name, (collect, counters) in self._collectors.items():
+            for key, value in collect().items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                metric = f"{self.namespace}_{name}_{key}"
+                if key in counters:
+                    if not metric.endswith("_total"):
+                        metric += "_total"
+                    lines.append(f"# TYPE {metric} counter")
+                else:
+                    lines.append(f"# TYPE {metric} gauge")
+                lines.append(f"{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+    def _render_routes(self, lines: List[str]) -> None:
+        routes = route_metrics.routes()
+        series = (
+            ("http_requests_total", "requests", "HTTP requests handled"),
+            ("http_request_duration_seconds_total", "request_seconds", "Time spent handling requests"),
+            ("db_statements_total", "statements", "SQL statements executed"),
+            ("db_duration_seconds_total", "db_seconds", "Time spent executing SQL statements"),
+        )
+        for suffix, field, help_text in series:
+            metric = f"{self.namespace}_{suffix}"
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} counter")
+            for route, totals in sorted(routes.items()):
+                if field.startswith("request") and route == BACKGROUND:
+                    continue
+                label = route.replace("\\", "\\\\").replace('"', '\\"')
+                lines.append(f'{metric}{{route="{label}"}} {totals[field]}')
+
+        metric = f"{self.namespace}_db_slow_queries_total"
+        lines.append(f"# HELP {metric} Statements slower than SLOW_QUERY_MS")
+        lines.append(f"# TYPE {metric} counter")
+        lines.append(f"{metric} {route_metrics.slow_queries()}")
+
+
+metrics_registry = MetricsRegistry()
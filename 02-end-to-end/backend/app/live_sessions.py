@@ -0,0 +1,236 @@
+"""
+In-memory store for live game session scores.
+
+``PATCH /sessions/{id}`` score ticks only touch a compact record here (and
+publish to the session hub); the database sees one bulk UPDATE per
+checkpoint for the sessions that changed, and a final write when the game is
+closed. A background thread runs the checkpoints and closes games that stop
+sending heartbeats:
+
+    LIVE_SESSION_CHECKPOINT_INTERVAL   seconds between checkpoints (default 5)
+    LIVE_SESSION_TTL                   seconds without a heartbeat before a
+                                       game is closed as abandoned (default 60)
+
+A crash loses at most one checkpoint interval of score ticks; the sessions
+stay live in the database with their last checkpointed score.
+"""
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import bindparam, update
+from sqlalchemy.orm import Session
+
+from .database import SessionLocal
+from .hub import CLOSED, UPDATED, session_hub
+from .models import GameMode, GameSessionModel
+
+logger = logging.getLogger(__name__)
+
+_sessions = GameSessionModel.__table__
+
+
+def _timestamp(seconds: float) -> datetime:
+    return datetime.fromtimestamp(seconds, timezone.utc)
+
+
+class LiveSession:
+    """One live game. Duck-types GameSessionModel for the session hub."""
+
+    __slots__ = ("id", "username", "mode", "score", "is_live", "last_seen", "version", "saved_version")
+
+    def __init__(self, id: str, username: str, mode: GameMode, score: int):
+        self.id = id
+        self.username = username
+        self.mode = mode
+        self.score = score
+        self.is_live = True
+        # Wall clock, since it is persisted to game_sessions.last_seen
+        self.last_seen = time.time()
+        # Bumped per tick; equal to saved_version once checkpointed
+        self.version = 0
+        self.saved_version = 0
+
+
+class LiveSessionStore:
+    """Live session records keyed by session id."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        checkpoint_interval: float = 5.0,
+        ttl: float = 60.0,
+    ):
+        self.session_factory = session_factory
+        self.checkpoint_interval = checkpoint_interval
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._records: Dict[str, LiveSession] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._heartbeats = 0
+        self._checkpoints = 0
+        self._checkpointed_rows = 0
+        self._expired = 0
+
+    @classmethod
+    def from_env(cls, session_factory: Callable[[], Session]) -> "LiveSessionStore":
+        return cls(
+            session_factory,
+            checkpoint_interval=float(os.getenv("LIVE_SESSION_CHECKPOINT_INTERVAL", 5)),
+            ttl=float(os.getenv("LIVE_SESSION_TTL", 60)),
+        )
+
+    def get(self, session_id: str) -> Optional[LiveSession]:
+        with self._lock:
+            return self._records.get(session_id)
+
+    def track(self, session: GameSessionModel) -> LiveSession:
+        """Start tracking a live session loaded from the database."""
+        with self._lock:
+            record = self._records.get(session.id)
+            if record is None:
+                record = LiveSession(session.id, session.username, session.mode, session.score)
+                self._records[session.id] = record
+            return record
+
+    def heartbeat(self, session_id: str, score: int) -> Optional[LiveSession]:
+        """Record a score tick; None if the session is not tracked."""
+        with self._lock:
+            record = self._records.get(session_id)
+            if record is None:
+                return None
+            record.score = score
+            record.last_seen = time.time()
+            record.version += 1
+            self._heartbeats += 1
+        session_hub.publish(UPDATED, record)
+        return record
+
+    def observe(self, session_id: str, score: int, is_live: bool) -> None:
+        """
+        Apply a change another worker made to a session this one also tracks.
+        Its score is that worker's to checkpoint, so the record is left clean.
+        """
+        with self._lock:
+            record = self._records.get(session_id)
+            if record is None:
+                return
+            if not is_live:
+                del self._records[session_id]
+                return
+            record.score = score
+            record.last_seen = time.time()
+            record.saved_version = record.version
+
+    def pop(self, session_id: str) -> Optional[LiveSession]:
+        """Stop tracking a session (it is being closed or written directly)."""
+        with self._lock:
+            return self._records.pop(session_id, None)
+
+    def checkpoint(self, db: Session) -> int:
+        """Write changed scores in one bulk UPDATE. Returns rows written."""
+        with self._lock:
+            changed = [
+                (record, record.version, record.score, record.last_seen)
+                for record in self._records.values()
+                if record.version != record.saved_version
+            ]
+        if not changed:
+            return 0
+        db.execute(
+            update(_sessions)
+            .where(_sessions.c.id == bindparam("session_id"), _sessions.c.is_live == True)
+            .values(score=bindparam("new_score"), last_seen=bindparam("seen_at")),
+            [
+                {"session_id": record.id, "new_score": score, "seen_at": _timestamp(seen)}
+                for record, _, score, seen in changed
+            ],
+        )
+        db.commit()
+        with self._lock:
+            for record, version, _, _ in changed:
+                # Ticks that arrived meanwhile stay dirty for the next checkpoint
+                record.saved_version = max(record.saved_version, version)
+            self._checkpoints += 1
+            self._checkpointed_rows += len(changed)
+        return len(changed)
+
+    def expire(self, db: Session, now: Optional[float] = None) -> int:
+        """Close sessions without a heartbeat for ``ttl`` seconds."""
+        deadline = (now if now is not None else time.time()) - self.ttl
+        with self._lock:
+            expired = [record for record in self._records.values() if record.last_seen < deadline]
+            for record in expired:
+                del self._records[record.id]
+        if not expired:
+            return 0
+        db.execute(
+            update(_sessions)
+            .where(_sessions.c.id == bindparam("session_id"))
+            .values(score=bindparam("final_score"), is_live=False),
+            [{"session_id": record.id, "final_score": record.score} for record in expired],
+        )
+        db.commit()
+        for record in expired:
+            record.is_live = False
+            session_hub.publish(CLOSED, record)
+        with self._lock:
+            self._expired += len(expired)
+        return len(expired)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="live-session-checkpoint", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.checkpoint_interval):
+            self._persist()
+
+    def _persist(self) -> None:
+        db = self.session_factory()
+        try:
+            self.expire(db)
+            self.checkpoint(db)
+        except Exception:
+            db.rollback()
+            logger.exception("Checkpointing live sessions failed")
+        finally:
+            db.close()
+
+    def stop(self, timeout: Optional[float] = 10.0) -> None:
+        """Stop the background thread after a final checkpoint."""
+        thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._stop.set()
+        thread.join(timeout)
+        self._persist()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._records.clear()
+
+    def live(self) -> List[LiveSession]:
+        with self._lock:
+            return list(self._records.values())
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "tracked": len(self._records),
+                "dirty": sum(1 for r in self._records.values() if r.version != r.saved_version),
+                "heartbeats": self._heartbeats,
+                "checkpoints": self._checkpoints,
+                "checkpointed_rows": self._checkpointed_rows,
+                "expired": self._expired,
+            }
+
+
+live_sessions = LiveSessionStore.from_env(SessionLocal)
@@ -1,17 +1,78 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from pathlib import Path
-from .database import init_db
-from .routers import auth, leaderboard, sessions
+from .database import async_engine, engine, init_db, pool_stats, POOL_COUNTERS, SessionLocal
+from .routers import auth, leaderboard, metrics, sessions
 from .db import DatabaseService
 from .models import GameMode
+from .ranking import leaderboard_index, player_index
+from .passwords import password_hasher
+from .write_behind import score_writer
+from .live_sessions import live_sessions
+from .session_reaper import session_reaper
+from .coordination import coordinator
+from .cache import leaderboard_cache
+from .hub import session_hub
+from .instrumentation import InstrumentationMiddleware, metrics_registry
+from .static_files import StaticManifest
+from .tokens import token_signer, user_cache
 from datetime import date
 
+logger = logging.getLogger(__name__)
+
+# Seconds between drops of expired daily/weekly leaderboard buckets
+LEADERBOARD_COMPACT_INTERVAL = float(os.getenv("LEADERBOARD_COMPACT_INTERVAL", 300))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize the database and run the background workers for the app's lifetime."""
+    # app.serve does this once before forking its workers
+    if not getattr(app.state, "preloaded", False):
+        init_db()
+        _warm_leaderboard_index()
+    coordinator.start()
+    # After subscribing, so no revocation falls between the load and the broadcasts
+    _load_revoked_tokens()
+    if score_writer.enabled:
+        score_writer.start()
+    live_sessions.start()
+    background = [
+        asyncio.create_task(_compact_leaderboard_windows()),
+        asyncio.create_task(session_reaper.run()),
+    ]
+    # Sample data disabled - database should start empty
+    # _init_sample_data()
+    try:
+        yield
+    finally:
+        for task in background:
+            task.cancel()
+        await asyncio.gather(*background, return_exceptions=True)
+        # Flush queued scores before the process exits
+        score_writer.drain()
+        # Persist the latest live scores
+        live_sessions.stop()
+        coordinator.stop()
+        password_hasher.shutdown()
+
+
+def preload() -> None:
+    """Initialize the database and warm the rank indexes before workers are forked."""
+    init_db()
+    _warm_leaderboard_index()
+    app.state.preloaded = True
+
+
 app = FastAPI(
     title="Snake Arena API",
     description="Backend API for Snake Arena",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Configure CORS
@@ -21,19 +82,70 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Next-Cursor"],
 )
 
-# Initialize database on startup
-@app.on_event("startup")
-def on_startup():
-    init_db()
-    # Sample data disabled - database should start empty
-    # _init_sample_data()
+# Count SQL statements per request (Server-Timing header, GET /metrics)
+app.add_middleware(InstrumentationMiddleware)
+
+metrics_registry.register(
+    "password_hasher", password_hasher.stats, counters=("completed", "rejected", "seconds_total")
+)
+metrics_registry.register(
+    "leaderboard_cache", leaderboard_cache.stats, counters=("hits", "misses", "evictions", "invalidations")
+)
+metrics_registry.register("session_hub", session_hub.stats, counters=("published", "coalesced", "overflows"))
+metrics_registry.register(
+    "score_writer", score_writer.stats, counters=("flushed_rows", "flushes", "failures", "dropped")
+)
+metrics_registry.register(
+    "live_sessions", live_sessions.stats, counters=("heartbeats", "checkpoints", "checkpointed_rows", "expired")
+)
+metrics_registry.register("leaderboard_index", leaderboard_index.stats, counters=("compacted_buckets",))
+metrics_registry.register("player_index", lambda: {"players": player_index.count()})
+metrics_registry.register("session_reaper", session_reaper.stats, counters=("sweeps", "reaped", "failures"))
+metrics_registry.register("coordination", coordinator.stats, counters=("sent", "dropped", "received", "failed"))
+metrics_registry.register("auth_tokens", token_signer.stats, counters=("issued", "verified", "rejected"))
+metrics_registry.register("user_cache", user_cache.stats, counters=("hits", "misses"))
+metrics_registry.register("db_pool", lambda: pool_stats(engine), counters=POOL_COUNTERS)
+if async_engine is not None:
+    metrics_registry.register("db_async_pool", lambda: pool_stats(async_engine), counters=POOL_COUNTERS)
+
+
+async def _compact_leaderboard_windows():
+    """Periodically drop rollup buckets of days and weeks that have ended."""
+    while True:
+        await asyncio.sleep(LEADERBOARD_COMPACT_INTERVAL)
+        try:
+            dropped = leaderboard_index.compact()
+        except Exception:
+            logger.exception("Compacting leaderboard windows failed")
+            continue
+        if dropped:
+            logger.info("Dropped %d expired leaderboard window buckets", dropped)
+
+
+def _warm_leaderboard_index():
+    """Load existing leaderboard entries and player bests into the in-memory rank indexes."""
+    db = SessionLocal()
+    try:
+        leaderboard_index.warm(db)
+        player_index.warm(db)
+    finally:
+        db.close()
+
+
+def _load_revoked_tokens():
+    """Load the stored token revocations into this worker's revocation list."""
+    db = SessionLocal()
+    try:
+        token_signer.warm(db)
+    finally:
+        db.close()
 
 
 def _init_sample_data():
     """Initialize sample data if database is empty."""
-    from .database import SessionLocal
     from .models import UserModel, LeaderboardEntryModel, GameSessionModel
     
     db = SessionLocal()
@@ -105,35 +217,26 @@ def _init_sample_data():
 app.include_router(auth.router)
 app.include_router(leaderboard.router)
 app.include_router(sessions.router)
+app.include_router(metrics.router)
+
+# Serve the frontend build as fallback, from a manifest built once at import
+# (before app.serve forks). This should be LAST so API routes take precedence
+static_files = StaticManifest.from_env(Path(__file__).parent / "static")
+metrics_registry.register(
+    "static_files", lambda: {"files": len(static_files.assets), "memory_bytes": static_files.memory_bytes}
+)
+
+if static_files:
+    @app.get("/{full_path:path}", include_in_schema=False)
+    async def serve_static(full_path: str, request: Request):
+        """Serve a file of the frontend build, or index.html for client-side routes."""
+        return static_files.response(request, full_path)
 
-# Serve static files (frontend build) as fallback
-# This should be LAST so API routes take precedence
-static_dir = Path(__file__).parent / "static"
-if static_dir.exists():
-    from fastapi.responses import FileResponse
-    
-    @app.get("/{full_path:path}")
-    async def serve_static(full_path: str):
-        """Serve static files from the frontend build."""
-        file_path = static_dir / full_path
-        
-        # If it's a directory or doesn't exist, serve index.html for SPA routing
-        if not file_path.exists() or file_path.is_dir():
-            index_file = static_dir / "index.html"
-            if index_file.exists():
-                return FileResponse(str(index_file))
-            return {"detail": "Not Found"}
-        
-        # Serve the file
-        return FileResponse(str(file_path))
 
 # Also handle root path
 @app.get("/")
-async def root_static():
+async def root_static(request: Request):
     """Serve index.html from the frontend build."""
-    index_file = static_dir / "index.html"
-    if index_file.exists():
-        return FileResponse(str(index_file))
+    if static_files:
+        return static_files.response(request, "")
     return {"message": "Welcome to Snake Arena API"}
-
-
@@ -0,0 +1,172 @@
+"""
+Versioned schema migrations.
+
+``Base.metadata.create_all`` only creates missing tables; it never changes
+tables that already exist. Schema changes to existing databases are expressed
+as numbered migrations here and recorded in the ``schema_migrations`` table,
+so each one runs exactly once per database.
+
+Migrations must be idempotent against a freshly created schema, because
+``init_db`` runs ``create_all`` (which already builds the current schema) before
+applying them.
+"""
+from datetime import datetime, timezone
+from typing import Callable, List, NamedTuple
+
+from sqlalchemy import (
+    Column, DateTime, Integer, MetaData, String, Table, delete, func, insert, inspect,
+    select, text, update
+)
+from sqlalchemy.engine import Connection, Engine
+
+from .models import GameSessionModel, LeaderboardEntryModel, PlayerBestScoreModel
+
+# Kept out of Base.metadata so create_all never touches it
+_metadata = MetaData()
+
+schema_migrations = Table(
+    "schema_migrations",
+    _metadata,
+    Column("version", Integer, primary_key=True),
+    Column("description", String, nullable=False),
+    Column("applied_at", DateTime(timezone=True), nullable=False),
+)
+
+# Arbitrary key for the PostgreSQL advisory lock held while migrating
+_ADVISORY_LOCK_KEY = 0x5A4E414B
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    upgrade: Callable[[Connection], None]
+
+
+MIGRATIONS: List[Migration] = []
+
+
+def migration(version: int, description: str):
+    """Register ``upgrade(connection)`` as migration ``version``."""
+    def decorator(upgrade: Callable[[Connection], None]):
+        MIGRATIONS.append(Migration(version, description, upgrade))
+        MIGRATIONS.sort(key=lambda m: m.version)
+        return upgrade
+    return decorator
+
+
+def _create_indexes(connection: Connection, table, *names: str) -> None:
+    indexes = {index.name: index for index in table.indexes}
+    for name in names:
+        indexes[name].create(connection, checkfirst=True)
+
+
+@migration(1, "Leaderboard and game session indexes")
+def _add_query_indexes(connection: Connection) -> None:
+    _create_indexes(
+        connection,
+        LeaderboardEntryModel.__table__,
+        "ix_leaderboard_mode_score",
+        "ix_leaderboard_username_mode_score",
+    )
+    _create_indexes(
+        connection,
+        GameSessionModel.__table__,
+        "ix_game_sessions_username",
+        "ix_game_sessions_live",
+    )
+
+
+def backfill_best_scores(connection: Connection) -> int:
+    """
+    Rebuild ``player_best_scores`` from ``leaderboard_entries``.
+    Ties keep the earliest entry. Returns the number of player rows written.
+    """
+    entries = LeaderboardEntryModel.__table__
+    best = PlayerBestScoreModel.__table__
+    ranked = select(
+        entries.c.username,
+        entries.c.mode,
+        entries.c.score,
+        entries.c.id,
+        entries.c.date,
+        func.row_number().over(
+            partition_by=(entries.c.username, entries.c.mode),
+            order_by=(entries.c.score.desc(), entries.c.date, entries.c.id),
+        ).label("position"),
+    ).subquery()
+
+    connection.execute(delete(best))
+    result = connection.execute(insert(best).from_select(
+        ["username", "mode", "best_score", "entry_id", "achieved_at"],
+        select(
+            ranked.c.username, ranked.c.mode, ranked.c.score, ranked.c.id, ranked.c.date
+        ).where(ranked.c.position == 1),
+    ))
+    return result.rowcount
+
+
+@migration(2, "Player best scores table")
+def _add_player_best_scores(connection: Connection) -> None:
+    PlayerBestScoreModel.__table__.create(connection, checkfirst=True)
+    _create_indexes(connection, PlayerBestScoreModel.__table__, "ix_player_best_mode_score")
+    backfill_best_scores(connection)
+
+
+@migration(3, "Game session last_seen for reaping stale live sessions")
+def _add_session_last_seen(connection: Connection) -> None:
+    sessions = GameSessionModel.__table__
+    columns = {column["name"] for column in inspect(connection).get_columns("game_sessions")}
+    if "last_seen" not in columns:
+        column_type = sessions.c.last_seen.type.compile(dialect=connection.dialect)
+        connection.execute(text(f"ALTER TABLE game_sessions ADD COLUMN last_seen {column_type}"))
+    # Existing live sessions get a full timeout from now before being reaped
+    connection.execute(
+        update(sessions)
+        .where(sessions.c.last_seen.is_(None))
+        .values(last_seen=datetime.now(timezone.utc))
+    )
+    _create_indexes(connection, sessions, "ix_game_sessions_live_last_seen")
+
+
+def applied_versions(connection: Connection) -> List[int]:
+    """Versions already recorded in ``schema_migrations``."""
+    schema_migrations.create(connection, checkfirst=True)
+    return list(connection.execute(
+        select(schema_migrations.c.version).order_by(schema_migrations.c.version)
+    ).scalars())
+
+
+def pending_migrations(connection: Connection) -> List[Migration]:
+    applied = set(applied_versions(connection))
+    return [m for m in MIGRATIONS if m.version not in applied]
+
+
+def run_migrations(engine: Engine) -> List[Migration]:
+    """Apply every pending migration, each in its own transaction."""
+    applied = []
+    with engine.connect() as connection:
+        if connection.dialect.name == "postgresql":
+            # Serialize concurrent app starts (e.g. several workers)
+            connection.execute(
+                text("SELECT pg_advisory_lock(:key)"), {"key": _ADVISORY_LOCK_KEY}
+            )
+            connection.commit()
+        try:
+            with connection.begin():
+                pending = pending_migrations(connection)
+            for m in pending:
+                with connection.begin():
+                    m.upgrade(connection)
+                    connection.execute(schema_migrations.insert().values(
+                        version=m.version,
+                        description=m.description,
+                        applied_at=datetime.now(timezone.utc),
+                    ))
+                applied.append(m)
+        finally:
+            if connection.dialect.name == "postgresql":
+                connection.execute(
+                    text("SELECT pg_advisory_unlock(:key)"), {"key": _ADVISORY_LOCK_KEY}
+                )
+                connection.commit()
+    return applied
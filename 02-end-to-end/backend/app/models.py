@@ -1,8 +1,8 @@
 from pydantic import BaseModel, EmailStr, Field
 from typing import Optional, List
 from enum import Enum
-from datetime import date
-from sqlalchemy import Column, String, Integer, Boolean, Enum as SQLEnum, Date
+from datetime import date, datetime, timezone
+from sqlalchemy import Column, String, Integer, Boolean, Enum as SQLEnum, Date, DateTime, Index
 from sqlalchemy.orm import declarative_base
 
 Base = declarative_base()
@@ -13,6 +13,12 @@ class GameMode(str, Enum):
     PASS_THROUGH = "pass-through"
 
 
+class LeaderboardWindow(str, Enum):
+    DAY = "day"
+    WEEK = "week"
+    ALL = "all"
+
+
 # SQLAlchemy ORM Models
 class UserModel(Base):
     __tablename__ = "users"
@@ -31,6 +37,29 @@ class LeaderboardEntryModel(Base):
     score = Column(Integer, nullable=False)
     mode = Column(SQLEnum(GameMode), nullable=False)
     date = Column(Date, nullable=False)
+    
+    __table_args__ = (
+        # Per-mode leaderboard ordering
+        Index("ix_leaderboard_mode_score", mode, score.desc()),
+        # A player's best score, optionally within a mode
+        Index("ix_leaderboard_username_mode_score", username, mode, score.desc()),
+    )
+
+
+class PlayerBestScoreModel(Base):
+    """Each player's best leaderboard entry per mode, maintained by add_score."""
+    __tablename__ = "player_best_scores"
+    
+    username = Column(String, primary_key=True)
+    mode = Column(SQLEnum(GameMode), primary_key=True)
+    best_score = Column(Integer, nullable=False)
+    entry_id = Column(String, nullable=False)
+    achieved_at = Column(Date, nullable=False)
+    
+    __table_args__ = (
+        # One-row-per-player leaderboard ordering
+        Index("ix_player_best_mode_score", mode, best_score.desc()),
+    )
 
 
 class GameSessionModel(Base):
@@ -41,6 +70,35 @@ class GameSessionModel(Base):
     score = Column(Integer, nullable=False)
     mode = Column(SQLEnum(GameMode), nullable=False)
     is_live = Column(Boolean, default=False, nullable=False)
+    # Last heartbeat (or checkpoint of one); stale live sessions are reaped
+    last_seen = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    
+    __table_args__ = (
+        Index("ix_game_sessions_username", username),
+        # Partial index: only live sessions are indexed, so it stays small
+        Index(
+            "ix_game_sessions_live",
+            is_live,
+            sqlite_where=is_live == True,
+            postgresql_where=is_live == True,
+        ),
+        # Sweeps for live sessions with an old heartbeat
+        Index(
+            "ix_game_sessions_live_last_seen",
+            last_seen,
+            sqlite_where=is_live == True,
+            postgresql_where=is_live == True,
+        ),
+    )
+
+
+class RevokedTokenModel(Base):
+    """Tokens logged out of before they expire, reloaded by every worker at startup."""
+    __tablename__ = "revoked_tokens"
+    
+    token_id = Column(String, primary_key=True)
+    # Unix time the token expires; the row is useless after that
+    expires_at = Column(Integer, nullable=False, index=True)
 
 
 # Pydantic models for API requests/responses
@@ -56,6 +114,7 @@ class User(BaseModel):
 class AuthResponse(BaseModel):
     success: bool
     user: Optional[User] = None
+    token: Optional[str] = None
     error: Optional[str] = None
 
 
@@ -81,6 +140,18 @@ class LeaderboardEntry(BaseModel):
         from_attributes = True
 
 
+class RankedLeaderboardEntry(LeaderboardEntry):
+    rank: int
+
+
+class PlayerRanking(BaseModel):
+    rank: int
+    username: str
+    mode: GameMode
+    score: int
+    date: date
+
+
 class SubmitScoreRequest(BaseModel):
     score: int
     mode: GameMode
@@ -101,3 +172,8 @@ class GameSession(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class UpdateSessionRequest(BaseModel):
+    score: int
+    isLive: bool = True
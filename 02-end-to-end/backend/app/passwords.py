@@ -0,0 +1,183 @@
+"""
+Password hashing service.
+
+Passwords are hashed with scrypt (``hashlib.scrypt``) in a bounded process
+pool, so a burst of logins costs worker CPU rather than event loop time.
+The cost parameters come from the environment:
+
+    PASSWORD_SCRYPT_N            CPU/memory cost, a power of two (default 16384)
+    PASSWORD_SCRYPT_R            block size (default 8)
+    PASSWORD_SCRYPT_P            parallelism (default 1)
+    PASSWORD_HASH_WORKERS        worker processes (default: CPU count, max 4)
+    PASSWORD_HASH_MAX_PENDING    hashes queued or running before new ones are
+                                 rejected with PasswordHasherBusy (default 64)
+
+Stored hashes look like ``scrypt$<n>$<r>$<p>$<salt>$<digest>`` (base64).
+Plain hex SHA-256 hashes from earlier versions still verify, and are reported
+as needing a rehash so login can upgrade them.
+"""
+import asyncio
+import base64
+import hashlib
+import hmac
+import logging
+import multiprocessing
+import os
+import secrets
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+SCHEME = "scrypt"
+SALT_BYTES = 16
+DIGEST_BYTES = 32
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when too many hashes are already queued."""
+
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    # Runs in a worker process; keep it free of app imports
+    return hashlib.scrypt(
+        password.encode(),
+        salt=salt,
+        n=n,
+        r=r,
+        p=p,
+        maxmem=128 * r * (n + p + 2) + 1024 * 1024,
+        dklen=DIGEST_BYTES,
+    )
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.b64encode(data).decode()
+
+
+def _is_legacy_sha256(stored: str) -> bool:
+    return len(stored) == 64 and "$" not in stored
+
+
+class PasswordHasher:
+    """Hashes and verifies passwords off the event loop."""
+
+    def __init__(
+        self,
+        n: int = 2 ** 14,
+        r: int = 8,
+        p: int = 1,
+        workers: Optional[int] = None,
+        max_pending: int = 64,
+    ):
+        self.n = n
+        self.r = r
+        self.p = p
+        self.workers = workers or min(os.cpu_count() or 1, 4)
+        self.max_pending = max_pending
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._seconds_total = 0.0
+        self._seconds_max = 0.0
+
+    @classmethod
+    def from_env(cls) -> "PasswordHasher":
+        return cls(
+            n=int(os.getenv("PASSWORD_SCRYPT_N", 2 ** 14)),
+            r=int(os.getenv("PASSWORD_SCRYPT_R", 8)),
+            p=int(os.getenv("PASSWORD_SCRYPT_P", 1)),
+            workers=int(os.getenv("PASSWORD_HASH_WORKERS", 0)) or None,
+            max_pending=int(os.getenv("PASSWORD_HASH_MAX_PENDING", 64)),
+        )
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: forking a process that already runs threads is unsafe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    async def _derive(self, password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._rejected += 1
+                logger.warning("Password hash queue full (%d pending)", self._pending)
+                raise PasswordHasherBusy()
+            self._pending += 1
+
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._get_executor(), _scrypt, password, salt, n, r, p
+            )
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._pending -= 1
+                self._completed += 1
+                self._seconds_total += elapsed
+                self._seconds_max = max(self._seconds_max, elapsed)
+
+    async def hash(self, password: str) -> str:
+        """Hash a password with the current cost parameters."""
+        salt = secrets.token_bytes(SALT_BYTES)
+        digest = await self._derive(password, salt, self.n, self.r, self.p)
+        return f"{SCHEME}${self.n}${self.r}${self.p}${_b64encode(salt)}${_b64encode(digest)}"
+
+    async def verify(self, password: str, stored: str) -> tuple[bool, bool]:
+        """
+        Check a password against a stored hash.
+        Returns: (valid, needs_rehash)
+        """
+        if _is_legacy_sha256(stored):
+            legacy = hashlib.sha256(password.encode()).hexdigest()
+            return hmac.compare_digest(legacy, stored), True
+
+        try:
+            scheme, n, r, p, salt, digest = stored.split("$")
+            n, r, p = int(n), int(r), int(p)
+            salt, digest = base64.b64decode(salt), base64.b64decode(digest)
+        except ValueError:
+            return False, False
+        if scheme != SCHEME:
+            return False, False
+
+        candidate = await self._derive(password, salt, n, r, p)
+        return hmac.compare_digest(candidate, digest), self.needs_rehash(stored)
+
+    def needs_rehash(self, stored: str) -> bool:
+        """True for legacy hashes and hashes made with other cost parameters."""
+        if _is_legacy_sha256(stored):
+            return True
+        return not stored.startswith(f"{SCHEME}${self.n}${self.r}${self.p}$")
+
+    def stats(self) -> dict:
+        """Hash latency and queue depth since startup."""
+        with self._lock:
+            return {
+                "pending": self._pending,
+                "max_pending": self.max_pending,
+                "workers": self.workers,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "seconds_total": self._seconds_total,
+                "seconds_max": self._seconds_max,
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+password_hasher = PasswordHasher.from_env()
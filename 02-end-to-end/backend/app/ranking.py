@@ -0,0 +1,564 @@
+"""
+In-memory rank index for leaderboard entries.
+
+Each GameMode gets its own ``RankedList``: a sorted list split into bounded
+blocks with a Fenwick tree over the block sizes. That gives O(log n) rank
+lookups and positional access, and inserts that only shift one small block.
+The index lives in the process and is warmed from the database at startup,
+then kept current by ``DatabaseService.add_score``.
+
+Daily and weekly leaderboards are rollup buckets: each entry also goes into
+the ``RankedList`` of its day and of its ISO week, so windowed reads cost the
+same as all-time reads. Buckets of past periods are dropped by ``compact``.
+
+``PlayerBestIndex`` ranks players rather than entries: one key per player
+per mode (and one across all modes), warmed from ``player_best_scores``.
+"""
+import threading
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, timedelta
+from heapq import merge
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from .models import GameMode, LeaderboardEntryModel, LeaderboardWindow, PlayerBestScoreModel
+
+# Rollup windows; ALL is the main per-mode lists
+BUCKETED_WINDOWS = (LeaderboardWindow.DAY, LeaderboardWindow.WEEK)
+
+
+class RankedEntry(NamedTuple):
+    """A leaderboard entry as stored in the index.
+
+    ``sort_score`` is the negated score so that ascending tuple order puts the
+    best entries first; ``id`` breaks ties deterministically.
+    """
+    sort_score: int
+    id: str
+    username: str
+    mode: GameMode
+    date: date
+
+    @property
+    def score(self) -> int:
+        return -self.sort_score
+
+    @classmethod
+    def from_model(cls, entry: LeaderboardEntryModel) -> "RankedEntry":
+        return cls(-entry.score, entry.id, entry.username, entry.mode, entry.date)
+
+
+class _Fenwick:
+    """Binary indexed tree over block sizes."""
+
+    def __init__(self, sizes: List[int]):
+        self._tree = [0] * (len(sizes) + 1)
+        for i, size in enumerate(sizes, 1):
+            self._tree[i] += size
+            parent = i + (i & -i)
+            if parent < len(self._tree):
+                self._tree[parent] += self._tree[i]
+
+    def add(self, index: int, delta: int) -> None:
+        i = index + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def prefix(self, index: int) -> int:
+        """Sum of the sizes of blocks ``[0, index)``."""
+        total = 0
+        while index > 0:
+            total += self._tree[index]
+            index -= index & -index
+        return total
+
+    def find(self, position: int) -> tuple[int, int]:
+        """Return ``(block, offset)`` holding the item at ``position``."""
+        block = 0
+        step = 1 << (len(self._tree) - 1).bit_length()
+        while step:
+            nxt = block + step
+            if nxt < len(self._tree) and self._tree[nxt] <= position:
+                block = nxt
+                position -= self._tree[nxt]
+            step >>= 1
+        return block, position
+
+
+class RankedList:
+    """Sorted sequence of keys with O(log n) rank and positional lookups."""
+
+    def __init__(self, keys: Iterable = (), load: int = 512):
+        self._load = load
+        self._blocks: List[list] = []
+        self._maxes: list = []
+        self._len = 0
+        self._fenwick = _Fenwick([])
+        self.reset(keys)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator:
+        for block in self._blocks:
+            yield from block
+
+    def reset(self, keys: Iterable = ()) -> None:
+        """Replace the contents with ``keys`` (sorted in O(n log n))."""
+        ordered = sorted(keys)
+        self._blocks = [
+            ordered[i:i + self._load] for i in range(0, len(ordered), self._load)
+        ]
+        self._maxes = [block[-1] for block in self._blocks]
+        self._len = len(ordered)
+        self._rebuild()
+
+    def _rebuild(self) -> None:
+        self._fenwick = _Fenwick([len(block) for block in self._blocks])
+
+    def add(self, key) -> None:
+        if not self._blocks:
+            self._blocks.append([key])
+            self._maxes.append(key)
+            self._len = 1
+            self._rebuild()
+            return
+
+        index = bisect_right(self._maxes, key)
+        if index == len(self._blocks):
+            index -= 1
+            self._blocks[index].append(key)
+            self._maxes[index] = key
+        else:
+            insort(self._blocks[index], key)
+        self._len += 1
+
+        block = self._blocks[index]
+        if len(block) > 2 * self._load:
+            self._blocks[index:index + 1] = [block[:self._load], block[self._load:]]
+            self._maxes[index:index + 1] = [block[self._load - 1], block[-1]]
+            self._rebuild()
+        else:
+            self._fenwick.add(index, 1)
+
+    def remove(self, key) -> bool:
+        index = bisect_left(self._maxes, key)
+        if index == len(self._blocks):
+            return False
+        block = self._blocks[index]
+        pos = bisect_left(block, key)
+        if pos == len(block) or block[pos] != key:
+            return False
+        del block[pos]
+        self._len -= 1
+        if block:
+            self._maxes[index] = block[-1]
+            self._fenwick.add(index, -1)
+        else:
+            del self._blocks[index]
+            del self._maxes[index]
+            self._rebuild()
+        return True
+
+    def bisect_left(self, key) -> int:
+        """Number of stored keys strictly less than ``key``."""
+        index = bisect_left(self._maxes, key)
+        if index == len(self._blocks):
+            return self._len
+        return self._fenwick.prefix(index) + bisect_left(self._blocks[index], key)
+
+    def __getitem__(self, position: int):
+        if position < 0:
+            position += self._len
+        if not 0 <= position < self._len:
+            raise IndexError("RankedList index out of range")
+        block, offset = self._fenwick.find(position)
+        return self._blocks[block][offset]
+
+    def islice(self, start: int = 0, stop: Optional[int] = None) -> Iterator:
+        """Iterate keys in ``[start, stop)`` without copying the whole list."""
+        start = max(start, 0)
+        stop = self._len if stop is None else min(stop, self._len)
+        if start >= stop:
+            return
+        block, offset = self._fenwick.find(start)
+        remaining = stop - start
+        while remaining > 0 and block < len(self._blocks):
+            chunk = self._blocks[block][offset:offset + remaining]
+            yield from chunk
+            remaining -= len(chunk)
+            block += 1
+            offset = 0
+
+
+def _position_after(ranked: RankedList, key: tuple) -> int:
+    """Position of the first entry whose ``(sort_score, id)`` is past ``key``."""
+    position = ranked.bisect_left(key)
+    if position < len(ranked) and tuple(ranked[position][:2]) == tuple(key):
+        position += 1
+    return position
+
+
+def period_start(window: LeaderboardWindow, day: date) -> Optional[date]:
+    """First day of the ``window`` period holding ``day`` (None for all-time)."""
+    if window == LeaderboardWindow.DAY:
+        return day
+    if window == LeaderboardWindow.WEEK:
+        return day - timedelta(days=day.weekday())
+    return None
+
+
+class LeaderboardIndex:
+    """Process-local leaderboard ranking, one ``RankedList`` per GameMode.
+
+    The index is per process: every worker warms its own copy from the
+    database, so it only reflects scores written through this process.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._lists = {mode: RankedList() for mode in GameMode}
+        # (window, period start) -> per-mode rollup bucket
+        self._buckets: Dict[tuple, Dict[GameMode, RankedList]] = {}
+        self._compacted = 0
+        self._warm = False
+
+    @property
+    def is_warm(self) -> bool:
+        return self._warm
+
+    def warm(self, db: Session, batch_size: int = 10_000, today: Optional[date] = None) -> None:
+        """(Re)load every leaderboard entry from the database."""
+        today = today or date.today()
+        current = {window: period_start(window, today) for window in BUCKETED_WINDOWS}
+        keys = {mode: [] for mode in GameMode}
+        bucket_keys = {
+            (window, start): {mode: [] for mode in GameMode}
+            for window, start in current.items()
+        }
+        rows = db.query(
+            LeaderboardEntryModel.score,
+            LeaderboardEntryModel.id,
+            LeaderboardEntryModel.username,
+            LeaderboardEntryModel.mode,
+            LeaderboardEntryModel.date,
+        ).yield_per(batch_size)
+        for score, entry_id, username, mode, entry_date in rows:
+            key = RankedEntry(-score, entry_id, username, mode, entry_date)
+            keys[mode].append(key)
+            for window, start in current.items():
+                if period_start(window, entry_date) == start:
+                    bucket_keys[(window, start)][mode].append(key)
+
+        with self._lock:
+            for mode, mode_keys in keys.items():
+                self._lists[mode].reset(mode_keys)
+            self._buckets = {
+                bucket: {mode: RankedList(mode_keys) for mode, mode_keys in by_mode.items()}
+                for bucket, by_mode in bucket_keys.items()
+            }
+            self._warm = True
+
+    def ensure_warm(self, db: Session) -> None:
+        if not self._warm:
+            with self._lock:
+                if not self._warm:
+                    self.warm(db)
+
+    def clear(self) -> None:
+        """Drop all entries and mark the index cold."""
+        with self._lock:
+            for ranked in self._lists.values():
+                ranked.reset()
+            self._buckets = {}
+            self._warm = False
+
+    def _bucket(self, window: LeaderboardWindow, day: date, create: bool = False) -> Optional[Dict[GameMode, RankedList]]:
+        key = (window, period_start(window, day))
+        if create and key not in self._buckets:
+            self._buckets[key] = {mode: RankedList() for mode in GameMode}
+        return self._buckets.get(key)
+
+    def add(self, entry: RankedEntry) -> int:
+        """Insert an entry and return its all-time rank within its mode."""
+        with self._lock:
+            for window in BUCKETED_WINDOWS:
+                self._bucket(window, entry.date, create=True)[entry.mode].add(entry)
+            ranked = self._lists[entry.mode]
+            ranked.add(entry)
+            return ranked.bisect_left((entry.sort_score,)) + 1
+
+    def remove(self, entry: RankedEntry) -> bool:
+        with self._lock:
+            for window in BUCKETED_WINDOWS:
+                bucket = self._bucket(window, entry.date)
+                if bucket is not None:
+                    bucket[entry.mode].remove(entry)
+            return self._lists[entry.mode].remove(entry)
+
+    def compact(self, today: Optional[date] = None) -> int:
+        """Drop rollup buckets of periods that have ended. Returns how many."""
+        today = today or date.today()
+        with self._lock:
+            expired = [
+                (window, start) for window, start in self._buckets
+                if start < period_start(window, today)
+            ]
+            for bucket in expired:
+                del self._buckets[bucket]
+            self._compacted += len(expired)
+            return len(expired)
+
+    def rank(self, mode: Optional[GameMode], score: int) -> int:
+        """Rank a score would have: one more than the entries strictly above it.
+        Without a mode the score is ranked against every mode.
+        """
+        with self._lock:
+            return sum(ranked.bisect_left((-score,)) for ranked in self._ranked(mode)) + 1
+
+    def _ranked(
+        self, mode: Optional[GameMode], window: LeaderboardWindow = LeaderboardWindow.ALL
+    ) -> List[RankedList]:
+        if window == LeaderboardWindow.ALL:
+            lists = self._lists
+        else:
+            lists = self._bucket(window, date.today())
+            if lists is None:
+                # No scores yet in this period
+                return []
+        return [lists[mode]] if mode else list(lists.values())
+
+    def count(self, mode: Optional[GameMode] = None) -> int:
+        with self._lock:
+            if mode:
+                return len(self._lists[mode])
+            return sum(len(ranked) for ranked in self._lists.values())
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": self.count(),
+                "window_buckets": len(self._buckets),
+                "compacted_buckets": self._compacted,
+            }
+
+    def top(
+        self,
+        mode: Optional[GameMode] = None,
+        limit: int = 100,
+        window: LeaderboardWindow = LeaderboardWindow.ALL,
+    ) -> List[RankedEntry]:
+        """Best ``limit`` entries of the current ``window``, for one mode or merged across all modes."""
+        with self._lock:
+            heads = [ranked.islice(0, limit) for ranked in self._ranked(mode, window)]
+            return list(islice(merge(*heads), limit))
+
+    def page(
+        self,
+        mode: Optional[GameMode],
+        after: Optional[tuple],
+        limit: int,
+        window: LeaderboardWindow = LeaderboardWindow.ALL,
+    ) -> List[RankedEntry]:
+        """
+        Up to ``limit`` entries following the ``(sort_score, id)`` key
+        ``after`` (keyset pagination), or from the top if it is None.
+        """
+        with self._lock:
+            heads = []
+            for ranked in self._ranked(mode, window):
+                start = _position_after(ranked, after) if after else 0
+                heads.append(ranked.islice(start, start + limit))
+            return list(islice(merge(*heads), limit))
+
+    def around(
+        self, mode: Optional[GameMode], entry: RankedEntry, before: int, after: int
+    ) -> List[RankedEntry]:
+        """``entry`` with up to ``before`` entries above it and ``after`` below."""
+        with self._lock:
+            above, below = [], []
+            for ranked in self._ranked(mode):
+                position = ranked.bisect_left(entry)
+                above.append(ranked.islice(position - before, position))
+                below.append(ranked.islice(position, position + after + 1))
+            # The nearest entries above are the last ``before`` of the merge
+            upper = list(merge(*above))[-before:] if before else []
+            lower = list(islice(merge(*below), after + 1))
+            if not lower or lower[0] != entry:
+                # Not indexed (e.g. written by another process): place it anyway
+                lower = [entry] + lower[:after]
+            return upper + lower
+
+
+leaderboard_index = LeaderboardIndex()
+
+
+class PlayerBest(NamedTuple):
+    """A player's best entry, ordered like ``RankedEntry`` then by username."""
+    sort_score: int
+    username: str
+    mode: GameMode
+    date: date
+    entry_id: str
+
+    @property
+    def score(self) -> int:
+        return -self.sort_score
+
+    @classmethod
+    def from_entry(cls, entry: RankedEntry) -> "PlayerBest":
+        return cls(entry.sort_score, entry.username, entry.mode, entry.date, entry.id)
+
+
+class PlayerBestIndex:
+    """Process-local one-row-per-player ranking.
+
+    Keeps a ``RankedList`` of each player's best per GameMode, plus one
+    under ``None`` for their best across all modes. On equal scores the
+    earlier best is kept, matching the ``player_best_scores`` upsert.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._scopes = [*GameMode, None]
+        self._lists = {scope: RankedList() for scope in self._scopes}
+        self._best = {scope: {} for scope in self._scopes}
+        self._warm = False
+
+    @property
+    def is_warm(self) -> bool:
+        return self._warm
+
+    def warm(self, db: Session, batch_size: int = 10_000) -> None:
+        """(Re)load every player's best from ``player_best_scores``."""
+        best = {scope: {} for scope in self._scopes}
+        rows = db.query(
+            PlayerBestScoreModel.best_score,
+            PlayerBestScoreModel.username,
+            PlayerBestScoreModel.mode,
+            PlayerBestScoreModel.achieved_at,
+            PlayerBestScoreModel.entry_id,
+        ).yield_per(batch_size)
+        for score, username, mode, achieved_at, entry_id in rows:
+            key = PlayerBest(-score, username, mode, achieved_at, entry_id)
+            best[mode][username] = key
+            overall = best[None].get(username)
+            if overall is None or (key.sort_score, key.date) < (overall.sort_score, overall.date):
+                best[None][username] = key
+
+        with self._lock:
+            for scope in self._scopes:
+                self._best[scope] = best[scope]
+                self._lists[scope].reset(best[scope].values())
+            self._warm = True
+
+    def ensure_warm(self, db: Session) -> None:
+        if not self._warm:
+            with self._lock:
+                if not self._warm:
+                    self.warm(db)
+
+    def clear(self) -> None:
+        """Drop all players and mark the index cold."""
+        with self._lock:
+            for scope in self._scopes:
+                self._best[scope] = {}
+                self._lists[scope].reset()
+            self._warm = False
+
+    def offer(self, entry: RankedEntry) -> None:
+        """Record a new entry if it beats the player's best."""
+        candidate = PlayerBest.from_entry(entry)
+        with self._lock:
+            for scope in (entry.mode, None):
+                current = self._best[scope].get(entry.username)
+                if current is not None and current.sort_score <= candidate.sort_score:
+                    continue
+                if current is not None:
+                    self._lists[scope].remove(current)
+                self._lists[scope].add(candidate)
+                self._best[scope][entry.username] = candidate
+
+    def stored_bests(self, db: Session, usernames: Iterable[str]) -> Dict[Tuple[str, GameMode], PlayerBest]:
+        """The committed per-mode bests of ``usernames``, from ``player_best_scores``."""
+        rows = db.query(
+            PlayerBestScoreModel.best_score,
+            PlayerBestScoreModel.username,
+            PlayerBestScoreModel.mode,
+            PlayerBestScoreModel.achieved_at,
+            PlayerBestScoreModel.entry_id,
+        ).filter(PlayerBestScoreModel.username.in_(list(usernames)))
+        return {
+            (username, mode): PlayerBest(-score, username, mode, achieved_at, entry_id)
+            for score, username, mode, achieved_at, entry_id in rows
+        }
+
+    def evict(
+        self,
+        entries: Iterable[RankedEntry],
+        stored: Dict[Tuple[str, GameMode], PlayerBest],
+        pending: Iterable[RankedEntry] = (),
+    ) -> None:
+        """
+        Take back entries that were never committed. A player whose best was
+        one of them falls back to ``stored`` (from ``stored_bests``), then
+        ``pending`` entries not yet written are offered again. Other players
+        are untouched.
+        """
+        entries = list(entries)
+        ids = {entry.id for entry in entries}
+        usernames = {entry.username for entry in entries}
+        with self._lock:
+            for username in usernames:
+                for mode in GameMode:
+                    current = self._best[mode].get(username)
+                    if current is None or current.entry_id not in ids:
+                        continue
+                    self._lists[mode].remove(current)
+                    del self._best[mode][username]
+                    replacement = stored.get((username, mode))
+                    if replacement is not None:
+                        self._lists[mode].add(replacement)
+                        self._best[mode][username] = replacement
+                current = self._best[None].get(username)
+                if current is None or current.entry_id not in ids:
+                    continue
+                self._lists[None].remove(current)
+                del self._best[None][username]
+                # The best across modes is the earliest of the highest mode bests
+                bests = [self._best[mode][username] for mode in GameMode if username in self._best[mode]]
+                if bests:
+                    overall = min(bests, key=lambda best: (best.sort_score, best.date))
+                    self._lists[None].add(overall)
+                    self._best[None][username] = overall
+            for entry in pending:
+                if entry.username in usernames and entry.id not in ids:
+                    self.offer(entry)
+
+    def get(self, mode: Optional[GameMode], username: str) -> Optional[PlayerBest]:
+        with self._lock:
+            return self._best[mode].get(username)
+
+    def rank(self, mode: Optional[GameMode], score: int) -> int:
+        """One more than the number of players with a strictly higher best."""
+        with self._lock:
+            return self._lists[mode].bisect_left((-score,)) + 1
+
+    def count(self, mode: Optional[GameMode] = None) -> int:
+        with self._lock:
+            return len(self._lists[mode])
+
+    def page(
+        self, mode: Optional[GameMode], after: Optional[tuple], limit: int
+    ) -> List[PlayerBest]:
+        """Up to ``limit`` players after the ``(sort_score, username)`` key ``after``."""
+        with self._lock:
+            ranked = self._lists[mode]
+            start = _position_after(ranked, after) if after else 0
+            return list(ranked.islice(start, start + limit))
+
+
+player_index = PlayerBestIndex()
@@ -1,58 +1,91 @@
+from typing import Optional
+
 from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
 from ..models import LoginRequest, SignupRequest, AuthResponse, User
-from ..db import DatabaseService
-from ..database import get_db
-import hashlib
+from ..coordination import coordinator
+from ..db_async import AnyDatabaseService, get_db_service
+from ..passwords import PasswordHasherBusy, password_hasher
+from ..tokens import TokenClaims, optional_claims, require_claims, token_signer, user_cache
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
-def hash_password(password: str) -> str:
-    """Hash a password using SHA-256."""
-    return hashlib.sha256(password.encode()).hexdigest()
+def _hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Too many concurrent logins, try again shortly",
+        headers={"Retry-After": "1"},
+    )
+
+
+def _authenticated(user: User) -> AuthResponse:
+    user_cache.put(user)
+    return AuthResponse(success=True, user=user, token=token_signer.issue(user.id, user.username))
 
 
 @router.post("/login", response_model=AuthResponse)
-async def login(request: LoginRequest, db: Session = Depends(get_db)):
-    db_service = DatabaseService(db)
-    user = db_service.get_user_by_email(request.email)
-    
-    if not user or user.password_hash != hash_password(request.password):
+async def login(request: LoginRequest, db_service: AnyDatabaseService = Depends(get_db_service)):
+    user = await db_service.get_user_by_email(request.email)
+    if not user:
         return AuthResponse(success=False, error="Invalid email or password")
     
-    return AuthResponse(
-        success=True,
-        user=User(id=user.id, username=user.username, email=user.email)
-    )
+    authenticated = User(id=user.id, username=user.username, email=user.email)
+    try:
+        valid, needs_rehash = await password_hasher.verify(request.password, user.password_hash)
+        if not valid:
+            return AuthResponse(success=False, error="Invalid email or password")
+        
+        # Upgrade legacy SHA-256 hashes (or outdated cost parameters) in place
+        if needs_rehash:
+            password_hash = await password_hasher.hash(request.password)
+            await db_service.update_password_hash(authenticated.id, password_hash)
+    except PasswordHasherBusy:
+        raise _hasher_busy()
+    
+    return _authenticated(authenticated)
 
 
 @router.post("/signup", response_model=AuthResponse)
-async def signup(request: SignupRequest, db: Session = Depends(get_db)):
-    db_service = DatabaseService(db)
-    
-    if db_service.get_user_by_email(request.email):
+async def signup(request: SignupRequest, db_service: AnyDatabaseService = Depends(get_db_service)):
+    if await db_service.get_user_by_email(request.email):
         return AuthResponse(success=False, error="Email already exists")
     
-    if db_service.get_user_by_username(request.username):
+    if await db_service.get_user_by_username(request.username):
         return AuthResponse(success=False, error="Username already taken")
     
-    password_hash = hash_password(request.password)
-    user = db_service.add_user(request.email, request.username, password_hash)
+    try:
+        password_hash = await password_hasher.hash(request.password)
+    except PasswordHasherBusy:
+        raise _hasher_busy()
+    user = await db_service.add_user(request.email, request.username, password_hash)
     
-    return AuthResponse(
-        success=True,
-        user=User(id=user.id, username=user.username, email=user.email)
-    )
+    return _authenticated(User(id=user.id, username=user.username, email=user.email))
 
 
 @router.post("/logout")
-async def logout():
+async def logout(
+    claims: Optional[TokenClaims] = Depends(optional_claims),
+    db_service: AnyDatabaseService = Depends(get_db_service),
+):
+    if claims is not None:
+        token_signer.revoke(claims.token_id, claims.expires_at)
+        coordinator.token_revoked(claims.token_id, claims.expires_at)
+        # Stored, so workers started later reject the token too
+        await db_service.revoke_token(claims.token_id, claims.expires_at)
     return {"message": "Logout successful"}
 
 
 @router.get("/me", response_model=User)
-async def get_current_user(db: Session = Depends(get_db)):
-        # No user is authenticated by default
-        # In a real app, we'd verify JWT tokens or session cookies here
-        raise HTTPException(status_code=401, detail="Not authenticated")
+async def get_current_user(
+    claims: TokenClaims = Depends(require_claims),
+    db_service: AnyDatabaseService = Depends(get_db_service),
+):
+    # The token is proof enough; the database is only asked on a cache miss
+    user = user_cache.get(claims.user_id)
+    if user is None:
+        record = await db_service.get_user_by_id(claims.user_id)
+        if record is None:
+            raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+        user = User(id=record.id, username=record.username, email=record.email)
+        user_cache.put(user)
+    return user
@@ -1,36 +1,180 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from pydantic import TypeAdapter
 from typing import List, Optional
-from sqlalchemy.orm import Session
-from ..models import LeaderboardEntry, SubmitScoreRequest, SubmitScoreResponse, GameMode
-from ..db import DatabaseService
-from ..database import get_db
+import asyncio
+import base64
+from datetime import date
+from ..models import (
+    LeaderboardEntry, PlayerRanking, RankedLeaderboardEntry, SubmitScoreRequest,
+    SubmitScoreResponse, GameMode, LeaderboardWindow
+)
+from ..ranking import PlayerBest, RankedEntry, period_start
+from ..db_async import AnyDatabaseService, get_db_service
+from ..write_behind import score_writer
+from ..cache import leaderboard_cache
+from ..tokens import TokenClaims, optional_claims
 
 router = APIRouter(prefix="/leaderboard", tags=["leaderboard"])
 
 
+_entries_adapter = TypeAdapter(List[LeaderboardEntry])
+_players_adapter = TypeAdapter(List[PlayerRanking])
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _encode_cursor(score: int, key: str) -> str:
+    return base64.urlsafe_b64encode(f"{score}:{key}".encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[int, str]:
+    try:
+        score, entry_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(":", 1)
+        return int(score), entry_id
+    except (ValueError, UnicodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _entry(entry: RankedEntry) -> LeaderboardEntry:
+    return LeaderboardEntry(
+        id=entry.id,
+        username=entry.username,
+        score=entry.score,
+        mode=entry.mode,
+        date=entry.date
+    )
+
+
+def _next_cursor(entries: List[RankedEntry], limit: int) -> Optional[str]:
+    # A short page is the last one
+    return _encode_cursor(entries[-1].score, entries[-1].id) if len(entries) == limit else None
+
+
+def _player(rank: int, best: PlayerBest) -> PlayerRanking:
+    return PlayerRanking(
+        rank=rank, username=best.username, mode=best.mode, score=best.score, date=best.date
+    )
+
+
 @router.get("", response_model=List[LeaderboardEntry])
-async def get_leaderboard(mode: Optional[GameMode] = None, db: Session = Depends(get_db)):
-    db_service = DatabaseService(db)
-    entries = db_service.get_leaderboard(mode)
-    return [
-        LeaderboardEntry(
-            id=entry.id,
-            username=entry.username,
-            score=entry.score,
-            mode=entry.mode,
-            date=entry.date
+async def get_leaderboard(
+    mode: Optional[GameMode] = None,
+    limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = None,
+    window: LeaderboardWindow = LeaderboardWindow.ALL,
+    if_none_match: Optional[str] = Header(None),
+    db_service: AnyDatabaseService = Depends(get_db_service),
+):
+    if cursor:
+        # Deeper pages are a cheap index range scan; only the first page is cached
+        entries = await db_service.get_leaderboard_page(
+            mode, _decode_cursor(cursor), limit, window
+        )
+        next_cursor = _next_cursor(entries, limit)
+        headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
+        return Response(
+            content=_entries_adapter.dump_json([_entry(entry) for entry in entries]),
+            media_type="application/json",
+            headers=headers,
+        )
+
+    # The period start in the key rolls daily/weekly responses over at midnight
+    key = (mode, limit, window, period_start(window, date.today()))
+    cached = leaderboard_cache.get(key)
+    if cached is None:
+        generation = leaderboard_cache.generation
+        entries = await db_service.get_leaderboard(mode, limit, window)
+        body = _entries_adapter.dump_json([_entry(entry) for entry in entries])
+        floor = entries[-1].score if len(entries) == limit else None
+        cached = leaderboard_cache.put(
+            key, body, mode, floor, generation, _next_cursor(entries, limit)
         )
-        for entry in entries
+    
+    headers = {"ETag": cached.etag, "Cache-Control": "no-cache"}
+    if cached.next_cursor:
+        headers[NEXT_CURSOR_HEADER] = cached.next_cursor
+    if cached.matches(if_none_match):
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
+
+
+@router.get("/around/{username}", response_model=List[RankedLeaderboardEntry])
+async def get_leaderboard_around(
+    username: str,
+    mode: Optional[GameMode] = None,
+    radius: int = Query(10, ge=0, le=50),
+    db_service: AnyDatabaseService = Depends(get_db_service),
+):
+    """A player's best entry with up to ``radius`` entries above and below it."""
+    window = await db_service.get_leaderboard_around(username, mode, radius)
+    if window is None:
+        raise HTTPException(status_code=404, detail="Player has no scores")
+    return [
+        RankedLeaderboardEntry(rank=rank, **_entry(entry).model_dump())
+        for rank, entry in window
     ]
 
 
+@router.get("/players", response_model=List[PlayerRanking])
+async def get_player_leaderboard(
+    mode: Optional[GameMode] = None,
+    limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db_service: AnyDatabaseService = Depends(get_db_service),
+):
+    """One row per player with their best score; paged like GET /leaderboard."""
+    after = _decode_cursor(cursor) if cursor else None
+    players = await db_service.get_player_leaderboard(mode, after, limit)
+    headers = {}
+    if len(players) == limit:
+        last = players[-1][1]
+        headers[NEXT_CURSOR_HEADER] = _encode_cursor(last.score, last.username)
+    return Response(
+        content=_players_adapter.dump_json([_player(rank, best) for rank, best in players]),
+        media_type="application/json",
+        headers=headers,
+    )
+
+
+@router.get("/players/{username}", response_model=PlayerRanking)
+async def get_player_rank(
+    username: str,
+    mode: Optional[GameMode] = None,
+    db_service: AnyDatabaseService = Depends(get_db_service),
+):
+    """A player's best score and rank among players."""
+    ranked = await db_service.get_player_rank(username, mode)
+    if ranked is None:
+        raise HTTPException(status_code=404, detail="Player has no scores")
+    return _player(*ranked)
+
+
 @router.post("", response_model=SubmitScoreResponse)
-async def submit_score(request: SubmitScoreRequest, db: Session = Depends(get_db)):
-    db_service = DatabaseService(db)
-    
-    # Use username from request (sent by frontend), fallback to 'Unknown'
-    username = request.username or "Unknown"
+async def submit_score(
+    request: SubmitScoreRequest,
+    claims: Optional[TokenClaims] = Depends(optional_claims),
+    db_service: AnyDatabaseService = Depends(get_db_service),
+):
+    # Signed-in players score under the username in their token; anonymous
+    # submissions keep the username sent by the frontend, or 'Unknown', as
+    # long as no registered player has it
+    if claims is not None:
+        username = claims.username
+    else:
+        username = request.username or "Unknown"
+        if await db_service.get_user_by_username(username):
+            raise HTTPException(
+                status_code=401,
+                detail="Sign in to submit scores as a registered player",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
     
-    entry, rank = db_service.add_score(username, request.score, request.mode)
+    if score_writer.enabled:
+        # Ranked in memory now; the INSERT happens in the next bulk flush
+        entry, rank, flushed = score_writer.submit(username, request.score, request.mode)
+        if flushed is not None:
+            await asyncio.wrap_future(flushed)
+    else:
+        entry, rank = await db_service.add_score(username, request.score, request.mode)
     return SubmitScoreResponse(success=True, rank=rank)
 
@@ -1,40 +1,111 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List
-from sqlalchemy.orm import Session
-from ..models import GameSession
-from ..db import DatabaseService
-from ..database import get_db
+from fastapi import APIRouter, HTTPException, Depends, Query, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, List, Optional
+from ..models import GameSession, UpdateSessionRequest
+from ..db_async import AnyDatabaseService, get_db_service
+from ..hub import Subscriber, session_hub
+from ..live_sessions import live_sessions
+from .leaderboard import NEXT_CURSOR_HEADER
 
 router = APIRouter(prefix="/sessions", tags=["sessions"])
 
 
+def _game_session(session) -> GameSession:
+    # Live scores newer than the last checkpoint are only in memory
+    record = live_sessions.get(session.id) if session.is_live else None
+    return GameSession(
+        id=session.id,
+        username=session.username,
+        score=record.score if record else session.score,
+        mode=session.mode,
+        isLive=session.is_live
+    )
+
+
 @router.get("", response_model=List[GameSession])
-async def get_sessions(db: Session = Depends(get_db)):
-    db_service = DatabaseService(db)
-    sessions = db_service.get_live_sessions()
-    return [
-        GameSession(
-            id=session.id,
-            username=session.username,
-            score=session.score,
-            mode=session.mode,
-            isLive=session.is_live
-        )
-        for session in sessions
-    ]
+async def get_sessions(
+    response: Response,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+    db_service: AnyDatabaseService = Depends(get_db_service),
+):
+    """Live sessions ordered by id; ``cursor`` is the X-Next-Cursor of the previous page."""
+    sessions = await db_service.get_live_sessions(limit=limit, after=cursor)
+    if len(sessions) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = sessions[-1].id
+    return [_game_session(session) for session in sessions]
+
+
+# Seconds between keep-alive messages on an idle stream
+HEARTBEAT_INTERVAL = 15.0
+
+
+async def _sse_events(subscriber: Subscriber) -> AsyncIterator[str]:
+    try:
+        while True:
+            events = await subscriber.next_events(timeout=HEARTBEAT_INTERVAL)
+            if not events:
+                yield ": keep-alive\n\n"
+            for event in events:
+                yield f"event: {event.type}\ndata: {event.data}\n\n"
+    finally:
+        session_hub.unsubscribe(subscriber)
+
+
+@router.get("/stream")
+async def stream_sessions_sse(db_service: AnyDatabaseService = Depends(get_db_service)):
+    """Server-sent events: a snapshot of live sessions, then deltas."""
+    # Live sessions are loaded once; later snapshots come from the hub's memory
+    await db_service.warm_session_hub()
+    return StreamingResponse(
+        _sse_events(session_hub.subscribe()),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/stream")
+async def stream_sessions_ws(
+    websocket: WebSocket, db_service: AnyDatabaseService = Depends(get_db_service)
+):
+    """WebSocket variant of the session stream (same JSON messages)."""
+    await db_service.warm_session_hub()
+    await websocket.accept()
+    subscriber = session_hub.subscribe()
+    try:
+        while True:
+            events = await subscriber.next_events(timeout=HEARTBEAT_INTERVAL)
+            if not events:
+                await websocket.send_text('{"type": "ping"}')
+            for event in events:
+                await websocket.send_text(event.data)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        session_hub.unsubscribe(subscriber)
 
 
 @router.get("/{id}", response_model=GameSession)
-async def get_session(id: str, db: Session = Depends(get_db)):
-    db_service = DatabaseService(db)
-    session = db_service.get_session_by_id(id)
+async def get_session(id: str, db_service: AnyDatabaseService = Depends(get_db_service)):
+    session = await db_service.get_session_by_id(id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    return GameSession(
-        id=session.id,
-        username=session.username,
-        score=session.score,
-        mode=session.mode,
-        isLive=session.is_live
-    )
+    return _game_session(session)
+
+
+@router.patch("/{id}", response_model=GameSession)
+async def update_session(
+    id: str,
+    request: UpdateSessionRequest,
+    db_service: AnyDatabaseService = Depends(get_db_service),
+):
+    """Score heartbeat for a live game; ``isLive: false`` ends it."""
+    if not request.isLive:
+        session = await db_service.close_session(id, request.score)
+    else:
+        session = await db_service.heartbeat_session(id, request.score)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found or already closed")
+    
+    return _game_session(session)
@@ -0,0 +1,155 @@
+"""
+Production server: uvicorn with one or more pre-forked worker processes.
+
+Usage:
+    uv run python -m app.serve
+    WEB_CONCURRENCY=4 uv run python -m app.serve --port 8000
+
+    WEB_CONCURRENCY    worker processes (default 1)
+    HOST / PORT        listen address (default 0.0.0.0:8000)
+    LOG_LEVEL          uvicorn log level (default info)
+    COORDINATION_URL   how workers share state changes (see app.coordination)
+
+With several workers the master process binds the socket, migrates the
+database and warms the rank indexes once, then forks the workers, which start
+with the indexes already in memory instead of each loading them. Without a
+COORDINATION_URL the master also runs a Unix-socket broker for them. Workers
+that exit unexpectedly are replaced by fresh ones that warm their own indexes,
+since the master's copy misses every score submitted since startup; SIGTERM or
+SIGINT stops them all.
+"""
+import argparse
+import logging
+import os
+import signal
+import socket
+import sys
+import tempfile
+import time
+
+import uvicorn
+
+logger = logging.getLogger("app.serve")
+
+# Seconds to wait before replacing a worker that exited
+RESPAWN_DELAY = 1.0
+
+
+def _discard_preloaded_state() -> None:
+    """Make a worker forked after startup load its indexes from the database."""
+    from .main import app
+    from .ranking import leaderboard_index, player_index
+
+    leaderboard_index.clear()
+    player_index.clear()
+    app.state.preloaded = False
+
+
+def _run_worker(sock: socket.socket, log_level: str, respawn: bool = False) -> None:
+    from .database import engine
+    from .main import app
+
+    # Connections opened by the master must not be shared with the children
+    engine.dispose(close=False)
+    if respawn:
+        _discard_preloaded_state()
+    server = uvicorn.Server(uvicorn.Config(app, log_level=log_level))
+    server.run(sockets=[sock])
+
+
+def _fork_worker(sock: socket.socket, log_level: str, respawn: bool = False) -> int:
+    pid = os.fork()
+    if pid == 0:
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        code = 0
+        try:
+            _run_worker(sock, log_level, respawn)
+        except BaseException:
+            logger.exception("Worker %d crashed", os.getpid())
+            code = 1
+        finally:
+            os._exit(code)
+    return pid
+
+
+def serve_forked(host: str, port: int, workers: int, log_level: str = "info") -> int:
+    broker = None
+    if not os.getenv("COORDINATION_URL"):
+        path = os.path.join(tempfile.gettempdir(), f"snake-arena-{os.getpid()}.sock")
+        # Read when app.coordination is first imported, so set it before that
+        os.environ["COORDINATION_URL"] = f"unix://{path}"
+        from .coordination import SocketBroker
+
+        broker = SocketBroker(path)
+
+    from .database import engine
+    from .main import preload
+
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+
+    preload()
+    engine.dispose()
+
+    stopping = False
+    children = set()
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for _ in range(workers):
+        children.add(_fork_worker(sock, log_level))
+    if broker is not None:
+        # Started after forking so the workers don't inherit its thread; they
+        # retry until it is listening
+        broker.start()
+    logger.info("Serving on %s:%d with %d workers", host, port, workers)
+
+    try:
+        while children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            children.discard(pid)
+            if not stopping:
+                logger.warning("Worker %d exited with status %d; starting a new one", pid, status)
+                time.sleep(RESPAWN_DELAY)
+                children.add(_fork_worker(sock, log_level, respawn=True))
+    finally:
+        sock.close()
+        if broker is not None:
+            broker.stop()
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.serve", description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", 8000)))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", 1)))
+    parser.add_argument("--log-level", default=os.getenv("LOG_LEVEL", "info"))
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s:     %(message)s")
+    if args.workers <= 1:
+        uvicorn.run("app.main:app", host=args.host, port=args.port, log_level=args.log_level)
+        return 0
+    return serve_forked(args.host, args.port, args.workers, args.log_level)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+"""
+Closes live game sessions that stopped sending heartbeats.
+
+Live sessions record their last heartbeat in ``game_sessions.last_seen``
+(written by the live session checkpoints). A sweep started from the app
+lifespan closes every live session older than the timeout, in batches: one
+indexed SELECT of ids (``ix_game_sessions_live_last_seen``), walked in
+``(last_seen, id)`` order, and one ``UPDATE ... WHERE id IN (...)`` per batch,
+each in its own transaction. The UPDATE re-checks staleness, so a session
+refreshed in between stays open, and only the sessions it closed are
+announced.
+
+    SESSION_REAP_AFTER       seconds since the last heartbeat (default 300;
+                             keep it well above LIVE_SESSION_CHECKPOINT_INTERVAL)
+    SESSION_SWEEP_INTERVAL   seconds between sweeps (default 60)
+    SESSION_SWEEP_BATCH      sessions closed per UPDATE (default 500)
+
+This catches sessions abandoned by any process, including ones that crashed
+before their in-memory live session store could expire them.
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List, Optional, Set
+
+from sqlalchemy import select, tuple_, update
+from sqlalchemy.orm import Session
+
+from .database import SessionLocal
+from .hub import CLOSED, session_hub
+from .live_sessions import live_sessions
+from .models import GameSessionModel
+
+logger = logging.getLogger(__name__)
+
+_sessions = GameSessionModel.__table__
+
+
+class _ReapedSession:
+    """Enough of a GameSessionModel for the session hub's CLOSED event."""
+
+    __slots__ = ("id", "username", "score", "mode", "is_live")
+
+    def __init__(self, id, username, score, mode):
+        self.id = id
+        self.username = username
+        self.score = score
+        self.mode = mode
+        self.is_live = False
+
+
+class SessionReaper:
+    """Batched sweeps that close stale live sessions."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        reap_after: float = 300.0,
+        interval: float = 60.0,
+        batch_size: int = 500,
+    ):
+        self.session_factory = session_factory
+        self.reap_after = reap_after
+        self.interval = interval
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._sweeps = 0
+        self._reaped = 0
+        self._failures = 0
+        self._last_sweep_seconds = 0.0
+        self._max_sweep_seconds = 0.0
+
+    @classmethod
+    def from_env(cls, session_factory: Callable[[], Session]) -> "SessionReaper":
+        return cls(
+            session_factory,
+            reap_after=float(os.getenv("SESSION_REAP_AFTER", 300)),
+            interval=float(os.getenv("SESSION_SWEEP_INTERVAL", 60)),
+            batch_size=int(os.getenv("SESSION_SWEEP_BATCH", 500)),
+        )
+
+    def sweep(self, db: Session, now: Optional[datetime] = None) -> int:
+        """Close every live session last seen before the timeout. Returns how many."""
+        start = time.perf_counter()
+        cutoff = (now or datetime.now(timezone.utc)) - timedelta(seconds=self.reap_after)
+        stale = (_sessions.c.is_live == True) & (_sessions.c.last_seen < cutoff)
+        # Sessions this process tracks have fresher heartbeats in memory; the
+        # live session store expires those itself. Skipped here rather than in
+        # SQL, so the query does not bind one parameter per live session.
+        tracked = {record.id for record in live_sessions.live()}
+        position = tuple_(_sessions.c.last_seen, _sessions.c.id)
+        after = None
+        reaped = 0
+        while True:
+            query = select(
+                _sessions.c.id, _sessions.c.username, _sessions.c.score, _sessions.c.mode, _sessions.c.last_seen
+            ).where(stale)
+            if after is not None:
+                # Tracked sessions stay stale in the table; continue past them
+                query = query.where(position > tuple_(*after))
+            rows = db.execute(
+                query.order_by(_sessions.c.last_seen, _sessions.c.id).limit(self.batch_size)
+            ).all()
+            if not rows:
+                db.rollback()
+                break
+            after = (rows[-1].last_seen, rows[-1].id)
+            closed = self._close(db, [row.id for row in rows if row.id not in tracked], stale)
+            db.commit()
+            reaped += len(closed)
+            for row in rows:
+                if row.id in closed:
+                    session_hub.publish(CLOSED, _ReapedSession(row.id, row.username, row.score, row.mode))
+            if len(rows) < self.batch_size:
+                break
+
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._sweeps += 1
+            self._reaped += reaped
+            self._last_sweep_seconds = elapsed
+            self._max_sweep_seconds = max(self._max_sweep_seconds, elapsed)
+        if reaped:
+            logger.info("Reaped %d stale live sessions in %.3fs", reaped, elapsed)
+        return reaped
+
+    @staticmethod
+    def _close(db: Session, ids: List[str], stale) -> Set[str]:
+        """Close the sessions among ``ids`` that are still stale; returns their ids."""
+        if not ids:
+            return set()
+        statement = update(_sessions).where(stale).values(is_live=False)
+        if db.get_bind().dialect.update_returning:
+            return set(db.execute(statement.where(_sessions.c.id.in_(ids)).returning(_sessions.c.id)).scalars())
+        return {
+            session_id for session_id in ids
+            if db.execute(statement.where(_sessions.c.id == session_id)).rowcount
+        }
+
+    def sweep_once(self) -> int:
+        db = self.session_factory()
+        try:
+            return self.sweep(db)
+        except Exception:
+            db.rollback()
+            with self._lock:
+                self._failures += 1
+            logger.exception("Sweeping stale live sessions failed")
+            return 0
+        finally:
+            db.close()
+
+    async def run(self) -> None:
+        """Sweep every ``interval`` seconds until cancelled."""
+        while True:
+            await asyncio.to_thread(self.sweep_once)
+            await asyncio.sleep(self.interval)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "sweeps": self._sweeps,
+                "reaped": self._reaped,
+                "failures": self._failures,
+                "last_sweep_seconds": self._last_sweep_seconds,
+                "max_sweep_seconds": self._max_sweep_seconds,
+            }
+
+
+session_reaper = SessionReaper.from_env(SessionLocal)
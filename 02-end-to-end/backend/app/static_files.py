@@ -0,0 +1,171 @@
+"""
+Serves the frontend build from an in-memory manifest.
+
+The build directory is scanned once at startup. Each request is then a dict
+lookup: no filesystem calls, and no index.html fallback for paths that look
+like files. For every file the manifest keeps its content type, ETag and
+stat result, and its precompressed siblings (``app.js.br``,
+``app.js.gz``) when the build produced them; text files without a ``.gz``
+sibling are gzipped once in memory.
+
+    STATIC_MEMORY_LIMIT   files up to this many bytes are held in memory
+                          (default 256 KiB); larger ones are sent with
+                          FileResponse, zero-copy where the server supports
+                          the ASGI pathsend extension
+
+Hashed build output under ``assets/`` (``assets/index-3f9a1c2b.js``) is
+cached by browsers for a year as immutable; everything else, index.html and
+public files such as ``apple-touch-icon.png`` included, is revalidated with
+its ETag on each use. Files over the memory limit are never read at startup;
+their ETag comes from their size and modification time.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional
+
+from fastapi import Request
+from fastapi.responses import FileResponse, JSONResponse, Response
+
+# Encodings in order of preference, with their file suffixes
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+# Vite writes its hashed output as assets/<name>-<hash>.<ext>; files copied
+# from public/ keep their names, however hash-like
+HASHED_NAME = re.compile(r"^assets/(?:.+/)?[^/]+-[A-Za-z0-9_-]{8,}\.[a-z0-9]+$")
+
+COMPRESSIBLE = {".html", ".js", ".mjs", ".css", ".json", ".svg", ".txt", ".xml", ".map", ".webmanifest"}
+
+
+class Variant(NamedTuple):
+    """One encoding of a file: the file itself or a compressed sibling."""
+    path: Path
+    stat: os.stat_result
+    etag: str
+    body: Optional[bytes]
+
+
+class StaticAsset(NamedTuple):
+    content_type: str
+    cache_control: str
+    # "identity" plus any of ENCODINGS
+    variants: Dict[str, Variant]
+
+
+def _etag(data: bytes, encoding: str) -> str:
+    digest = hashlib.blake2b(data, digest_size=8).hexdigest()
+    return f'"{digest}"' if encoding == "identity" else f'"{digest}-{encoding}"'
+
+
+def _accepted(header: str) -> set:
+    """Content codings an Accept-Encoding header allows (q > 0)."""
+    accepted = set()
+    for part in header.split(","):
+        name, _, params = part.partition(";")
+        quality = 1.0
+        key, _, value = params.strip().partition("=")
+        if key.strip() == "q":
+            try:
+                quality = float(value)
+            except ValueError:
+                pass
+        if quality > 0:
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag in tags
+
+
+class StaticManifest:
+    """The files of a static build, keyed by URL path."""
+
+    def __init__(self, root: Path, memory_limit: int = 256 * 1024):
+        self.root = root
+        self.memory_limit = memory_limit
+        self.assets: Dict[str, StaticAsset] = {}
+        self.memory_bytes = 0
+        if root.is_dir():
+            self._scan()
+
+    @classmethod
+    def from_env(cls, root: Path) -> "StaticManifest":
+        return cls(root, memory_limit=int(os.getenv("STATIC_MEMORY_LIMIT", 256 * 1024)))
+
+    def __bool__(self) -> bool:
+        return bool(self.assets)
+
+    def _variant(self, path: Path, encoding: str) -> Variant:
+        stat = path.stat()
+        if stat.st_size > self.memory_limit:
+            # Served from disk, so not read here; identify it by size and mtime
+            return Variant(path, stat, _etag(f"{stat.st_size}-{stat.st_mtime_ns}".encode(), encoding), None)
+        body = path.read_bytes()
+        self.memory_bytes += len(body)
+        return Variant(path, stat, _etag(body, encoding), body)
+
+    def _scan(self) -> None:
+        suffixes = tuple(suffix for _, suffix in ENCODINGS)
+        for path in sorted(self.root.rglob("*")):
+            if not path.is_file() or path.name.endswith(suffixes):
+                continue
+            key = path.relative_to(self.root).as_posix()
+            variants = {"identity": self._variant(path, "identity")}
+            data = variants["identity"].body
+            for encoding, suffix in ENCODINGS:
+                sibling = path.with_name(path.name + suffix)
+                if sibling.is_file():
+                    variants[encoding] = self._variant(sibling, encoding)
+            if "gzip" not in variants and path.suffix in COMPRESSIBLE and data is not None:
+                compressed = gzip.compress(data, compresslevel=9, mtime=0)
+                if len(compressed) < len(data):
+                    self.memory_bytes += len(compressed)
+                    variants["gzip"] = Variant(path, variants["identity"].stat, _etag(data, "gzip"), compressed)
+            content_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+            if content_type.startswith("text/") or content_type in ("application/javascript", "application/json"):
+                content_type += "; charset=utf-8"
+            cache_control = IMMUTABLE if HASHED_NAME.match(key) else REVALIDATE
+            self.assets[key] = StaticAsset(content_type, cache_control, variants)
+
+    def lookup(self, path: str) -> Optional[StaticAsset]:
+        """The asset for a URL path; client-side routes get index.html."""
+        path = path.strip("/")
+        asset = self.assets.get(path or "index.html")
+        if asset is not None:
+            return asset
+        # Paths that name a file are missing files, not client-side routes
+        if path.startswith("assets/") or "." in path.rsplit("/", 1)[-1]:
+            return None
+        return self.assets.get("index.html")
+
+    def response(self, request: Request, path: str) -> Response:
+        asset = self.lookup(path)
+        if asset is None:
+            return JSONResponse({"detail": "Not Found"}, status_code=404)
+
+        encoding = "identity"
+        if len(asset.variants) > 1:
+            accepted = _accepted(request.headers.get("accept-encoding", ""))
+            encoding = next((e for e, _ in ENCODINGS if e in asset.variants and e in accepted), "identity")
+        variant = asset.variants[encoding]
+
+        headers = {"Cache-Control": asset.cache_control, "ETag": variant.etag}
+        if len(asset.variants) > 1:
+            headers["Vary"] = "Accept-Encoding"
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _etag_matches(if_none_match, variant.etag):
+            return Response(status_code=304, headers=headers)
+        if variant.body is not None:
+            return Response(content=variant.body, media_type=asset.content_type, headers=headers)
+        return FileResponse(variant.path, media_type=asset.content_type, headers=headers, stat_result=variant.stat)
@@ -0,0 +1,177 @@
+"""
+Seeded synthetic data in the shape production data takes, at any scale.
+
+``SyntheticData(users=1_000_000, seed=1).load(engine)`` fills users,
+leaderboard_entries, player_best_scores and game_sessions. The same seed,
+sizes and ``now`` always produce the same rows. Rows are generated one
+player at a time and written in batches, so memory use does not grow with
+the dataset:
+
+    activity   games per player are lognormal: most play a handful, a few
+               play hundreds
+    scores     multiples of 10, a per-player skill times Pareto-distributed
+               luck; pass-through games score higher than walls
+    modes      each player has their own mix, about 65% walls overall
+    dates      recent games are more common, spread over ``days`` days
+    sessions   a finished session for about one game in ten, plus exactly
+               ``live_sessions`` live ones with a heartbeat in the last
+               half minute
+
+Every player's password is ``PASSWORD``. Loading drops the secondary
+indexes, bulk inserts (COPY on PostgreSQL), and rebuilds them at the end, in
+one transaction. Load into an empty database, or pick a ``prefix`` that no
+existing username starts with.
+"""
+import math
+import random
+import uuid
+from collections import defaultdict
+from datetime import datetime, time, timedelta, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import Table
+from sqlalchemy.engine import Engine
+
+from .models import GameMode, GameSessionModel, LeaderboardEntryModel, PlayerBestScoreModel, UserModel
+from .passwords import SALT_BYTES, SCHEME, _b64encode, _scrypt
+from .transfer import DEFAULT_BATCH_SIZE, Progress, bulk_insert
+
+PASSWORD = "password123"
+
+USERS = UserModel.__table__
+ENTRIES = LeaderboardEntryModel.__table__
+BESTS = PlayerBestScoreModel.__table__
+SESSIONS = GameSessionModel.__table__
+
+# Tables in load order
+TABLES = (USERS, ENTRIES, BESTS, SESSIONS)
+
+WALLS_SHARE = 0.65
+SESSION_SHARE = 0.1
+# Pass-through games last longer, so they score higher
+MODE_FACTOR = {GameMode.WALLS: 1.0, GameMode.PASS_THROUGH: 1.6}
+
+
+class SyntheticData:
+    """A deterministic dataset description; ``load`` writes it to a database."""
+
+    def __init__(
+        self,
+        users: int = 10_000,
+        games_per_user: float = 8.0,
+        live_sessions: Optional[int] = None,
+        seed: int = 1,
+        now: Optional[datetime] = None,
+        days: int = 365,
+        prefix: str = "player",
+    ):
+        self.users = users
+        self.games_per_user = games_per_user
+        self.live_sessions = min(users // 100 if live_sessions is None else live_sessions, users)
+        self.seed = seed
+        self.now = now or datetime.now(timezone.utc)
+        self.days = days
+        self.prefix = prefix
+
+    def username(self, n: int) -> str:
+        return f"{self.prefix}{n}"
+
+    def _password_hash(self) -> str:
+        # One hash for everyone: hashing millions of passwords would dominate the load
+        n, r, p = 2 ** 14, 8, 1
+        salt = random.Random(self.seed).randbytes(SALT_BYTES)
+        digest = _scrypt(PASSWORD, salt, n, r, p)
+        return f"{SCHEME}${n}${r}${p}${_b64encode(salt)}${_b64encode(digest)}"
+
+    def rows(self) -> Iterator[Tuple[Table, dict]]:
+        """Every row of the dataset with its table, player by player."""
+        rng = random.Random(self.seed)
+        password_hash = self._password_hash()
+        today = self.now.date()
+        # Lognormal with the requested mean
+        sigma = 1.0
+        mu = math.log(self.games_per_user) - sigma ** 2 / 2
+        max_games = int(self.games_per_user * 50)
+        live_left = self.live_sessions
+
+        def new_id() -> str:
+            return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+        for n in range(self.users):
+            username = self.username(n)
+            yield USERS, {
+                "id": new_id(),
+                "username": username,
+                "email": f"{username}@example.com",
+                "password_hash": password_hash,
+            }
+
+            skill = rng.lognormvariate(0, 0.6)
+            walls_share = rng.betavariate(WALLS_SHARE * 10, (1 - WALLS_SHARE) * 10)
+            games = min(max(1, round(rng.lognormvariate(mu, sigma))), max_games)
+            bests: Dict[GameMode, dict] = {}
+            for _ in range(games):
+                mode = GameMode.WALLS if rng.random() < walls_share else GameMode.PASS_THROUGH
+                score = 10 * max(1, int(skill * MODE_FACTOR[mode] * rng.paretovariate(2.0) * 4))
+                played = today - timedelta(days=min(int(rng.expovariate(1 / 45)), self.days - 1))
+                entry = {"id": new_id(), "username": username, "score": score, "mode": mode, "date": played}
+                yield ENTRIES, entry
+
+                # Same tie-break as migrations.backfill_best_scores
+                best = bests.get(mode)
+                if best is None or (-score, played, entry["id"]) < (-best["score"], best["date"], best["id"]):
+                    bests[mode] = entry
+
+                if rng.random() < SESSION_SHARE:
+                    ended = datetime.combine(played, time(), timezone.utc) + timedelta(seconds=rng.randrange(86400))
+                    yield SESSIONS, {
+                        "id": new_id(), "username": username, "score": score, "mode": mode,
+                        "is_live": False, "last_seen": min(ended, self.now),
+                    }
+
+            for mode, best in bests.items():
+                yield BESTS, {
+                    "username": username, "mode": mode, "best_score": best["score"],
+                    "entry_id": best["id"], "achieved_at": best["date"],
+                }
+
+            # Selection sampling: exactly live_sessions players, spread evenly
+            if live_left and rng.random() * (self.users - n) < live_left:
+                live_left -= 1
+                mode = GameMode.WALLS if rng.random() < walls_share else GameMode.PASS_THROUGH
+                yield SESSIONS, {
+                    "id": new_id(), "username": username, "score": 10 * rng.randrange(50), "mode": mode,
+                    "is_live": True, "last_seen": self.now - timedelta(seconds=rng.uniform(0, 30)),
+                }
+
+    def batches(self, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[Tuple[Table, List[dict]]]:
+        """The rows grouped into per-table batches of up to ``batch_size``."""
+        pending: Dict[Table, List[dict]] = defaultdict(list)
+        for table, row in self.rows():
+            batch = pending[table]
+            batch.append(row)
+            if len(batch) >= batch_size:
+                yield table, batch
+                pending[table] = []
+        for table in TABLES:
+            if pending[table]:
+                yield table, pending[table]
+
+    def load(
+        self, engine: Engine, batch_size: int = DEFAULT_BATCH_SIZE, progress: Optional[Progress] = None
+    ) -> Dict[str, int]:
+        """Write the dataset; returns the rows inserted per table."""
+        counts = {table.name: 0 for table in TABLES}
+        indexes = [index for table in TABLES for index in table.indexes]
+        with engine.begin() as connection:
+            # Building each index once at the end beats updating it per row
+            for index in indexes:
+                index.drop(connection, checkfirst=True)
+            for table, rows in self.batches(batch_size):
+                bulk_insert(connection, table, rows)
+                counts[table.name] += len(rows)
+                if progress is not None:
+                    progress.advance(len(rows))
+            for index in indexes:
+                index.create(connection)
+        return counts
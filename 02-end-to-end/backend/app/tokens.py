@@ -0,0 +1,209 @@
+"""
+Signed bearer tokens, issued at login/signup and verified without the database.
+
+A token is ``<payload>.<signature>``: the base64url JSON payload (user id,
+username, expiry, token id) and its HMAC-SHA256 under AUTH_SECRET. Verifying
+one is an HMAC, an expiry check and a lookup in the in-memory revocation list
+that ``POST /auth/logout`` adds to. Revocations are kept until the token
+would have expired anyway: broadcast to the other workers, and stored in the
+revoked_tokens table, which each worker loads at startup (``warm``) so a
+restart does not bring logged-out tokens back.
+
+    AUTH_SECRET        signing key. When unset a random key is generated at
+                       startup, so tokens do not survive a restart (workers
+                       forked by app.serve share it)
+    AUTH_TOKEN_TTL     seconds a token stays valid (default 7 days)
+    AUTH_USER_CACHE    user records kept for /auth/me (default 1024)
+"""
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional
+
+from fastapi import Header, HTTPException
+from sqlalchemy.orm import Session
+
+from .models import RevokedTokenModel, User
+
+logger = logging.getLogger(__name__)
+
+
+class TokenError(Exception):
+    """The token is malformed, forged, expired or revoked."""
+
+
+class TokenClaims(NamedTuple):
+    user_id: str
+    username: str
+    expires_at: int
+    token_id: str
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+class TokenSigner:
+    """Issues, verifies and revokes tokens."""
+
+    def __init__(self, secret: bytes, ttl: float = 7 * 24 * 3600):
+        self._secret = secret
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # token id -> expiry, pruned as entries expire
+        self._revoked: Dict[str, int] = {}
+        self._issued = 0
+        self._verified = 0
+        self._rejected = 0
+
+    @classmethod
+    def from_env(cls) -> "TokenSigner":
+        secret = os.getenv("AUTH_SECRET", "").encode()
+        if not secret:
+            logger.warning("AUTH_SECRET is not set; tokens will be invalid after a restart")
+            secret = secrets.token_bytes(32)
+        return cls(secret, ttl=float(os.getenv("AUTH_TOKEN_TTL", 7 * 24 * 3600)))
+
+    def _sign(self, payload: str) -> str:
+        return _b64encode(hmac.new(self._secret, payload.encode(), hashlib.sha256).digest())
+
+    def issue(self, user_id: str, username: str, now: Optional[float] = None) -> str:
+        expires_at = int((now if now is not None else time.time()) + self.ttl)
+        claims = {"sub": user_id, "usr": username, "exp": expires_at, "jti": uuid.uuid4().hex}
+        payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+        with self._lock:
+            self._issued += 1
+        return f"{payload}.{self._sign(payload)}"
+
+    def verify(self, token: str, now: Optional[float] = None) -> TokenClaims:
+        try:
+            claims = self._verify(token, now if now is not None else time.time())
+        except TokenError:
+            with self._lock:
+                self._rejected += 1
+            raise
+        with self._lock:
+            self._verified += 1
+        return claims
+
+    def _verify(self, token: str, now: float) -> TokenClaims:
+        payload, _, signature = token.partition(".")
+        if not payload or not signature:
+            raise TokenError("Malformed token")
+        # Compared as bytes: compare_digest rejects non-ASCII str with TypeError
+        if not hmac.compare_digest(signature.encode(), self._sign(payload).encode()):
+            raise TokenError("Invalid token signature")
+        try:
+            data = json.loads(_b64decode(payload))
+            claims = TokenClaims(data["sub"], data["usr"], int(data["exp"]), data["jti"])
+        except (ValueError, KeyError, TypeError):
+            raise TokenError("Malformed token")
+        if claims.expires_at <= now:
+            raise TokenError("Token expired")
+        with self._lock:
+            if claims.token_id in self._revoked:
+                raise TokenError("Token revoked")
+        return claims
+
+    def revoke(self, token_id: str, expires_at: int, now: Optional[float] = None) -> None:
+        now = now if now is not None else time.time()
+        with self._lock:
+            self._revoked[token_id] = expires_at
+            expired = [jti for jti, expiry in self._revoked.items() if expiry <= now]
+            for jti in expired:
+                del self._revoked[jti]
+
+    def warm(self, db: Session, now: Optional[float] = None) -> None:
+        """Load the stored revocations that have not expired yet."""
+        now = now if now is not None else time.time()
+        rows = db.query(RevokedTokenModel.token_id, RevokedTokenModel.expires_at).filter(
+            RevokedTokenModel.expires_at > now
+        )
+        with self._lock:
+            self._revoked.update(rows)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._revoked.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "issued": self._issued,
+                "verified": self._verified,
+                "rejected": self._rejected,
+                "revoked": len(self._revoked),
+            }
+
+
+class UserCache:
+    """LRU of user records by id, so /auth/me rarely needs the database."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._users: "OrderedDict[str, User]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, user_id: str) -> Optional[User]:
+        with self._lock:
+            user = self._users.get(user_id)
+            if user is None:
+                self._misses += 1
+                return None
+            self._users.move_to_end(user_id)
+            self._hits += 1
+            return user
+
+    def put(self, user: User) -> None:
+        with self._lock:
+            self._users[user.id] = user
+            self._users.move_to_end(user.id)
+            while len(self._users) > self.max_entries:
+                self._users.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._users.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._users), "hits": self._hits, "misses": self._misses}
+
+
+token_signer = TokenSigner.from_env()
+user_cache = UserCache(int(os.getenv("AUTH_USER_CACHE", 1024)))
+
+
+def optional_claims(authorization: Optional[str] = Header(None)) -> Optional[TokenClaims]:
+    """Dependency: the caller's verified token claims, or None without a token."""
+    if authorization is None:
+        return None
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        raise HTTPException(status_code=401, detail="Expected a Bearer token", headers={"WWW-Authenticate": "Bearer"})
+    try:
+        return token_signer.verify(token.strip())
+    except TokenError as exc:
+        raise HTTPException(status_code=401, detail=str(exc), headers={"WWW-Authenticate": "Bearer"})
+
+
+def require_claims(authorization: Optional[str] = Header(None)) -> TokenClaims:
+    """Dependency: the caller's verified token claims; 401 without a token."""
+    claims = optional_claims(authorization)
+    if claims is None:
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+    return claims
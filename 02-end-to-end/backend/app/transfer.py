@@ -0,0 +1,318 @@
+"""
+Bulk export and import of tables as NDJSON or CSV, in constant memory.
+
+Export streams a table in primary key order through a server-side cursor
+(``stream_results`` with ``yield_per``), one batch at a time. Import reads the
+file a batch at a time and inserts each batch in its own transaction: one
+``executemany`` INSERT, or ``COPY ... FROM STDIN`` on PostgreSQL with psycopg2.
+
+Both directions keep a checkpoint next to the data file, rewritten after
+every batch, so an interrupted run continues where it stopped when it is
+started again with ``resume=True``:
+
+    <file>.export-checkpoint   table, last primary key written, bytes written
+    <file>.import-checkpoint   table, rows of the file already committed
+
+Values are written as the API shows them: modes as ``walls`` /
+``pass-through``, dates and timestamps in ISO 8601.
+"""
+import csv
+import io
+import json
+import os
+import sys
+import time
+from datetime import date, datetime
+from enum import Enum
+from pathlib import Path
+from typing import IO, Iterator, List, Optional
+
+from sqlalchemy import Boolean, Date, DateTime, Enum as SQLEnum, Integer, Table, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection, Engine
+
+from .models import GameSessionModel, LeaderboardEntryModel, UserModel
+
+TABLES = {
+    model.__table__.name: model.__table__
+    for model in (UserModel, LeaderboardEntryModel, GameSessionModel)
+}
+
+FORMATS = ("ndjson", "csv")
+
+DEFAULT_BATCH_SIZE = 5000
+
+
+def detect_format(path: Path, format: Optional[str] = None) -> str:
+    """The format given, or the one the file extension names."""
+    if format is None:
+        format = {".ndjson": "ndjson", ".jsonl": "ndjson", ".csv": "csv"}.get(path.suffix.lower())
+    if format not in FORMATS:
+        raise ValueError(f"Cannot tell the format of {path}; pass one of: {', '.join(FORMATS)}")
+    return format
+
+
+def _encode(value):
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _decode(column, value):
+    if value is None or (value == "" and column.nullable):
+        return None
+    kind = column.type
+    if isinstance(kind, SQLEnum):
+        return kind.enum_class(value)
+    if isinstance(kind, Boolean):
+        return value if isinstance(value, bool) else value.lower() in ("true", "1", "t")
+    if isinstance(kind, Integer):
+        return int(value)
+    if isinstance(kind, DateTime):
+        return datetime.fromisoformat(value)
+    if isinstance(kind, Date):
+        return date.fromisoformat(value)
+    return value
+
+
+def _copy_field(column, value) -> str:
+    """A value in PostgreSQL's COPY text format."""
+    if value is None:
+        return r"\N"
+    if isinstance(value, Enum):
+        # SQLAlchemy stores Python enums by member name
+        return value.name
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    text = _encode(value)
+    return str(text).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+class Progress:
+    """Prints rows done and throughput every ``interval`` seconds, and at the end."""
+
+    def __init__(self, label: str, stream: Optional[IO[str]] = None, interval: float = 2.0):
+        self.label = label
+        self.stream = stream
+        self.interval = interval
+        self.rows = 0
+        self.started = time.perf_counter()
+        self._last_report = self.started
+
+    def advance(self, rows: int) -> None:
+        self.rows += rows
+        now = time.perf_counter()
+        if now - self._last_report >= self.interval:
+            self._last_report = now
+            self._report(now, "")
+
+    def finish(self) -> None:
+        self._report(time.perf_counter(), " done")
+
+    def _report(self, now: float, suffix: str) -> None:
+        elapsed = now - self.started
+        rate = self.rows / elapsed if elapsed > 0 else 0.0
+        print(f"{self.label}: {self.rows} rows in {elapsed:.1f}s ({rate:,.0f} rows/s){suffix}", file=self.stream or sys.stderr)
+
+
+class Checkpoint:
+    """Progress of one export or import, saved atomically next to its data file."""
+
+    def __init__(self, data_path: Path, direction: str):
+        self.path = data_path.with_name(f"{data_path.name}.{direction}-checkpoint")
+
+    def load(self) -> Optional[dict]:
+        if not self.path.exists():
+            return None
+        return json.loads(self.path.read_text())
+
+    def save(self, state: dict) -> None:
+        temporary = self.path.with_name(self.path.name + ".tmp")
+        temporary.write_text(json.dumps(state))
+        os.replace(temporary, self.path)
+
+    def remove(self) -> None:
+        self.path.unlink(missing_ok=True)
+
+
+def _resume_state(checkpoint: Checkpoint, table: Table, format: str, resume: bool) -> Optional[dict]:
+    state = checkpoint.load() if resume else None
+    if state is not None and (state["table"], state["format"]) != (table.name, format):
+        raise ValueError(
+            f"{checkpoint.path} belongs to a {state['format']} transfer of {state['table']}, "
+            f"not {format} of {table.name}"
+        )
+    if not resume:
+        checkpoint.remove()
+    return state
+
+
+def _serialize(table: Table, rows: List, format: str) -> bytes:
+    buffer = io.StringIO()
+    if format == "ndjson":
+        for row in rows:
+            buffer.write(json.dumps({key: _encode(value) for key, value in row._mapping.items()}))
+            buffer.write("\n")
+    else:
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerows([_encode(value) for value in row] for row in rows)
+    return buffer.getvalue().encode()
+
+
+def export_table(
+    connection: Connection,
+    table: Table,
+    path: Path,
+    format: str,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    resume: bool = False,
+    progress: Optional[Progress] = None,
+) -> int:
+    """
+    Write ``table`` to ``path``; returns the number of rows written by this
+    call. With ``resume``, continues after the last checkpointed row.
+    """
+    checkpoint = Checkpoint(path, "export")
+    state = _resume_state(checkpoint, table, format, resume)
+    key = table.primary_key.columns.values()[0]
+    query = select(table).order_by(key)
+
+    if state is None:
+        output = open(path, "wb")
+        if format == "csv":
+            output.write((",".join(table.columns.keys()) + "\n").encode())
+        written_total = 0
+    else:
+        output = open(path, "r+b")
+        # Drop anything written after the checkpoint, then carry on from there
+        output.truncate(state["offset"])
+        output.seek(state["offset"])
+        query = query.where(key > state["last_key"])
+        written_total = state["rows"]
+
+    written = 0
+    with output:
+        result = connection.execution_options(stream_results=True, yield_per=batch_size).execute(query)
+        for rows in result.partitions():
+            output.write(_serialize(table, rows, format))
+            output.flush()
+            os.fsync(output.fileno())
+            written += len(rows)
+            checkpoint.save({
+                "table": table.name,
+                "format": format,
+                "last_key": rows[-1]._mapping[key.name],
+                "rows": written_total + written,
+                "offset": output.tell(),
+            })
+            if progress is not None:
+                progress.advance(len(rows))
+    checkpoint.remove()
+    return written
+
+
+def _read_rows(path: Path, format: str) -> Iterator[dict]:
+    with open(path, newline="" if format == "csv" else None, encoding="utf-8") as source:
+        if format == "csv":
+            yield from csv.DictReader(source)
+        else:
+            for line in source:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def _batches(rows: Iterator[dict], size: int) -> Iterator[List[dict]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _copy(connection: Connection, table: Table, rows: List[dict]) -> None:
+    columns = list(table.columns)
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join(_copy_field(column, row[column.name]) for column in columns))
+        buffer.write("\n")
+    buffer.seek(0)
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {table.name} ({', '.join(column.name for column in columns)}) FROM STDIN", buffer
+        )
+    finally:
+        cursor.close()
+
+
+def can_copy(connection: Connection) -> bool:
+    return connection.dialect.name == "postgresql" and connection.dialect.driver == "psycopg2"
+
+
+def bulk_insert(connection: Connection, table: Table, rows: List[dict]) -> None:
+    """
+    Insert rows holding a value for every column: COPY on PostgreSQL with
+    psycopg2, otherwise one executemany INSERT.
+    """
+    if can_copy(connection):
+        _copy(connection, table, rows)
+    else:
+        connection.execute(insert(table), rows)
+
+
+def import_table(
+    engine: Engine,
+    table: Table,
+    path: Path,
+    format: str,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    resume: bool = False,
+    skip_existing: bool = False,
+    progress: Optional[Progress] = None,
+) -> int:
+    """
+    Insert the rows of ``path`` into ``table``, one transaction per batch;
+    returns the number of rows read by this call. ``skip_existing`` ignores
+    rows whose primary key is already present instead of failing.
+    """
+    checkpoint = Checkpoint(path, "import")
+    state = _resume_state(checkpoint, table, format, resume)
+    done = state["rows"] if state is not None else 0
+
+    statement = None
+    if skip_existing:
+        dialect = {"postgresql": postgresql, "sqlite": sqlite}.get(engine.dialect.name)
+        if dialect is None:
+            raise ValueError(f"skip_existing is not supported on {engine.dialect.name}")
+        statement = dialect.insert(table).on_conflict_do_nothing()
+
+    required = {column.name for column in table.columns if not column.nullable}
+    rows = _read_rows(path, format)
+    # The checkpointed rows are committed already
+    for _ in range(done):
+        next(rows, None)
+
+    imported = 0
+    for batch in _batches(rows, batch_size):
+        decoded = []
+        for row in batch:
+            missing = required - row.keys()
+            if missing:
+                raise ValueError(f"Row {done + imported + len(decoded) + 1} has no {', '.join(sorted(missing))}")
+            decoded.append({column.name: _decode(column, row.get(column.name)) for column in table.columns})
+        with engine.begin() as connection:
+            if statement is None:
+                bulk_insert(connection, table, decoded)
+            else:
+                connection.execute(statement, decoded)
+        imported += len(batch)
+        checkpoint.save({"table": table.name, "format": format, "rows": done + imported})
+        if progress is not None:
+            progress.advance(len(batch))
+    checkpoint.remove()
+    return imported
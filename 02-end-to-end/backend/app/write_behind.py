@@ -0,0 +1,237 @@
+"""
+Write-behind batching for score submissions.
+
+With ``SCORE_WRITE_MODE=write_behind`` a submitted score is ranked against
+the in-memory rank index immediately and queued; a background thread flushes
+the queue with one bulk INSERT per transaction every
+``SCORE_FLUSH_INTERVAL_MS`` milliseconds, or sooner once
+``SCORE_FLUSH_MAX_ROWS`` rows are waiting.
+
+``SCORE_DURABILITY`` decides when the client gets its answer:
+
+    buffered   respond right away; a crash loses at most one flush window
+               of scores. A failed flush is retried FLUSH_ATTEMPTS times,
+               then its scores are dropped and unranked.
+    flushed    respond once the batch holding the score has committed
+               (group commit: many submissions share one transaction). A
+               failed flush fails the waiting requests.
+
+On shutdown ``drain`` flushes whatever is still queued.
+"""
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from datetime import date
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from .database import SessionLocal
+from .cache import leaderboard_cache
+from .coordination import coordinator
+from .db import DatabaseService
+from .models import GameMode
+from .ranking import RankedEntry, leaderboard_index, player_index
+
+logger = logging.getLogger(__name__)
+
+BUFFERED = "buffered"
+FLUSHED = "flushed"
+
+# Failed flushes retried while draining before the remaining scores are dropped
+DRAIN_ATTEMPTS = 3
+
+# Times a buffered score is flushed before it is dropped, so one row that
+# always fails does not hold back every later score
+FLUSH_ATTEMPTS = 5
+
+
+class ScoreWriteBuffer:
+    """Queues leaderboard inserts and flushes them in bulk."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        interval: float = 0.05,
+        max_rows: int = 500,
+        durability: str = BUFFERED,
+        enabled: bool = True,
+    ):
+        if durability not in (BUFFERED, FLUSHED):
+            raise ValueError(f"Unknown score durability: {durability}")
+        self.session_factory = session_factory
+        self.interval = interval
+        self.max_rows = max_rows
+        self.durability = durability
+        self.enabled = enabled
+        self._condition = threading.Condition()
+        self._queue: List[Tuple[RankedEntry, Optional[Future]]] = []
+        # entry id -> failed flushes, for queued entries that have failed
+        self._attempts: Dict[str, int] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self._flushed_rows = 0
+        self._flushes = 0
+        self._failures = 0
+        self._dropped = 0
+        self._last_flush_seconds = 0.0
+
+    @classmethod
+    def from_env(cls, session_factory: Callable[[], Session]) -> "ScoreWriteBuffer":
+        return cls(
+            session_factory,
+            interval=int(os.getenv("SCORE_FLUSH_INTERVAL_MS", 50)) / 1000,
+            max_rows=int(os.getenv("SCORE_FLUSH_MAX_ROWS", 500)),
+            durability=os.getenv("SCORE_DURABILITY", BUFFERED),
+            enabled=os.getenv("SCORE_WRITE_MODE", "sync") == "write_behind",
+        )
+
+    def start(self) -> None:
+        with self._condition:
+            if self._thread is not None:
+                return
+            self._stopping = False
+            self._thread = threading.Thread(
+                target=self._run, name="score-write-behind", daemon=True
+            )
+            self._thread.start()
+
+    def submit(self, username: str, score: int, mode: GameMode) -> Tuple[RankedEntry, int, Optional[Future]]:
+        """
+        Rank and queue a score.
+        Returns: (entry, rank, future) where future resolves once the entry is
+        committed, or None in buffered mode.
+        """
+        if not (leaderboard_index.is_warm and player_index.is_warm):
+            db = self.session_factory()
+            try:
+                leaderboard_index.ensure_warm(db)
+                player_index.ensure_warm(db)
+            finally:
+                db.close()
+
+        entry = RankedEntry(-score, str(uuid.uuid4()), username, mode, date.today())
+        rank = leaderboard_index.add(entry)
+        leaderboard_cache.invalidate_score(mode, score)
+        coordinator.score_added(entry)
+        done = Future() if self.durability == FLUSHED else None
+        with self._condition:
+            # Together, so a failed flush re-offers every queued entry it evicts around
+            player_index.offer(entry)
+            self._queue.append((entry, done))
+            if len(self._queue) >= self.max_rows:
+                self._condition.notify()
+        return entry, rank, done
+
+    def _run(self) -> None:
+        drain_failures = 0
+        while True:
+            with self._condition:
+                if not self._stopping and len(self._queue) < self.max_rows:
+                    self._condition.wait(self.interval)
+                batch, self._queue = self._queue, []
+                stopping = self._stopping
+            if batch and not self._flush(batch) and stopping:
+                drain_failures += 1
+            if stopping:
+                with self._condition:
+                    if not self._queue:
+                        return
+                    if drain_failures >= DRAIN_ATTEMPTS:
+                        logger.error("Dropping %d unflushed scores on shutdown", len(self._queue))
+                        self._queue.clear()
+                        return
+
+    def _flush(self, batch: List[Tuple[RankedEntry, Optional[Future]]]) -> bool:
+        start = time.perf_counter()
+        db = self.session_factory()
+        try:
+            DatabaseService(db).insert_scores([entry for entry, _ in batch])
+        except Exception as exc:
+            db.rollback()
+            self._failures += 1
+            logger.exception("Flushing %d queued scores failed", len(batch))
+            if self.durability == FLUSHED:
+                # The submitters are told it failed, so the scores must go too
+                for _, done in batch:
+                    done.set_exception(exc)
+                self._unrank(db, [entry for entry, _ in batch])
+                return False
+            retry, dropped = [], []
+            for entry, done in batch:
+                attempts = self._attempts.pop(entry.id, 0) + 1
+                if attempts < FLUSH_ATTEMPTS:
+                    self._attempts[entry.id] = attempts
+                    retry.append((entry, done))
+                else:
+                    dropped.append(entry)
+            with self._condition:
+                self._queue[:0] = retry
+            if dropped:
+                logger.error("Dropping %d scores after %d failed flushes", len(dropped), FLUSH_ATTEMPTS)
+                self._dropped += len(dropped)
+                self._unrank(db, dropped)
+            if not self._stopping:
+                time.sleep(self.interval)
+            return False
+        finally:
+            db.close()
+
+        self._flushes += 1
+        self._flushed_rows += len(batch)
+        self._last_flush_seconds = time.perf_counter() - start
+        for entry, done in batch:
+            self._attempts.pop(entry.id, None)
+            if done is not None:
+                done.set_result(None)
+        return True
+
+    def _unrank(self, db: Session, entries: List[RankedEntry]) -> None:
+        """Take scores that will never be written out of the indexes, on every worker."""
+        for entry in entries:
+            leaderboard_index.remove(entry)
+            leaderboard_cache.invalidate_score(entry.mode, entry.score)
+            coordinator.score_removed(entry)
+        self._evict_player_bests(db, entries)
+
+    def _evict_player_bests(self, db: Session, entries: List[RankedEntry]) -> None:
+        """Restore the bests the failed entries replaced, keeping queued ones."""
+        try:
+            stored = player_index.stored_bests(db, {entry.username for entry in entries})
+        except Exception:
+            logger.exception("Reloading player bests failed; the index will re-warm")
+            player_index.clear()
+            return
+        with self._condition:
+            player_index.evict(entries, stored, [entry for entry, _ in self._queue])
+
+    def drain(self, timeout: Optional[float] = 30.0) -> None:
+        """Flush everything still queued and stop the flusher thread."""
+        with self._condition:
+            thread, self._thread = self._thread, None
+            self._stopping = True
+            self._condition.notify()
+        if thread is not None:
+            thread.join(timeout)
+            if thread.is_alive():
+                logger.error("Score flusher did not drain within %ss", timeout)
+
+    def pending(self) -> int:
+        with self._condition:
+            return len(self._queue)
+
+    def stats(self) -> dict:
+        return {
+            "pending": self.pending(),
+            "flushed_rows": self._flushed_rows,
+            "flushes": self._flushes,
+            "failures": self._failures,
+            "dropped": self._dropped,
+            "last_flush_seconds": self._last_flush_seconds,
+        }
+
+
+score_writer = ScoreWriteBuffer.from_env(SessionLocal)
@@ -0,0 +1,80 @@
+"""Helpers shared by the benchmark scripts."""
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+import httpx
+from sqlalchemy import make_url
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(
+    database_url: str,
+    extra_env: Optional[dict] = None,
+    app: str = "app.main:app",
+    command: Optional[list] = None,
+) -> tuple[subprocess.Popen, str]:
+    """
+    Run ``app`` in a uvicorn subprocess and wait until it answers. A custom
+    ``command`` is run instead if given; it gets the port as PORT.
+    """
+    port = _free_port()
+    env = {**os.environ, "DATABASE_URL": database_url, "PORT": str(port), **(extra_env or {})}
+    process = subprocess.Popen(
+        command or [sys.executable, "-m", "uvicorn", app,
+                    "--port", str(port), "--log-level", "warning", "--backlog", "4096"],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"{url}/leaderboard", timeout=1)
+            return process, url
+        except httpx.TransportError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"Server for {redact_url(database_url)} did not start")
+
+
+def stop_server(process: subprocess.Popen) -> None:
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def redact_url(database_url: str) -> str:
+    """Database URL with the password masked, safe to print or store."""
+    return make_url(database_url).render_as_string(hide_password=True)
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def percentile(ordered: list, fraction: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return None
+    index = max(int(round(fraction * len(ordered))) - 1, 0)
+    return ordered[min(index, len(ordered) - 1)]
@@ -9,6 +9,17 @@ from fastapi.testclient import TestClient
 from app.main import app
 from app.models import Base
 from app.database import get_db
+from app.ranking import leaderboard_index, player_index
+from app.hub import session_hub
+from app.live_sessions import live_sessions
+from app.cache import leaderboard_cache
+from app.instrumentation import route_metrics
+from app.tokens import token_signer, user_cache
+from app.synthetic import SyntheticData
+
+# Players in the synthetic_data fixture; raise it for scale runs, e.g.
+# SYNTHETIC_USERS=1000000 uv run pytest tests/test_synthetic.py
+SYNTHETIC_USERS = int(os.getenv("SYNTHETIC_USERS", 2000))
 
 
 @pytest.fixture
@@ -48,6 +59,15 @@ def temp_db():
         os.unlink(db_path)
 
 
+@pytest.fixture
+def synthetic_data(temp_db):
+    """Load a seeded, production-shaped dataset into the test database."""
+    engine, _, _ = temp_db
+    data = SyntheticData(users=SYNTHETIC_USERS, seed=1)
+    data.load(engine)
+    return data
+
+
 @pytest.fixture
 def db_session(temp_db):
     """Provide a database session for a single test."""
@@ -59,6 +79,18 @@ def db_session(temp_db):
     session.close()
 
 
+def reset_app_state():
+    """Drop process-local state so it is rebuilt from the test database."""
+    leaderboard_index.clear()
+    player_index.clear()
+    session_hub.clear()
+    live_sessions.clear()
+    leaderboard_cache.clear()
+    route_metrics.clear()
+    token_signer.clear()
+    user_cache.clear()
+
+
 @pytest.fixture
 def client(db_session):
     """Provide a test client with a database session override."""
@@ -69,6 +101,9 @@ def client(db_session):
     app.dependency_overrides[get_db] = override_get_db
     
     with TestClient(app) as test_client:
+        # Startup warms in-memory state from the default database
+        reset_app_state()
         yield test_client
     
     app.dependency_overrides.clear()
+    reset_app_state()
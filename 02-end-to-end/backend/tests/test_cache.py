@@ -0,0 +1,49 @@
+import time
+
+from app.cache import ResponseCache
+from app.models import GameMode
+
+
+def _put(cache, key, floor=None, mode=GameMode.WALLS):
+    return cache.put(key, b"[]", mode, floor, cache.generation)
+
+
+def test_lru_eviction_and_hit_ratio():
+    cache = ResponseCache(max_entries=2)
+    _put(cache, "a")
+    _put(cache, "b")
+    assert cache.get("a") is not None
+    _put(cache, "c")  # evicts "b", the least recently used
+
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (2, 1, 1)
+    assert stats["hit_ratio"] == 2 / 3
+
+
+def test_ttl_expiry():
+    cache = ResponseCache(ttl=0.01)
+    _put(cache, "a")
+    time.sleep(0.02)
+    assert cache.get("a") is None
+
+
+def test_invalidation_respects_floor_and_mode():
+    cache = ResponseCache()
+    _put(cache, "walls", floor=500)
+    _put(cache, "all", floor=400, mode=None)
+    _put(cache, "pass", floor=100, mode=GameMode.PASS_THROUGH)
+
+    cache.invalidate_score(GameMode.WALLS, 450)
+    assert cache.get("walls") is not None
+    assert cache.get("all") is None
+    assert cache.get("pass") is not None
+
+
+def test_put_after_concurrent_invalidation_is_not_cached():
+    cache = ResponseCache()
+    generation = cache.generation
+    cache.invalidate_score(GameMode.WALLS, 1)
+    cache.put("a", b"[]", GameMode.WALLS, None, generation)
+    assert cache.get("a") is None
@@ -0,0 +1,135 @@
+import json
+import threading
+import time
+from datetime import date
+
+import pytest
+
+from app.cache import leaderboard_cache
+from app.coordination import SCORE_ADDED, SCORE_REMOVED, SESSION, TOKEN_REVOKED, Coordinator, SocketBroker, SocketTransport, Transport
+from app.hub import CLOSED, UPDATED, session_hub
+from app.models import GameMode
+from app.ranking import RankedEntry, leaderboard_index, player_index
+from app.tokens import TokenError, token_signer
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def _message(kind, data, worker="other-worker"):
+    return json.dumps({"worker": worker, "kind": kind, "data": data})
+
+
+def test_broker_relays_messages_to_other_workers(tmp_path):
+    broker = SocketBroker(str(tmp_path / "broker.sock"))
+    broker.start()
+    received = {"a": [], "b": [], "c": []}
+    transports = {name: SocketTransport(broker.path) for name in received}
+    try:
+        for name, transport in transports.items():
+            transport.start(received[name].append)
+        _wait_for(lambda: all(t.connected for t in transports.values()))
+
+        for i in range(3):
+            transports["a"].send(f'{{"n": {i}}}')
+        _wait_for(lambda: len(received["b"]) == 3 and len(received["c"]) == 3)
+        assert received["b"] == ['{"n": 0}', '{"n": 1}', '{"n": 2}']
+        assert received["a"] == []
+        assert transports["a"].sent == 3
+    finally:
+        for transport in transports.values():
+            transport.stop()
+        broker.stop()
+
+
+class _ManualTransport(Transport):
+    """Connects when told to and records what it sends."""
+
+    def __init__(self):
+        super().__init__()
+        self.up = threading.Event()
+        self.batches = []
+
+    def _receive(self, deliver):
+        self.up.wait()
+        self.connected = True
+        self._stop.wait()
+
+    def _send_batch(self, batch):
+        self.batches.append(batch)
+
+
+def test_messages_wait_for_the_connection():
+    with pytest.raises(TypeError):
+        Transport()
+    transport = _ManualTransport()
+    transport.start(lambda message: None)
+    try:
+        # app.serve starts the broker only after forking the workers
+        transport.send("early")
+        time.sleep(0.2)
+        assert transport.batches == [] and transport.dropped == 0
+        transport.up.set()
+        _wait_for(lambda: transport.sent == 1)
+        assert transport.batches == [["early"]]
+    finally:
+        transport.stop()
+
+
+def test_remote_score_updates_index_and_cache(db_session, monkeypatch):
+    leaderboard_index.clear()
+    player_index.clear()
+    leaderboard_index.warm(db_session)
+    player_index.warm(db_session)
+    generation = leaderboard_cache.generation
+    coordinator = Coordinator()
+    coordinator.worker_id = "this-worker"
+    score = {"id": "e1", "username": "remote", "score": 500, "mode": "walls", "date": date.today().isoformat()}
+    try:
+        coordinator.deliver(_message(SCORE_ADDED, score))
+        assert leaderboard_index.top(GameMode.WALLS, 10) == [
+            RankedEntry(-500, "e1", "remote", GameMode.WALLS, date.today())
+        ]
+        assert player_index.get(GameMode.WALLS, "remote").score == 500
+        assert leaderboard_cache.generation > generation
+
+        # A worker ignores its own broadcasts
+        coordinator.deliver(_message(SCORE_ADDED, {**score, "id": "e2"}, worker="this-worker"))
+        assert leaderboard_index.count(GameMode.WALLS) == 1
+        assert coordinator.stats()["received"] == 1
+
+        # A failed flush elsewhere takes back only that player's best
+        coordinator.deliver(_message(SCORE_ADDED, {**score, "id": "e3", "username": "other", "score": 40}))
+        monkeypatch.setattr("app.coordination.SessionLocal", lambda: db_session)
+        coordinator.deliver(_message(SCORE_REMOVED, score))
+        assert player_index.is_warm
+        assert player_index.get(GameMode.WALLS, "remote") is None
+        assert player_index.get(GameMode.WALLS, "other").score == 40
+    finally:
+        leaderboard_index.clear()
+        player_index.clear()
+
+
+def test_remote_session_events_reach_the_hub():
+    session_hub.clear()
+    coordinator = Coordinator()
+    session = {"id": "s1", "username": "remote", "score": 10, "mode": "walls", "isLive": True}
+    coordinator.deliver(_message(SESSION, {"type": UPDATED, "session": session}))
+    assert session_hub.snapshot() == [session]
+
+    coordinator.deliver(_message(SESSION, {"type": CLOSED, "session": {**session, "isLive": False}}))
+    assert session_hub.snapshot() == []
+    session_hub.clear()
+
+
+def test_remote_logout_revokes_token():
+    token = token_signer.issue("u1", "SnakeMaster")
+    claims = token_signer.verify(token)
+    Coordinator().deliver(_message(TOKEN_REVOKED, {"id": claims.token_id, "expires": claims.expires_at}))
+    with pytest.raises(TokenError, match="revoked"):
+        token_signer.verify(token)
+    token_signer.clear()
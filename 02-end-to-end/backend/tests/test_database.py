@@ -0,0 +1,70 @@
+import pytest
+from sqlalchemy import create_engine, exc, text
+
+from app.database import TimedQueuePool, configure_sqlite, pool_stats
+
+
+def _engine(tmp_path, **options):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        connect_args={"check_same_thread": False},
+        poolclass=TimedQueuePool,
+        **options,
+    )
+    configure_sqlite(engine)
+    return engine
+
+
+def test_sqlite_file_uses_wal(tmp_path):
+    engine = _engine(tmp_path)
+    with engine.connect() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        # NORMAL
+        assert connection.execute(text("PRAGMA synchronous")).scalar() == 1
+        assert connection.execute(text("PRAGMA foreign_keys")).scalar() == 1
+    engine.dispose()
+
+
+def test_sqlite_pragma_settings_are_validated(tmp_path, monkeypatch):
+    monkeypatch.setenv("SQLITE_JOURNAL_MODE", "WAL; DROP TABLE users")
+    with pytest.raises(ValueError, match="SQLITE_JOURNAL_MODE"):
+        _engine(tmp_path)
+
+    monkeypatch.setenv("SQLITE_JOURNAL_MODE", "delete")
+    monkeypatch.setenv("SQLITE_SYNCHRONOUS", "2")
+    engine = _engine(tmp_path)
+    with engine.connect() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar() == "delete"
+        assert connection.execute(text("PRAGMA synchronous")).scalar() == 2
+    engine.dispose()
+
+
+def test_readers_are_not_blocked_by_an_open_write(tmp_path):
+    engine = _engine(tmp_path)
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE t (x INTEGER)"))
+        connection.execute(text("INSERT INTO t VALUES (1)"))
+    with engine.connect() as writer, engine.connect() as reader:
+        writer.execute(text("INSERT INTO t VALUES (2)"))
+        # The uncommitted insert is invisible but does not lock the reader out
+        assert reader.execute(text("SELECT count(*) FROM t")).scalar() == 1
+        writer.commit()
+    engine.dispose()
+
+
+def test_pool_stats_report_usage_and_checkout_timeouts(tmp_path):
+    engine = _engine(tmp_path, pool_size=1, max_overflow=0, pool_timeout=0.05)
+    held = engine.connect()
+    stats = pool_stats(engine)
+    assert (stats["size"], stats["checked_out"], stats["overflow"], stats["max_overflow"]) == (1, 1, 0, 0)
+
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+    stats = pool_stats(engine)
+    assert stats["checkouts"] == 2
+    assert stats["checkout_timeouts"] == 1
+    assert stats["checkout_max_wait_seconds"] >= 0.05
+
+    held.close()
+    assert pool_stats(engine)["checked_out"] == 0
+    engine.dispose()
@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+from app.database import _check_async_url
+from app.db_async import AsyncDatabaseService, ThreadedDatabaseService, _ServiceProxy
+from app.models import Base, GameMode
+from app.ranking import leaderboard_index
+
+pytest.importorskip("aiosqlite")
+pytest.importorskip("greenlet")
+
+
+def test_async_service_runs_database_service_methods(tmp_path):
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async def scenario():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'async.db'}")
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+
+        SessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+        async with SessionLocal() as db:
+            service = AsyncDatabaseService(db)
+            user = await service.add_user("a@snake.io", "Async", "hash")
+            assert (await service.get_user_by_email("a@snake.io")).id == user.id
+
+            _, rank = await service.add_score("Async", 100, GameMode.WALLS)
+            assert rank == 1
+            leaderboard = await service.get_leaderboard(GameMode.WALLS)
+            assert [entry.username for entry in leaderboard] == ["Async"]
+        await engine.dispose()
+
+    leaderboard_index.clear()
+    try:
+        asyncio.run(scenario())
+    finally:
+        leaderboard_index.clear()
+
+
+def test_threaded_service_rejects_private_names(db_session):
+    service = ThreadedDatabaseService(db_session)
+    with pytest.raises(AttributeError):
+        service._run_private
+    assert asyncio.run(service.get_live_sessions()) == []
+
+
+def test_service_proxy_needs_a_runner():
+    with pytest.raises(TypeError):
+        _ServiceProxy()
+
+
+def test_async_sqlite_needs_a_file():
+    for url in ("sqlite+aiosqlite://", "sqlite+aiosqlite:///:memory:"):
+        with pytest.raises(ValueError, match="database file"):
+            _check_async_url(url)
+    _check_async_url("sqlite+aiosqlite:///./snake_arena.db")
+    _check_async_url("postgresql+asyncpg://user@localhost/snake")
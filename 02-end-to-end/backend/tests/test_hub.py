@@ -0,0 +1,53 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.hub import CLOSED, CREATED, UPDATED, SessionHub
+from app.models import GameMode
+
+
+def _session(session_id, score, is_live=True):
+    return SimpleNamespace(
+        id=session_id, username="player", score=score, mode=GameMode.WALLS, is_live=is_live
+    )
+
+
+def test_rapid_updates_coalesce_to_latest_state():
+    async def scenario():
+        hub = SessionHub()
+        subscriber = hub.subscribe()
+        assert (await subscriber.next_events())[0].type == "snapshot"
+
+        hub.publish(CREATED, _session("a", 0))
+        for score in range(1, 50):
+            hub.publish(UPDATED, _session("a", score))
+        hub.publish(UPDATED, _session("b", 7))
+
+        events = await subscriber.next_events()
+        assert [(e.type, e.session_id, e.payload["score"]) for e in events] == [
+            (CREATED, "a", 49),
+            (UPDATED, "b", 7),
+        ]
+        assert hub.stats()["coalesced"] == 49
+
+        hub.publish(CLOSED, _session("a", 49, is_live=False))
+        assert [s["id"] for s in hub.snapshot()] == ["b"]
+
+    asyncio.run(scenario())
+
+
+def test_slow_subscriber_falls_back_to_snapshot():
+    async def scenario():
+        hub = SessionHub(max_pending=3)
+        subscriber = hub.subscribe()
+        await subscriber.next_events()
+
+        for i in range(5):
+            hub.publish(CREATED, _session(str(i), i))
+
+        events = await subscriber.next_events()
+        assert [e.type for e in events] == ["snapshot"]
+        assert len(events[0].payload) == 5
+        assert hub.stats()["overflows"] == 1
+        assert await subscriber.next_events(timeout=0.01) == []
+
+    asyncio.run(scenario())
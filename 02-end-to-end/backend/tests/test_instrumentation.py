@@ -0,0 +1,75 @@
+import logging
+import re
+
+from sqlalchemy import text
+
+from app import instrumentation
+from app.instrumentation import RequestStats, redact_parameters, route_metrics
+
+
+def test_redact_parameters_keeps_types_only():
+    assert redact_parameters({"email": "a@b.c", "n": 3}) == "{email: str, n: int}"
+    assert redact_parameters(("secret", 1.5)) == "(str, float)"
+    assert redact_parameters([("a",), ("b",)]) == "<2 rows>"
+
+
+def test_statements_counted_in_request_context(db_session):
+    stats = RequestStats()
+    token = instrumentation._current.set(stats)
+    try:
+        db_session.execute(text("SELECT 1"))
+        db_session.execute(text("SELECT 2"))
+    finally:
+        instrumentation._current.reset(token)
+    assert stats.statements == 2
+    assert stats.db_seconds > 0
+
+
+def test_slow_query_log_redacts_parameters(db_session, monkeypatch, caplog):
+    monkeypatch.setattr(instrumentation, "SLOW_QUERY_SECONDS", 1e-9)
+    before = route_metrics.slow_queries()
+    with caplog.at_level(logging.WARNING, logger="app.instrumentation"):
+        db_session.execute(text("SELECT :password"), {"password": "hunter2"})
+
+    assert route_metrics.slow_queries() > before
+    assert "Slow query" in caplog.text
+    assert "params=(str)" in caplog.text
+    assert "hunter2" not in caplog.text
+
+
+def test_server_timing_header_and_route_metrics(client):
+    response = client.get("/sessions")
+    timing = response.headers["server-timing"]
+    match = re.search(r'db;dur=[\d.]+;desc="(\d+) queries"', timing)
+    assert match and int(match.group(1)) >= 1
+    assert "app;dur=" in timing
+
+    routes = route_metrics.routes()
+    assert routes["GET /sessions"]["requests"] == 1
+    assert routes["GET /sessions"]["statements"] == int(match.group(1))
+
+
+def test_metrics_endpoint_prometheus_format(client):
+    client.get("/leaderboard")
+    client.get("/leaderboard")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert 'snake_http_requests_total{route="GET /leaderboard"} 2' in body
+    assert "# TYPE snake_db_statements_total counter" in body
+    assert "# TYPE snake_leaderboard_cache_hits_total counter" in body
+    assert "snake_leaderboard_cache_hits_total 1" in body
+    assert "# TYPE snake_leaderboard_cache_entries gauge" in body
+    assert "snake_password_hasher_pending 0" in body
+    assert "snake_session_hub_subscribers 0" in body
+
+
+def test_registered_counters_get_a_total_suffix():
+    registry = instrumentation.MetricsRegistry("test")
+    registry.register("pool", lambda: {"size": 5, "checkouts": 7, "wait_seconds_total": 1.5},
+                      counters=("checkouts", "wait_seconds_total"))
+    body = registry.render()
+    assert "# TYPE test_pool_size gauge\ntest_pool_size 5" in body
+    assert "# TYPE test_pool_checkouts_total counter\ntest_pool_checkouts_total 7" in body
+    assert "# TYPE test_pool_wait_seconds_total counter\ntest_pool_wait_seconds_total 1.5" in body
@@ -0,0 +1,68 @@
+import time
+
+from app.db import DatabaseService
+from app.hub import session_hub
+from app.live_sessions import LiveSessionStore
+from app.models import GameMode, GameSessionModel
+
+
+def _live_session(db_session, score=0):
+    session = GameSessionModel(id="s1", username="player", score=score, mode=GameMode.WALLS, is_live=True)
+    db_session.add(session)
+    db_session.commit()
+    return session
+
+
+def _stored(db_session):
+    db_session.expire_all()
+    return db_session.get(GameSessionModel, "s1")
+
+
+def test_ticks_stay_in_memory_until_checkpoint(temp_db, db_session):
+    _, SessionLocal, _ = temp_db
+    store = LiveSessionStore(SessionLocal)
+    store.track(_live_session(db_session))
+    for score in (10, 20, 30):
+        assert store.heartbeat("s1", score).score == score
+    assert _stored(db_session).score == 0
+
+    assert store.checkpoint(db_session) == 1
+    assert _stored(db_session).score == 30
+    # Nothing changed since, so nothing is written
+    assert store.checkpoint(db_session) == 0
+    assert store.stats()["checkpointed_rows"] == 1
+
+
+def test_heartbeat_for_untracked_session_is_ignored(temp_db):
+    _, SessionLocal, _ = temp_db
+    assert LiveSessionStore(SessionLocal).heartbeat("missing", 5) is None
+
+
+def test_expired_sessions_are_closed_with_their_last_score(temp_db, db_session):
+    _, SessionLocal, _ = temp_db
+    store = LiveSessionStore(SessionLocal, ttl=30)
+    store.track(_live_session(db_session))
+    store.heartbeat("s1", 40)
+    session_hub.clear()
+
+    assert store.expire(db_session, now=time.time() + 10) == 0
+    assert store.expire(db_session, now=time.time() + 31) == 1
+    stored = _stored(db_session)
+    assert (stored.score, stored.is_live) == (40, False)
+    assert store.get("s1") is None
+    assert session_hub.stats()["live_sessions"] == 0
+
+
+def test_close_session_persists_in_memory_score(temp_db, db_session, monkeypatch):
+    _, SessionLocal, _ = temp_db
+    store = LiveSessionStore(SessionLocal)
+    monkeypatch.setattr("app.db.live_sessions", store)
+    _live_session(db_session)
+    service = DatabaseService(db_session)
+
+    assert service.heartbeat_session("s1", 75).score == 75
+    closed = service.close_session("s1")
+    assert (closed.score, closed.is_live) == (75, False)
+    assert store.get("s1") is None
+    # Closed sessions take no more ticks
+    assert service.heartbeat_session("s1", 80) is None
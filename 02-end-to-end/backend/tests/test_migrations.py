@@ -0,0 +1,71 @@
+from sqlalchemy import create_engine, inspect, text
+
+from app.migrations import MIGRATIONS, run_migrations
+
+
+def test_migrations_add_indexes_to_existing_tables(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as connection:
+        # Schema as created before the indexes existed
+        connection.execute(text(
+            "CREATE TABLE leaderboard_entries (id VARCHAR PRIMARY KEY, "
+            "username VARCHAR NOT NULL, score INTEGER NOT NULL, "
+            "mode VARCHAR(12) NOT NULL, date DATE NOT NULL)"
+        ))
+        connection.execute(text(
+            "CREATE TABLE game_sessions (id VARCHAR PRIMARY KEY, "
+            "username VARCHAR NOT NULL, score INTEGER NOT NULL, "
+            "mode VARCHAR(12) NOT NULL, is_live BOOLEAN NOT NULL)"
+        ))
+
+    applied = run_migrations(engine)
+    assert [m.version for m in applied] == [m.version for m in MIGRATIONS]
+
+    inspector = inspect(engine)
+    leaderboard_indexes = {ix["name"] for ix in inspector.get_indexes("leaderboard_entries")}
+    session_indexes = {ix["name"] for ix in inspector.get_indexes("game_sessions")}
+    assert {"ix_leaderboard_mode_score", "ix_leaderboard_username_mode_score"} <= leaderboard_indexes
+    assert {"ix_game_sessions_username", "ix_game_sessions_live", "ix_game_sessions_live_last_seen"} <= session_indexes
+    assert "last_seen" in {column["name"] for column in inspector.get_columns("game_sessions")}
+
+    # Already recorded, so nothing runs the second time
+    assert run_migrations(engine) == []
+    engine.dispose()
+
+
+def test_player_best_scores_backfilled_from_existing_entries(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as connection:
+        connection.execute(text(
+            "CREATE TABLE leaderboard_entries (id VARCHAR PRIMARY KEY, "
+            "username VARCHAR NOT NULL, score INTEGER NOT NULL, "
+            "mode VARCHAR(12) NOT NULL, date DATE NOT NULL)"
+        ))
+        connection.execute(text(
+            "CREATE TABLE game_sessions (id VARCHAR PRIMARY KEY, "
+            "username VARCHAR NOT NULL, score INTEGER NOT NULL, "
+            "mode VARCHAR(12) NOT NULL, is_live BOOLEAN NOT NULL)"
+        ))
+        connection.execute(text(
+            "INSERT INTO leaderboard_entries VALUES "
+            "('a', 'grinder', 100, 'WALLS', '2024-01-01'), "
+            "('b', 'grinder', 300, 'WALLS', '2024-01-02'), "
+            "('c', 'grinder', 300, 'WALLS', '2024-01-03'), "
+            "('d', 'grinder', 50, 'PASS_THROUGH', '2024-01-01'), "
+            "('e', 'casual', 200, 'WALLS', '2024-01-01')"
+        ))
+
+    run_migrations(engine)
+
+    with engine.connect() as connection:
+        rows = connection.execute(text(
+            "SELECT username, mode, best_score, entry_id FROM player_best_scores "
+            "ORDER BY username, mode"
+        )).all()
+    # Ties keep the earliest entry
+    assert rows == [
+        ("casual", "WALLS", 200, "e"),
+        ("grinder", "PASS_THROUGH", 50, "d"),
+        ("grinder", "WALLS", 300, "b"),
+    ]
+    engine.dispose()
@@ -0,0 +1,49 @@
+import asyncio
+import hashlib
+
+import pytest
+
+from app.passwords import PasswordHasher, PasswordHasherBusy
+
+
+@pytest.fixture
+def hasher():
+    # Low cost keeps the test fast; the format is the same
+    hasher = PasswordHasher(n=2 ** 10, r=8, p=1, workers=1)
+    yield hasher
+    hasher.shutdown()
+
+
+def test_hash_and_verify(hasher):
+    stored = asyncio.run(hasher.hash("password123"))
+    assert stored.startswith("scrypt$1024$8$1$")
+    assert asyncio.run(hasher.verify("password123", stored)) == (True, False)
+    assert asyncio.run(hasher.verify("wrong", stored)) == (False, False)
+    assert hasher.stats()["completed"] == 3
+    assert hasher.stats()["pending"] == 0
+
+
+def test_legacy_sha256_hash_needs_rehash(hasher):
+    legacy = hashlib.sha256(b"password123").hexdigest()
+    assert asyncio.run(hasher.verify("password123", legacy)) == (True, True)
+    assert asyncio.run(hasher.verify("wrong", legacy)) == (False, True)
+
+
+def test_changed_cost_needs_rehash(hasher):
+    stored = asyncio.run(hasher.hash("password123"))
+    stronger = PasswordHasher(n=2 ** 11, workers=1)
+    assert stronger.needs_rehash(stored)
+    assert not hasher.needs_rehash(stored)
+
+
+def test_full_queue_rejects(hasher):
+    hasher.max_pending = 1
+
+    async def burst():
+        return await asyncio.gather(
+            hasher.hash("a"), hasher.hash("b"), return_exceptions=True
+        )
+
+    results = asyncio.run(burst())
+    assert any(isinstance(result, PasswordHasherBusy) for result in results)
+    assert hasher.stats()["rejected"] == 1
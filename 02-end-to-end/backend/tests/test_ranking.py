@@ -0,0 +1,165 @@
+import random
+from datetime import date, timedelta
+
+from app.models import GameMode, LeaderboardWindow
+from app.ranking import LeaderboardIndex, PlayerBest, PlayerBestIndex, RankedEntry, RankedList, period_start
+
+
+def _entry(score, entry_id, mode=GameMode.WALLS):
+    return RankedEntry(-score, entry_id, f"user-{entry_id}", mode, date(2024, 1, 1))
+
+
+def test_ranked_list_matches_sorted_reference():
+    rng = random.Random(42)
+    ranked = RankedList(load=8)
+    reference = []
+    for i in range(500):
+        key = (rng.randint(0, 100), i)
+        ranked.add(key)
+        reference.append(key)
+    for key in rng.sample(reference, 200):
+        assert ranked.remove(key)
+        reference.remove(key)
+    reference.sort()
+
+    assert len(ranked) == len(reference)
+    assert list(ranked) == reference
+    assert [ranked[i] for i in range(len(reference))] == reference
+    assert list(ranked.islice(17, 45)) == reference[17:45]
+    for score in range(0, 101, 7):
+        expected = sum(1 for key in reference if key < (score,))
+        assert ranked.bisect_left((score,)) == expected
+
+
+def test_index_rank_counts_only_higher_scores_in_mode():
+    index = LeaderboardIndex()
+    assert index.add(_entry(100, "a")) == 1
+    assert index.add(_entry(300, "b")) == 1
+    assert index.add(_entry(100, "c")) == 2
+    assert index.add(_entry(500, "d", GameMode.PASS_THROUGH)) == 1
+    assert index.rank(GameMode.WALLS, 200) == 2
+
+
+def test_index_top_merges_modes():
+    index = LeaderboardIndex()
+    for score, entry_id, mode in [
+        (10, "a", GameMode.WALLS),
+        (30, "b", GameMode.PASS_THROUGH),
+        (20, "c", GameMode.WALLS),
+    ]:
+        index.add(_entry(score, entry_id, mode))
+
+    assert [entry.score for entry in index.top(limit=2)] == [30, 20]
+    assert [entry.id for entry in index.top(GameMode.WALLS)] == ["c", "a"]
+
+
+def test_index_rank_without_mode_counts_every_mode():
+    index = LeaderboardIndex()
+    index.add(_entry(500, "a", GameMode.WALLS))
+    index.add(_entry(400, "b", GameMode.PASS_THROUGH))
+    assert index.rank(GameMode.WALLS, 300) == 2
+    assert index.rank(None, 300) == 3
+
+
+def test_index_page_walks_all_entries_once():
+    index = LeaderboardIndex()
+    rng = random.Random(7)
+    for i in range(100):
+        index.add(_entry(rng.randint(0, 20), f"{i:03}", rng.choice(list(GameMode))))
+
+    for mode in (GameMode.WALLS, None):
+        seen, after = [], None
+        while True:
+            page = index.page(mode, after, 7)
+            seen.extend(page)
+            if len(page) < 7:
+                break
+            after = (page[-1].sort_score, page[-1].id)
+        assert seen == index.top(mode, 1000)
+
+
+def test_index_around_entry():
+    index = LeaderboardIndex()
+    entries = [_entry(score, f"e{score}") for score in range(100, 0, -10)]
+    for entry in entries:
+        index.add(entry)
+
+    assert index.around(GameMode.WALLS, entries[4], 2, 2) == entries[2:7]
+    assert index.around(GameMode.WALLS, entries[0], 3, 1) == entries[0:2]
+    assert index.around(GameMode.WALLS, entries[-1], 1, 3) == entries[-2:]
+
+
+
+def _play(username, score, entry_id, mode=GameMode.WALLS):
+    return RankedEntry(-score, entry_id, username, mode, date(2024, 1, 1))
+
+
+def test_player_index_keeps_one_best_per_player():
+    index = PlayerBestIndex()
+    index.offer(_play("grinder", 100, "g1"))
+    index.offer(_play("grinder", 300, "g2"))
+    index.offer(_play("grinder", 300, "g3"))  # ties keep the earlier best
+    index.offer(_play("grinder", 200, "g4"))
+    index.offer(_play("grinder", 50, "g5", GameMode.PASS_THROUGH))
+    index.offer(_play("casual", 250, "c1"))
+    index.offer(_play("casual", 400, "c2", GameMode.PASS_THROUGH))
+
+    walls = index.page(GameMode.WALLS, None, 10)
+    assert [(best.username, best.score, best.entry_id) for best in walls] == [
+        ("grinder", 300, "g2"), ("casual", 250, "c1")
+    ]
+    overall = index.page(None, None, 10)
+    assert [(best.username, best.score) for best in overall] == [("casual", 400), ("grinder", 300)]
+    assert index.count(GameMode.WALLS) == 2
+    assert index.rank(GameMode.WALLS, index.get(GameMode.WALLS, "casual").score) == 2
+    assert index.page(GameMode.WALLS, (walls[0].sort_score, walls[0].username), 10) == walls[1:]
+
+
+def test_player_index_evicts_only_failed_bests():
+    index = PlayerBestIndex()
+    stored = PlayerBest.from_entry(_play("grinder", 100, "g1"))
+    index.offer(_play("grinder", 100, "g1"))
+    index.offer(_play("casual", 250, "c1"))
+    failed, queued = _play("grinder", 500, "g2"), _play("grinder", 300, "g3")
+    index.offer(failed)
+    index.offer(queued)
+
+    index.evict([failed], {("grinder", GameMode.WALLS): stored}, pending=[failed, queued])
+    assert index.get(GameMode.WALLS, "grinder").entry_id == "g3"
+    assert index.get(None, "grinder").entry_id == "g3"
+    assert index.get(GameMode.WALLS, "casual").entry_id == "c1"
+
+    # Without queued entries the stored best comes back
+    index.evict([queued], {("grinder", GameMode.WALLS): stored})
+    assert index.get(None, "grinder").entry_id == "g1"
+    assert index.count(None) == 2
+
+
+def test_period_start():
+    wednesday = date(2024, 5, 15)
+    assert period_start(LeaderboardWindow.DAY, wednesday) == wednesday
+    assert period_start(LeaderboardWindow.WEEK, wednesday) == date(2024, 5, 13)
+    assert period_start(LeaderboardWindow.ALL, wednesday) is None
+
+
+def test_index_windows_and_compaction():
+    today = date.today()
+    index = LeaderboardIndex()
+    today_entry = RankedEntry(-100, "t", "today", GameMode.WALLS, today)
+    old_entry = RankedEntry(-900, "o", "old", GameMode.WALLS, today - timedelta(days=8))
+    index.add(today_entry)
+    index.add(old_entry)
+
+    assert index.top(GameMode.WALLS, 10) == [old_entry, today_entry]
+    assert index.top(GameMode.WALLS, 10, LeaderboardWindow.DAY) == [today_entry]
+    assert index.top(None, 10, LeaderboardWindow.WEEK) == [today_entry]
+    assert index.page(None, (-100, "t"), 10, LeaderboardWindow.DAY) == []
+
+    # The old entry's day and week buckets have expired
+    assert index.compact() == 2
+    assert index.stats()["window_buckets"] == 2
+    assert index.top(GameMode.WALLS, 10, LeaderboardWindow.DAY) == [today_entry]
+
+    # A new day drops today's bucket, and this week's too on a Monday
+    tomorrow = today + timedelta(days=1)
+    assert index.compact(tomorrow) == (2 if tomorrow.weekday() == 0 else 1)
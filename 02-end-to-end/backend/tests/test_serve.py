@@ -0,0 +1,17 @@
+from app.main import app
+from app.ranking import leaderboard_index, player_index
+from app.serve import _discard_preloaded_state
+
+
+def test_respawned_worker_discards_the_masters_indexes(db_session):
+    leaderboard_index.warm(db_session)
+    player_index.warm(db_session)
+    app.state.preloaded = True
+    try:
+        _discard_preloaded_state()
+        assert not leaderboard_index.is_warm
+        assert not player_index.is_warm
+        # The lifespan then runs init_db and warms the indexes itself
+        assert app.state.preloaded is False
+    finally:
+        app.state.preloaded = False
@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import update
+
+from app.hub import session_hub
+from app.live_sessions import LiveSessionStore
+from app.models import GameMode, GameSessionModel
+from app.session_reaper import SessionReaper
+
+
+def _sessions(db_session, count, last_seen, is_live=True, prefix="s"):
+    for i in range(count):
+        db_session.add(GameSessionModel(
+            id=f"{prefix}{i:03d}", username=f"player{i}", score=i, mode=GameMode.WALLS,
+            is_live=is_live, last_seen=last_seen,
+        ))
+    db_session.commit()
+
+
+def _live_ids(db_session):
+    db_session.expire_all()
+    return {s.id for s in db_session.query(GameSessionModel).filter(GameSessionModel.is_live == True)}
+
+
+def test_sweep_closes_stale_sessions_in_batches(temp_db, db_session):
+    _, SessionLocal, _ = temp_db
+    now = datetime.now(timezone.utc)
+    _sessions(db_session, 7, now - timedelta(minutes=10), prefix="old")
+    _sessions(db_session, 2, now - timedelta(seconds=30), prefix="new")
+    reaper = SessionReaper(SessionLocal, reap_after=300, batch_size=3)
+
+    assert reaper.sweep(db_session, now=now) == 7
+    assert _live_ids(db_session) == {"new000", "new001"}
+    stats = reaper.stats()
+    assert (stats["sweeps"], stats["reaped"]) == (1, 7)
+
+    # Nothing left past the timeout
+    assert reaper.sweep(db_session, now=now) == 0
+
+
+def test_sweep_skips_sessions_tracked_in_memory(temp_db, db_session, monkeypatch):
+    _, SessionLocal, _ = temp_db
+    now = datetime.now(timezone.utc)
+    _sessions(db_session, 3, now - timedelta(minutes=10))
+    store = LiveSessionStore(SessionLocal)
+    store.track(db_session.get(GameSessionModel, "s000"))
+    monkeypatch.setattr("app.session_reaper.live_sessions", store)
+
+    # One per batch: the tracked session must not stop the sweep
+    assert SessionReaper(SessionLocal, reap_after=300, batch_size=1).sweep(db_session, now=now) == 2
+    assert _live_ids(db_session) == {"s000"}
+
+
+@pytest.mark.parametrize("returning", [True, False])
+def test_sweep_announces_only_sessions_it_closed(temp_db, db_session, monkeypatch, returning):
+    _, SessionLocal, _ = temp_db
+    monkeypatch.setattr(db_session.get_bind().dialect, "update_returning", returning)
+    now = datetime.now(timezone.utc)
+    _sessions(db_session, 2, now - timedelta(minutes=10))
+    published = []
+    monkeypatch.setattr(session_hub, "publish", lambda type, session: published.append(session.id))
+    close = SessionReaper._close
+
+    def heartbeat_then_close(db, ids, stale):
+        # A heartbeat lands between the SELECT and the UPDATE
+        db.execute(update(GameSessionModel).where(GameSessionModel.id == "s001").values(last_seen=now))
+        return close(db, ids, stale)
+    monkeypatch.setattr(SessionReaper, "_close", staticmethod(heartbeat_then_close))
+
+    assert SessionReaper(SessionLocal, reap_after=300).sweep(db_session, now=now) == 1
+    assert published == ["s000"]
+    assert _live_ids(db_session) == {"s001"}
@@ -0,0 +1,96 @@
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.static_files import IMMUTABLE, REVALIDATE, StaticManifest
+
+SCRIPT = b"console.log('snake');\n" * 200
+
+
+@pytest.fixture
+def build(tmp_path):
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "index.html").write_bytes(b"<!doctype html><div id=root></div>")
+    (tmp_path / "assets" / "index-3f9a1c2b.js").write_bytes(SCRIPT)
+    (tmp_path / "assets" / "index-3f9a1c2b.js.br").write_bytes(b"brotli-bytes")
+    (tmp_path / "logo.png").write_bytes(b"\x89PNG" + bytes(5000))
+    # Public files with hash-like names
+    (tmp_path / "apple-touch-icon.png").write_bytes(b"\x89PNG")
+    (tmp_path / "android-chrome-192x192.png").write_bytes(b"\x89PNG")
+    return tmp_path
+
+
+def _client(manifest):
+    app = FastAPI()
+
+    @app.get("/{path:path}")
+    async def serve(path: str, request: Request):
+        return manifest.response(request, path)
+
+    return TestClient(app)
+
+
+def test_hashed_assets_are_immutable_and_precompressed(build):
+    client = _client(StaticManifest(build))
+    response = client.get("/assets/index-3f9a1c2b.js", headers={"Accept-Encoding": "gzip, br"})
+    assert response.headers["cache-control"] == IMMUTABLE
+    assert response.headers["content-encoding"] == "br"
+    assert response.headers["vary"] == "Accept-Encoding"
+
+    # No .gz sibling, so the manifest gzipped it; httpx decodes it for us
+    response = client.get("/assets/index-3f9a1c2b.js", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.content == SCRIPT
+
+    response = client.get("/assets/index-3f9a1c2b.js", headers={"Accept-Encoding": "br;q=0, identity"})
+    assert "content-encoding" not in response.headers
+    assert response.content == SCRIPT
+
+
+def test_only_hashed_build_output_is_immutable(build):
+    manifest = StaticManifest(build)
+    assert manifest.assets["assets/index-3f9a1c2b.js"].cache_control == IMMUTABLE
+    for name in ("index.html", "logo.png", "apple-touch-icon.png", "android-chrome-192x192.png"):
+        assert manifest.assets[name].cache_control == REVALIDATE
+
+
+def test_etag_revalidation(build):
+    client = _client(StaticManifest(build))
+    response = client.get("/", headers={"Accept-Encoding": "identity"})
+    assert response.headers["cache-control"] == REVALIDATE
+    etag = response.headers["etag"]
+
+    response = client.get("/index.html", headers={"Accept-Encoding": "identity", "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    # Each encoding has its own tag
+    etag = client.get("/assets/index-3f9a1c2b.js", headers={"Accept-Encoding": "identity"}).headers["etag"]
+    response = client.get("/assets/index-3f9a1c2b.js", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert response.status_code == 200
+
+
+def test_client_routes_get_index_but_missing_files_404(build):
+    client = _client(StaticManifest(build))
+    assert client.get("/leaderboard/walls").text.startswith("<!doctype html>")
+    assert client.get("/assets/index-deadbeef.js").status_code == 404
+    assert client.get("/favicon.ico").status_code == 404
+
+
+def test_large_files_are_streamed_from_disk(build, monkeypatch):
+    read_bytes = type(build).read_bytes
+
+    def read_small(path):
+        assert path.stat().st_size <= 1024, f"{path.name} was read into memory"
+        return read_bytes(path)
+    monkeypatch.setattr(type(build), "read_bytes", read_small)
+    manifest = StaticManifest(build, memory_limit=1024)
+    monkeypatch.undo()
+    variant = manifest.assets["logo.png"].variants["identity"]
+    assert variant.body is None
+
+    response = _client(manifest).get("/logo.png")
+    assert response.headers["content-type"] == "image/png"
+    assert response.headers["content-length"] == "5004"
+    assert response.content == (build / "logo.png").read_bytes()
+    # Compressed copies are only made for files small enough to keep in memory
+    assert "gzip" not in manifest.assets["assets/index-3f9a1c2b.js"].variants
@@ -0,0 +1,64 @@
+import statistics
+from datetime import datetime, timezone
+
+from sqlalchemy import create_engine, func, select
+
+from app.migrations import backfill_best_scores
+from app.models import Base, GameMode
+from app.synthetic import BESTS, ENTRIES, SESSIONS, SyntheticData
+
+NOW = datetime(2026, 6, 1, 12, tzinfo=timezone.utc)
+
+
+def test_same_seed_same_rows():
+    rows = list(SyntheticData(users=50, seed=3, now=NOW).rows())
+    assert rows == list(SyntheticData(users=50, seed=3, now=NOW).rows())
+    assert rows != list(SyntheticData(users=50, seed=4, now=NOW).rows())
+
+
+def test_loaded_shape(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'synthetic.db'}")
+    Base.metadata.create_all(engine)
+    counts = SyntheticData(users=1000, live_sessions=37, seed=5, now=NOW).load(engine, batch_size=500)
+    assert counts["users"] == 1000
+
+    with engine.begin() as connection:
+        live = connection.execute(select(func.count()).select_from(SESSIONS).where(SESSIONS.c.is_live)).scalar()
+        assert live == 37
+
+        games = connection.execute(
+            select(func.count()).select_from(ENTRIES).group_by(ENTRIES.c.username)
+        ).scalars().all()
+        assert len(games) == 1000
+        # A long tail of very active players
+        assert max(games) > 5 * statistics.median(games)
+
+        by_mode = dict(connection.execute(
+            select(ENTRIES.c.mode, func.count()).group_by(ENTRIES.c.mode)
+        ).all())
+        assert 0.55 < by_mode[GameMode.WALLS] / counts["leaderboard_entries"] < 0.75
+
+        assert connection.execute(select(func.min(ENTRIES.c.score) % 10)).scalar() == 0
+        assert connection.execute(select(func.max(ENTRIES.c.date))).scalar() <= NOW.date()
+
+        # Bests are computed while generating; they match a rebuild from the entries
+        generated = sorted(connection.execute(select(BESTS)).all())
+        backfill_best_scores(connection)
+        assert sorted(connection.execute(select(BESTS)).all()) == generated
+    engine.dispose()
+
+
+def test_api_over_synthetic_data(client, db_session, synthetic_data):
+    top = client.get("/leaderboard?mode=walls&limit=5").json()
+    best = db_session.execute(
+        select(func.max(ENTRIES.c.score)).where(ENTRIES.c.mode == GameMode.WALLS)
+    ).scalar()
+    assert top[0]["score"] == best
+    assert [entry["score"] for entry in top] == sorted((entry["score"] for entry in top), reverse=True)
+
+    player = top[0]["username"]
+    response = client.get(f"/leaderboard/players/{player}?mode=walls")
+    assert response.json()["rank"] == 1
+
+    sessions = client.get("/sessions?limit=500").json()
+    assert len(sessions) == synthetic_data.live_sessions
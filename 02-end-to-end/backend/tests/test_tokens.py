@@ -0,0 +1,85 @@
+import pytest
+
+from app.models import User
+from app.tokens import TokenError, TokenSigner, UserCache, token_signer
+
+
+def test_issue_and_verify_round_trip():
+    signer = TokenSigner(b"secret", ttl=60)
+    claims = signer.verify(signer.issue("u1", "SnakeMaster", now=1000), now=1030)
+    assert (claims.user_id, claims.username, claims.expires_at) == ("u1", "SnakeMaster", 1060)
+    assert signer.stats()["issued"] == 1
+    assert signer.stats()["verified"] == 1
+
+
+def test_rejects_tampered_foreign_and_expired_tokens():
+    signer = TokenSigner(b"secret", ttl=60)
+    token = signer.issue("u1", "SnakeMaster", now=1000)
+    payload, signature = token.split(".")
+
+    forged = TokenSigner(b"other").issue("u1", "SnakeMaster", now=1000)
+    other_payload = TokenSigner(b"secret").issue("u2", "CobraKing", now=1000).split(".")[0]
+    for bad in (forged, f"{other_payload}.{signature}", payload, "a.b.c", "", f"{payload}.\xe9"):
+        with pytest.raises(TokenError):
+            signer.verify(bad, now=1001)
+
+    with pytest.raises(TokenError, match="expired"):
+        signer.verify(token, now=1060)
+    assert signer.stats()["rejected"] == 7
+
+
+def test_revocation_lasts_until_expiry():
+    signer = TokenSigner(b"secret", ttl=60)
+    token = signer.issue("u1", "SnakeMaster", now=1000)
+    claims = signer.verify(token, now=1000)
+
+    signer.revoke(claims.token_id, claims.expires_at, now=1000)
+    with pytest.raises(TokenError, match="revoked"):
+        signer.verify(token, now=1001)
+    # Other tokens for the same user are unaffected
+    signer.verify(signer.issue("u1", "SnakeMaster", now=1000), now=1001)
+
+    # Expired revocations are pruned on the next revoke
+    signer.revoke("other", 2000, now=1100)
+    assert signer.stats()["revoked"] == 1
+
+
+def test_user_cache_evicts_least_recently_used():
+    cache = UserCache(max_entries=2)
+    for n in range(3):
+        if n == 2:
+            cache.get("u0")
+        cache.put(User(id=f"u{n}", username=f"Player{n}", email=f"p{n}@snake.io"))
+
+    assert cache.get("u1") is None
+    assert cache.get("u0").username == "Player0"
+    assert cache.get("u2").username == "Player2"
+    assert cache.stats() == {"entries": 2, "hits": 3, "misses": 1}
+
+
+def test_logout_survives_a_restart(client, db_session):
+    response = client.post(
+        "/auth/signup", json={"email": "p@snake.io", "username": "SnakeMaster", "password": "password123"}
+    )
+    headers = {"Authorization": f"Bearer {response.json()['token']}"}
+    assert client.post("/auth/logout", headers=headers).status_code == 200
+
+    # A restarted worker starts with an empty revocation list and loads the stored one
+    token_signer.clear()
+    token_signer.warm(db_session)
+    assert client.get("/auth/me", headers=headers).status_code == 401
+
+
+def test_non_ascii_token_is_unauthorized(client):
+    headers = {"Authorization": "Bearer abc.\xe9".encode("latin-1")}
+    assert client.get("/auth/me", headers=headers).status_code == 401
+    response = client.post("/leaderboard", json={"score": 10, "mode": "walls"}, headers=headers)
+    assert response.status_code == 401
+
+
+def test_anonymous_score_cannot_use_a_registered_username(client):
+    client.post("/auth/signup", json={"email": "p@snake.io", "username": "SnakeMaster", "password": "password123"})
+    response = client.post("/leaderboard", json={"score": 10, "mode": "walls", "username": "SnakeMaster"})
+    assert response.status_code == 401
+    response = client.post("/leaderboard", json={"score": 10, "mode": "walls", "username": "Guest"})
+    assert response.status_code == 200
@@ -0,0 +1,130 @@
+import json
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import create_engine, func, insert, select
+
+from app.cli import main
+from app.models import Base, GameMode
+from app.transfer import Checkpoint, TABLES, detect_format, export_table, import_table
+
+ENTRIES = TABLES["leaderboard_entries"]
+SESSIONS = TABLES["game_sessions"]
+
+
+def _engine(path):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    return engine
+
+
+@pytest.fixture
+def source(tmp_path):
+    engine = _engine(tmp_path / "source.db")
+    with engine.begin() as connection:
+        connection.execute(insert(ENTRIES), [
+            {"id": f"e{n:03}", "username": f"player{n % 7}", "score": n * 10,
+             "mode": GameMode.WALLS if n % 2 else GameMode.PASS_THROUGH, "date": date(2024, 1, 1 + n % 28)}
+            for n in range(25)
+        ])
+        connection.execute(insert(SESSIONS), [
+            {"id": "s1", "username": "live", "score": 40, "mode": GameMode.WALLS, "is_live": True,
+             "last_seen": datetime(2024, 5, 1, 12, 30)},
+            {"id": "s2", "username": "done, finally", "score": 90, "mode": GameMode.PASS_THROUGH, "is_live": False,
+             "last_seen": None},
+        ])
+    yield engine
+    engine.dispose()
+
+
+def _rows(engine, table):
+    with engine.connect() as connection:
+        return [tuple(row) for row in connection.execute(select(table).order_by(table.c.id))]
+
+
+@pytest.mark.parametrize("suffix", [".ndjson", ".csv"])
+def test_round_trip(source, tmp_path, suffix):
+    target = _engine(tmp_path / "target.db")
+    for table in (ENTRIES, SESSIONS):
+        path = tmp_path / f"{table.name}{suffix}"
+        with source.connect() as connection:
+            assert export_table(connection, table, path, detect_format(path), batch_size=4) == len(_rows(source, table))
+        import_table(target, table, path, detect_format(path), batch_size=4)
+        assert _rows(target, table) == _rows(source, table)
+        assert not Checkpoint(path, "export").path.exists()
+        assert not Checkpoint(path, "import").path.exists()
+    target.dispose()
+
+
+def test_export_writes_api_values(source, tmp_path):
+    path = tmp_path / "sessions.ndjson"
+    with source.connect() as connection:
+        export_table(connection, SESSIONS, path, "ndjson")
+    first = json.loads(path.read_text().splitlines()[0])
+    assert first["mode"] == "walls"
+    assert first["last_seen"] == "2024-05-01T12:30:00"
+    assert first["is_live"] is True
+
+
+def test_export_resumes_after_last_checkpoint(source, tmp_path):
+    path = tmp_path / "entries.ndjson"
+    with source.connect() as connection:
+        export_table(connection, ENTRIES, path, "ndjson", batch_size=10)
+    complete = path.read_bytes()
+
+    # Simulate a crash after the first batch, halfway through writing the second
+    lines = complete.splitlines(keepends=True)
+    first_batch = b"".join(lines[:10])
+    path.write_bytes(first_batch + lines[10][:15])
+    Checkpoint(path, "export").save({
+        "table": ENTRIES.name, "format": "ndjson", "last_key": "e009", "rows": 10, "offset": len(first_batch),
+    })
+    with source.connect() as connection:
+        assert export_table(connection, ENTRIES, path, "ndjson", batch_size=10, resume=True) == 15
+    assert path.read_bytes() == complete
+
+
+def test_import_resumes_and_skips_existing(source, tmp_path):
+    path = tmp_path / "entries.csv"
+    with source.connect() as connection:
+        export_table(connection, ENTRIES, path, "csv")
+    target = _engine(tmp_path / "target.db")
+
+    Checkpoint(path, "import").save({"table": ENTRIES.name, "format": "csv", "rows": 20})
+    assert import_table(target, ENTRIES, path, "csv", resume=True) == 5
+    with target.connect() as connection:
+        assert connection.execute(select(func.count()).select_from(ENTRIES)).scalar() == 5
+
+    assert import_table(target, ENTRIES, path, "csv", batch_size=8, skip_existing=True) == 25
+    assert _rows(target, ENTRIES) == _rows(source, ENTRIES)
+
+    with pytest.raises(ValueError, match="belongs to"):
+        Checkpoint(path, "import").save({"table": SESSIONS.name, "format": "csv", "rows": 1})
+        import_table(target, ENTRIES, path, "csv", resume=True)
+    target.dispose()
+
+
+def test_import_rejects_rows_without_required_columns(tmp_path):
+    path = tmp_path / "entries.ndjson"
+    path.write_text(json.dumps({"id": "e1", "username": "x", "mode": "walls", "date": "2024-01-01"}) + "\n")
+    target = _engine(tmp_path / "target.db")
+    with pytest.raises(ValueError, match="Row 1 has no score"):
+        import_table(target, ENTRIES, path, "ndjson")
+    target.dispose()
+
+
+def test_cli_import_rebuilds_best_scores(source, tmp_path, monkeypatch, capsys):
+    path = tmp_path / "entries.ndjson"
+    with source.connect() as connection:
+        export_table(connection, ENTRIES, path, "ndjson")
+
+    target = _engine(tmp_path / "target.db")
+    monkeypatch.setattr("app.cli.engine", target)
+    monkeypatch.setattr("app.database.engine", target)
+    assert main(["import", "leaderboard_entries", str(path), "--batch-size", "10"]) == 0
+    assert "import leaderboard_entries: 25 rows" in capsys.readouterr().err
+    with target.connect() as connection:
+        best = Base.metadata.tables["player_best_scores"]
+        # 7 players, each with a best in both modes
+        assert connection.execute(select(func.count()).select_from(best)).scalar() == 14
+    target.dispose()
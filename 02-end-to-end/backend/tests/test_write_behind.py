@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+
+from app.models import GameMode, LeaderboardEntryModel
+from app.ranking import leaderboard_index, player_index
+from app.db import DatabaseService
+from app.write_behind import FLUSH_ATTEMPTS, FLUSHED, ScoreWriteBuffer
+
+
+@pytest.fixture
+def writer_factory(temp_db):
+    _, SessionLocal, _ = temp_db
+    writers = []
+
+    def make(**kwargs):
+        writer = ScoreWriteBuffer(SessionLocal, **kwargs)
+        writers.append(writer)
+        return writer
+
+    leaderboard_index.clear()
+    player_index.clear()
+    yield make
+    for writer in writers:
+        writer.drain()
+    leaderboard_index.clear()
+    player_index.clear()
+
+
+def test_scores_are_ranked_before_flush_and_written_in_bulk(writer_factory, db_session):
+    writer = writer_factory(interval=60, max_rows=1000)
+    writer.start()
+
+    _, rank, done = writer.submit("a", 100, GameMode.WALLS)
+    assert (rank, done) == (1, None)
+    assert writer.submit("b", 300, GameMode.WALLS)[1] == 1
+    assert writer.submit("c", 200, GameMode.WALLS)[1] == 2
+    assert db_session.query(LeaderboardEntryModel).count() == 0
+
+    writer.drain()
+    assert writer.pending() == 0
+    assert writer.stats()["flushes"] == 1
+    scores = [row.score for row in db_session.query(LeaderboardEntryModel).all()]
+    assert sorted(scores) == [100, 200, 300]
+
+
+def test_flushed_durability_resolves_after_commit(writer_factory, db_session):
+    writer = writer_factory(interval=0.01, max_rows=2, durability=FLUSHED)
+    writer.start()
+
+    async def submit():
+        _, rank, done = writer.submit("a", 50, GameMode.PASS_THROUGH)
+        await asyncio.wrap_future(done)
+        return rank
+
+    assert asyncio.run(submit()) == 1
+    assert db_session.query(LeaderboardEntryModel).count() == 1
+
+
+def test_failed_flush_keeps_queued_bests(writer_factory, db_session, monkeypatch):
+    writer = writer_factory(durability=FLUSHED)
+    failed = writer.submit("a", 500, GameMode.WALLS)
+    writer.submit("a", 300, GameMode.WALLS)
+    writer.submit("b", 200, GameMode.WALLS)
+
+    # The first score's flush fails while the others are still queued
+    batch, writer._queue = writer._queue[:1], writer._queue[1:]
+    def fail(self, entries):
+        raise RuntimeError("database unavailable")
+    monkeypatch.setattr(DatabaseService, "insert_scores", fail)
+    assert not writer._flush(batch)
+    assert isinstance(failed[2].exception(), RuntimeError)
+    assert player_index.is_warm
+    assert player_index.get(GameMode.WALLS, "a").score == 300
+    assert player_index.get(None, "b").score == 200
+
+    monkeypatch.undo()
+    assert writer._flush(writer._queue)
+    assert player_index.get(None, "a").score == 300
+
+
+def test_buffered_batch_that_keeps_failing_is_dropped(writer_factory, monkeypatch):
+    writer = writer_factory(interval=0)
+    writer.submit("a", 500, GameMode.WALLS)
+    def fail(self, entries):
+        raise RuntimeError("integrity error")
+    monkeypatch.setattr(DatabaseService, "insert_scores", fail)
+
+    for attempt in range(1, FLUSH_ATTEMPTS):
+        batch, writer._queue = writer._queue, []
+        assert not writer._flush(batch)
+        assert writer.pending() == 1
+    assert leaderboard_index.count(GameMode.WALLS) == 1
+
+    # The last attempt drops the score and takes it out of the index
+    batch, writer._queue = writer._queue, []
+    assert not writer._flush(batch)
+    assert writer.pending() == 0
+    assert writer.stats()["dropped"] == 1
+    assert leaderboard_index.count(None) == 0
+    assert player_index.get(None, "a") is None
@@ -9,6 +9,12 @@ from fastapi.testclient import TestClient
 from app.main import app
 from app.models import Base
 from app.database import get_db
+from app.ranking import leaderboard_index, player_index
+from app.hub import session_hub
+from app.live_sessions import live_sessions
+from app.cache import leaderboard_cache
+from app.instrumentation import route_metrics
+from app.tokens import token_signer, user_cache
 
 
 @pytest.fixture
@@ -97,6 +103,11 @@ def db_session(temp_db):
     
     session.commit()
     
+    # Entries were inserted directly, so derive the players' bests
+    from app.migrations import backfill_best_scores
+    backfill_best_scores(session.connection())
+    session.commit()
+    
     # Add sample sessions
     sample_sessions = [
         ("LivePlayer1", 340, GameMode.WALLS, True),
@@ -120,6 +131,18 @@ def db_session(temp_db):
     session.close()
 
 
+def reset_app_state():
+    """Drop process-local state so it is rebuilt from the test database."""
+    leaderboard_index.clear()
+    player_index.clear()
+    session_hub.clear()
+    live_sessions.clear()
+    leaderboard_cache.clear()
+    route_metrics.clear()
+    token_signer.clear()
+    user_cache.clear()
+
+
 @pytest.fixture
 def client(db_session):
     """Provide a test client with a database session override."""
@@ -130,6 +153,9 @@ def client(db_session):
     app.dependency_overrides[get_db] = override_get_db
     
     with TestClient(app) as test_client:
+        # Startup warms in-memory state from the default database
+        reset_app_state()
         yield test_client
     
     app.dependency_overrides.clear()
+    reset_app_state()
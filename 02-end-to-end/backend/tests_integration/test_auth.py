@@ -108,3 +108,103 @@ class TestAuth:
         assert response.status_code == 401
         data = response.json()
         assert "Not authenticated" in data["detail"]
+    
+    def test_login_upgrades_legacy_hash(self, client, db_session):
+        """Test that a successful login rehashes a legacy SHA-256 password."""
+        from app.models import UserModel
+        
+        user = db_session.query(UserModel).filter(UserModel.email == "player1@snake.io").first()
+        assert user.password_hash == hashlib.sha256(b"password123").hexdigest()
+        
+        response = client.post(
+            "/auth/login",
+            json={
+                "email": "player1@snake.io",
+                "password": "password123"
+            }
+        )
+        assert response.json()["success"] is True
+        
+        db_session.refresh(user)
+        assert user.password_hash.startswith("scrypt$")
+        
+        # The upgraded hash still verifies
+        response = client.post(
+            "/auth/login",
+            json={
+                "email": "player1@snake.io",
+                "password": "password123"
+            }
+        )
+        assert response.json()["success"] is True
+    
+    def test_login_issues_token_for_me(self, client):
+        """Test that the login token authenticates /auth/me."""
+        response = client.post(
+            "/auth/login",
+            json={
+                "email": "player1@snake.io",
+                "password": "password123"
+            }
+        )
+        token = response.json()["token"]
+        assert token
+        
+        response = client.get("/auth/me", headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 200
+        assert response.json()["username"] == "SnakeMaster"
+        assert response.json()["email"] == "player1@snake.io"
+    
+    def test_me_loads_uncached_user(self, client):
+        """Test that /auth/me falls back to the database on a cache miss."""
+        from app.tokens import user_cache
+        
+        token = client.post(
+            "/auth/signup",
+            json={
+                "email": "cached@snake.io",
+                "username": "Cached",
+                "password": "securepass123"
+            }
+        ).json()["token"]
+        user_cache.clear()
+        
+        response = client.get("/auth/me", headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 200
+        assert response.json()["username"] == "Cached"
+        assert user_cache.stats()["entries"] == 1
+    
+    def test_invalid_token_rejected(self, client):
+        """Test that a forged or malformed token is rejected with 401."""
+        token = client.post(
+            "/auth/login",
+            json={
+                "email": "player1@snake.io",
+                "password": "password123"
+            }
+        ).json()["token"]
+        payload, signature = token.split(".")
+        
+        for bad in (f"{payload}.{signature[:-2]}xx", "garbage"):
+            response = client.get("/auth/me", headers={"Authorization": f"Bearer {bad}"})
+            assert response.status_code == 401
+            assert response.headers["www-authenticate"] == "Bearer"
+        
+        response = client.get("/auth/me", headers={"Authorization": f"Basic {token}"})
+        assert response.status_code == 401
+    
+    def test_logout_revokes_token(self, client):
+        """Test that a token no longer works after logging out with it."""
+        token = client.post(
+            "/auth/login",
+            json={
+                "email": "player1@snake.io",
+                "password": "password123"
+            }
+        ).json()["token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        
+        assert client.post("/auth/logout", headers=headers).status_code == 200
+        response = client.get("/auth/me", headers=headers)
+        assert response.status_code == 401
+        assert "revoked" in response.json()["detail"]
@@ -124,3 +124,177 @@ class TestLeaderboard:
         # Verify descending order by score
         for i in range(len(data) - 1):
             assert data[i]["score"] >= data[i + 1]["score"]
+    
+    def test_rank_is_computed_within_mode(self, client):
+        """Test that scores in other modes do not affect the rank."""
+        # Sample data has WALLS scores 2450 and 1890, PASS_THROUGH 2100
+        response = client.post(
+            "/leaderboard",
+            json={
+                "score": 2000,
+                "mode": "walls",
+                "username": "RankedPlayer"
+            }
+        )
+        assert response.status_code == 200
+        assert response.json()["rank"] == 2
+        
+        response = client.get("/leaderboard?mode=walls")
+        usernames = [entry["username"] for entry in response.json()]
+        assert usernames == ["SnakeMaster", "RankedPlayer", "CobraKing"]
+    
+    def test_leaderboard_etag_and_invalidation(self, client):
+        """Test 304 responses for unchanged data and invalidation on new scores."""
+        response = client.get("/leaderboard?mode=walls")
+        etag = response.headers["etag"]
+        
+        response = client.get("/leaderboard?mode=walls", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        
+        client.post(
+            "/leaderboard",
+            json={
+                "score": 5000,
+                "mode": "walls",
+                "username": "FreshPlayer"
+            }
+        )
+        response = client.get("/leaderboard?mode=walls", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+        assert response.json()[0]["username"] == "FreshPlayer"
+    
+    def test_leaderboard_limit(self, client):
+        """Test limiting the number of leaderboard entries."""
+        response = client.get("/leaderboard?limit=1")
+        assert response.status_code == 200
+        assert len(response.json()) == 1
+    
+    def test_leaderboard_cursor_pagination(self, client):
+        """Test walking the leaderboard with keyset cursors."""
+        for score in (1500, 1500, 1200):
+            client.post("/leaderboard", json={"score": score, "mode": "walls", "username": "Pager"})
+        full = client.get("/leaderboard").json()
+        
+        response = client.get("/leaderboard?limit=2")
+        pages = [response.json()]
+        while "x-next-cursor" in response.headers:
+            response = client.get(
+                "/leaderboard",
+                params={"limit": 2, "cursor": response.headers["x-next-cursor"]}
+            )
+            assert response.status_code == 200
+            pages.append(response.json())
+        
+        assert [entry for page in pages for entry in page] == full
+        assert len(full) == 6
+    
+    def test_leaderboard_invalid_cursor(self, client):
+        """Test a malformed cursor is rejected."""
+        response = client.get("/leaderboard?cursor=not-a-cursor")
+        assert response.status_code == 400
+    
+    def test_leaderboard_around_player(self, client):
+        """Test the window of entries around a player's best score."""
+        client.post("/leaderboard", json={"score": 1000, "mode": "walls", "username": "CobraKing"})
+        response = client.get("/leaderboard/around/CobraKing?mode=walls&radius=1")
+        assert response.status_code == 200
+        data = response.json()
+        assert [(entry["username"], entry["rank"]) for entry in data] == [
+            ("SnakeMaster", 1), ("CobraKing", 2), ("CobraKing", 3)
+        ]
+    
+    def test_leaderboard_around_unknown_player(self, client):
+        """Test 404 for a player without scores."""
+        response = client.get("/leaderboard/around/NoSuchPlayer")
+        assert response.status_code == 404
+    
+    def test_user_position_respects_mode(self, client, db_session):
+        """Test the rank count only includes entries of the requested mode."""
+        from app.db import DatabaseService
+        service = DatabaseService(db_session)
+        # VenomStrike is first in pass-through although SnakeMaster scores higher in walls
+        assert service.get_user_leaderboard_position("VenomStrike", GameMode.PASS_THROUGH) == 1
+        assert service.get_user_leaderboard_position("VenomStrike") == 2
+        assert service.get_user_leaderboard_position("Nobody") is None
+    
+    def test_player_leaderboard_one_row_per_player(self, client):
+        """Test a grinding player appears once, with their best score."""
+        for score in (100, 2600, 900):
+            client.post("/leaderboard", json={"score": score, "mode": "walls", "username": "Grinder"})
+        
+        response = client.get("/leaderboard/players?mode=walls")
+        assert response.status_code == 200
+        assert [(p["rank"], p["username"], p["score"]) for p in response.json()] == [
+            (1, "Grinder", 2600), (2, "SnakeMaster", 2450), (3, "CobraKing", 1890)
+        ]
+        
+        response = client.get("/leaderboard/players")
+        assert [p["username"] for p in response.json()] == [
+            "Grinder", "SnakeMaster", "VenomStrike", "CobraKing"
+        ]
+    
+    def test_player_leaderboard_pagination(self, client):
+        """Test paging the player leaderboard with cursors."""
+        response = client.get("/leaderboard/players?limit=2")
+        first = response.json()
+        response = client.get(
+            "/leaderboard/players",
+            params={"limit": 2, "cursor": response.headers["x-next-cursor"]}
+        )
+        second = response.json()
+        assert [p["rank"] for p in first + second] == [1, 2, 3]
+        assert "x-next-cursor" not in response.headers
+    
+    def test_player_rank(self, client, db_session):
+        """Test a player's rank among players and the stored best score."""
+        client.post("/leaderboard", json={"score": 2000, "mode": "walls", "username": "CobraKing"})
+        response = client.get("/leaderboard/players/CobraKing?mode=walls")
+        assert response.status_code == 200
+        assert (response.json()["rank"], response.json()["score"]) == (2, 2000)
+        
+        from app.models import PlayerBestScoreModel
+        best = db_session.get(PlayerBestScoreModel, ("CobraKing", GameMode.WALLS))
+        assert best.best_score == 2000
+        
+        assert client.get("/leaderboard/players/Nobody").status_code == 404
+    
+    def test_leaderboard_windows(self, client):
+        """Test daily and weekly leaderboards only include recent scores."""
+        # The seeded entries are from 2024
+        client.post("/leaderboard", json={"score": 50, "mode": "walls", "username": "Today"})
+        
+        for window in ("day", "week"):
+            response = client.get(f"/leaderboard?window={window}")
+            assert response.status_code == 200
+            assert [entry["username"] for entry in response.json()] == ["Today"]
+        
+        response = client.get("/leaderboard?window=all&mode=walls")
+        assert [entry["username"] for entry in response.json()] == [
+            "SnakeMaster", "CobraKing", "Today"
+        ]
+        assert client.get("/leaderboard?window=month").status_code == 422
+    
+    def test_submit_score_takes_username_from_token(self, client):
+        """Test that an authenticated submission scores under the token's username."""
+        token = client.post(
+            "/auth/login",
+            json={"email": "player1@snake.io", "password": "password123"}
+        ).json()["token"]
+        
+        response = client.post(
+            "/leaderboard",
+            json={"score": 9000, "mode": "walls", "username": "Impostor"},
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        assert response.status_code == 200
+        
+        top = client.get("/leaderboard?mode=walls").json()[0]
+        assert (top["username"], top["score"]) == ("SnakeMaster", 9000)
+        
+        response = client.post(
+            "/leaderboard",
+            json={"score": 9000, "mode": "walls"},
+            headers={"Authorization": "Bearer not-a-token"}
+        )
+        assert response.status_code == 401
@@ -71,3 +71,72 @@ class TestSessions:
         # All should be live
         for session in sessions:
             assert session["isLive"] is True
+    
+    def test_stream_snapshot_and_deltas(self, client, db_session):
+        """Test that the WebSocket stream sends a snapshot, then session deltas."""
+        from app.db import DatabaseService
+        from app.models import GameMode
+        
+        with client.websocket_connect("/sessions/stream") as websocket:
+            snapshot = websocket.receive_json()
+            assert snapshot["type"] == "snapshot"
+            assert {s["username"] for s in snapshot["sessions"]} == {"LivePlayer1", "StreamerPro"}
+            
+            service = DatabaseService(db_session)
+            session = service.create_session("Newcomer", 0, GameMode.WALLS, is_live=True)
+            event = websocket.receive_json()
+            assert event["type"] == "created"
+            assert event["session"]["username"] == "Newcomer"
+            
+            service.close_session(session.id)
+            event = websocket.receive_json()
+            assert event["type"] == "closed"
+            assert event["session"]["isLive"] is False
+    
+    def test_patch_session_heartbeat_and_close(self, client, db_session):
+        """Test score ticks are served from memory and persisted on close."""
+        from app.models import GameSessionModel
+        session_id = client.get("/sessions").json()[0]["id"]
+        stored = db_session.get(GameSessionModel, session_id)
+        initial = stored.score
+        
+        for score in (1000, 1100, 1200):
+            response = client.patch(f"/sessions/{session_id}", json={"score": score})
+            assert response.status_code == 200
+            assert response.json()["score"] == score
+        
+        assert client.get(f"/sessions/{session_id}").json()["score"] == 1200
+        db_session.refresh(stored)
+        assert stored.score == initial
+        
+        response = client.patch(f"/sessions/{session_id}", json={"score": 1300, "isLive": False})
+        assert response.status_code == 200
+        assert response.json()["isLive"] is False
+        db_session.refresh(stored)
+        assert (stored.score, stored.is_live) == (1300, False)
+        
+        response = client.patch(f"/sessions/{session_id}", json={"score": 1400})
+        assert response.status_code == 404
+    
+    def test_patch_unknown_session(self, client):
+        """Test heartbeats for unknown sessions are rejected."""
+        response = client.patch("/sessions/does-not-exist", json={"score": 1})
+        assert response.status_code == 404
+    
+    def test_live_sessions_paginate_by_cursor(self, client):
+        """Test the session list is capped and pages with X-Next-Cursor."""
+        first = client.get("/sessions", params={"limit": 1})
+        assert first.status_code == 200
+        assert len(first.json()) == 1
+        cursor = first.headers["X-Next-Cursor"]
+        assert cursor == first.json()[0]["id"]
+        
+        second = client.get("/sessions", params={"limit": 1, "cursor": cursor})
+        assert len(second.json()) == 1
+        assert second.json()[0]["id"] > cursor
+        
+        rest = client.get("/sessions", params={"limit": 10, "cursor": second.json()[0]["id"]})
+        assert rest.json() == []
+        assert "X-Next-Cursor" not in rest.headers
+        
+        assert client.get("/sessions", params={"limit": 501}).status_code == 422
@@ -26,6 +26,7 @@ export interface User {
 export interface AuthResponse {
   success: boolean;
   user?: User;
+  token?: string;
   error?: string;
 }
 